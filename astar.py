@@ -0,0 +1,159 @@
+"""A* search over packed states, guided by per-corner move distances."""
+
+import heapq
+import itertools as it
+from typing import Callable, Iterable
+
+from packed import (
+    CELL_MASK,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    behavior_color,
+    cell_index,
+    pack,
+    pack_goal,
+    press_packed,
+    unpack,
+)
+from pruning import PruningIndex
+from reachability import INF, creatable, move_distances, reachable_colors
+from solver import Color, Goal, Grid, Play, TransitionCache, Unsolvable
+from stats import SolveStats
+
+type Heuristic = Callable[[PackedState], float]
+
+
+def goal_heuristic(goal: Goal, colors: Iterable[Color]) -> Heuristic:
+    """Lower bound on the presses left to reach the goal from a packed state.
+
+    For each goal cell: the fewest presses to move its color there from the nearest tile of that
+    color, or 1 if a single press could create the color outright. The bound is the max over goal
+    cells (one press can fix several at once). ``INF`` means the goal can no longer be reached.
+
+    ``colors`` should be the starting grid's colors: the bound holds for every state reachable from it.
+    """
+    reachable = reachable_colors(frozenset(colors))
+
+    # (shift, color value, nearest-first (distance, source shift) pairs or None if creatable)
+    goal_cells = list[tuple[int, int, tuple[tuple[float, int], ...] | None]]()
+    for position, color in goal:
+        target = cell_index(position)
+        if creatable(color, reachable):
+            goal_cells.append((4 * target, color.value, None))
+            continue
+        distances = move_distances(color, reachable)
+        sources = sorted(
+            (distances[source][target], 4 * source)
+            for source in range(9)
+            if source != target and distances[source][target] < INF
+        )
+        goal_cells.append((4 * target, color.value, tuple(sources)))
+
+    def heuristic(state: PackedState) -> float:
+        bound = 0
+        for shift, value, sources in goal_cells:
+            if (state >> shift) & CELL_MASK == value:
+                continue
+            if sources is None:
+                cell_bound = 1
+            else:
+                cell_bound = next(
+                    (distance for distance, source in sources if (state >> source) & CELL_MASK == value),
+                    INF,
+                )
+            if cell_bound > bound:
+                if cell_bound == INF:
+                    return INF
+                bound = cell_bound
+        return bound
+
+    return heuristic
+
+
+def solve_astar(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int = 10,
+    transitions: TransitionCache | None = None,
+    pruning: PruningIndex | None = None,
+    stats: SolveStats | None = None,
+) -> tuple[Play, Grid] | None:
+    """A* over packed states. Returns a shortest solution, like the BFS ``solve()``.
+
+    The heuristic never drops by more than one per press, so the first time a state is popped it
+    was reached by a shortest path and needn't be revisited. It is also at least 1 for any state
+    not meeting the goal, so a goal found among the children of a popped state (``presses + 1``) can't
+    be beaten by anything still queued, and is returned right away just like the BFS does.
+    """
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    goal_mask, goal_value = pack_goal(goal)
+    if pruning is None:
+        pruning = PruningIndex(goal, grid.colors)
+    heuristic = goal_heuristic(goal, grid.colors)
+    press_state = transitions.press_packed if transitions is not None else press_packed
+
+    start = pack(grid.colors)
+    if heuristic(start) == INF:
+        raise Unsolvable("Goal colors can never reach the goal positions.")
+
+    # (estimated total presses, negated presses so far, tiebreak, state, play)
+    tiebreak = it.count()
+    queue: list[tuple[float, int, int, PackedState, Play | None]] = [(heuristic(start), 0, next(tiebreak), start, None)]
+    played_states = {start: 0}
+    expanded = set[PackedState]()
+
+    max_depth_reached = 0
+    total_impossibles = 0
+
+    while queue:
+        _, negated_presses, _, state, last_play = heapq.heappop(queue)
+        if state in expanded:
+            continue
+        expanded.add(state)
+
+        for pos, index in PRESS_ORDER:
+            new_state = press_state(index, state)
+            if new_state is None:
+                continue
+
+            play = last_play.next(pos) if last_play else Play(None, pos)
+            if new_state & goal_mask == goal_value:
+                if stats is not None:
+                    stats.states_explored, stats.depth_limited, stats.impossibles = (
+                        len(played_states), max_depth_reached, total_impossibles,
+                    )
+                return play, Grid(unpack(new_state), None)
+
+            new_presses = 1 - negated_presses
+            if played_states.get(new_state, new_presses + 1) <= new_presses:
+                continue
+            played_states[new_state] = new_presses
+
+            if pruning.prunes_packed(new_state, behavior_color(index, state) in RECOUNTING):
+                total_impossibles += 1
+                continue
+
+            estimate = heuristic(new_state)
+            if estimate == INF:
+                total_impossibles += 1
+                continue
+
+            if play.depth >= max_depth:
+                max_depth_reached += 1
+                continue
+
+            # deeper states first among equal estimates: they're closer to done
+            heapq.heappush(queue, (new_presses + estimate, -new_presses, next(tiebreak), new_state, play))
+
+    if stats is not None:
+        stats.states_explored, stats.depth_limited, stats.impossibles = (
+            len(played_states), max_depth_reached, total_impossibles,
+        )
+
+    if not max_depth_reached:
+        raise Unsolvable(f"No solution found within max depth; {len(played_states)} unique states explored.")
+
+    return None
@@ -0,0 +1,213 @@
+"""Search backends by name, and a differential fuzz of their presses against the reference.
+
+``solve(backend=name)`` runs ``BACKENDS[name].search``. Each backend also exposes how it presses
+cells, as a successor function over a batch of packed states from one room: for every state, the
+child of each press in press order, None where the press changes nothing. ``fuzz()`` drives random
+rooms through every backend's successors and reports each press that differs from the reference
+``press()``. ``python bench.py backends`` times them::
+
+    python backends.py --rooms 10000 --seed 7
+"""
+
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from importlib.util import find_spec
+from typing import Any, Callable, Iterable, NamedTuple, Sequence
+
+from kernel import kernel, solve_kernel
+from packed import PRESS_ORDER, PackedState, pack, press_packed, solve_packed, unpack
+from pruning import PruningIndex
+from reachability import reachable_colors
+from solver import GRID_POSITIONS, Color, Goal, Grid, Play, Position, TransitionCache, press, solve
+from stats import SolveStats
+
+type Successors = Callable[[frozenset[Color], Sequence[PackedState]], list[list[PackedState | None]]]
+"""(room's starting colors, states) -> each state's children in press order, None for no change."""
+
+type Search = Callable[..., tuple[Play, Grid] | None]
+"""(grid, goal, max_depth, pruning, stats, **options) -> the same result as ``solve()``."""
+
+OPTIONS = ("transitions", "symmetry", "skip_commuting")
+"""``solve()`` options a backend may or may not support."""
+
+
+@dataclass(frozen=True)
+class Backend:
+    search: Search
+    successors: Successors
+    supports: frozenset[str] = frozenset()
+    """Which of ``OPTIONS`` the search takes."""
+    requires: str | None = None
+    """Module the backend needs that isn't a dependency of the solver."""
+
+
+def _search_reference(
+    grid: Grid, goal: Goal, max_depth: int, pruning: PruningIndex | None, stats: SolveStats | None, **options: Any
+) -> tuple[Play, Grid] | None:
+    return solve(grid, goal, max_depth, pruning=pruning, stats=stats, **options)
+
+
+def _successors_reference(colors: frozenset[Color], states: Sequence[PackedState]) -> list[list[PackedState | None]]:
+    children = []
+    for state in states:
+        grid = Grid(unpack(state), None)
+        children.append([None if (new := press(pos, grid)) is None else pack(new.colors) for pos in GRID_POSITIONS])
+    return children
+
+
+def _search_packed(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int,
+    pruning: PruningIndex | None,
+    stats: SolveStats | None,
+    transitions: TransitionCache | None = None,
+    symmetry: bool = False,
+    skip_commuting: bool = False,
+) -> tuple[Play, Grid] | None:
+    return solve_packed(grid, goal, max_depth, transitions, pruning, symmetry, stats, skip_commuting)
+
+
+def _successors_packed(colors: frozenset[Color], states: Sequence[PackedState]) -> list[list[PackedState | None]]:
+    return [[press_packed(index, state) for _, index in PRESS_ORDER] for state in states]
+
+
+def _search_numpy(
+    grid: Grid, goal: Goal, max_depth: int, pruning: PruningIndex | None, stats: SolveStats | None
+) -> tuple[Play, Grid] | None:
+    from vectorized import solve_numpy
+
+    return solve_numpy(grid, goal, max_depth, pruning, stats)
+
+
+def _successors_numpy(colors: frozenset[Color], states: Sequence[PackedState]) -> list[list[PackedState | None]]:
+    import numpy as np
+    from vectorized import SHIFTS, keys, press_all
+
+    cells = ((np.array(states, dtype=np.uint64)[:, None] >> SHIFTS) & 0xF).astype(np.uint8)
+    children: list[list[PackedState | None]] = [[None] * len(PRESS_ORDER) for _ in states]
+    for press_index, (_, index) in enumerate(PRESS_ORDER):
+        rows, new, _ = press_all(index, cells)
+        for row, child in zip(rows.tolist(), keys(new).tolist()):
+            children[row][press_index] = child
+    return children
+
+
+def _search_kernel(
+    grid: Grid, goal: Goal, max_depth: int, pruning: PruningIndex | None, stats: SolveStats | None
+) -> tuple[Play, Grid] | None:
+    return solve_kernel(grid, goal, max_depth, pruning, stats)
+
+
+def _successors_kernel(colors: frozenset[Color], states: Sequence[PackedState]) -> list[list[PackedState | None]]:
+    expand = kernel(reachable_colors(colors))
+    children = []
+    for state in states:
+        row: list[PackedState | None] = [None] * len(PRESS_ORDER)
+        for press_index, child, _ in expand(state):
+            row[press_index] = child
+        children.append(row)
+    return children
+
+
+BACKENDS: dict[str, Backend] = {
+    "reference": Backend(_search_reference, _successors_reference, frozenset(OPTIONS)),
+    "packed": Backend(_search_packed, _successors_packed, frozenset(OPTIONS)),
+    "numpy": Backend(_search_numpy, _successors_numpy, requires="numpy"),
+    "kernel": Backend(_search_kernel, _successors_kernel),
+}
+"""Every backend by name. The reference one is the plain ``solve()`` over ``Grid``s."""
+
+
+def available() -> list[str]:
+    """Names of the backends whose required modules are installed."""
+    return [name for name, backend in BACKENDS.items() if backend.requires is None or find_spec(backend.requires)]
+
+
+class Mismatch(NamedTuple):
+    backend: str
+    colors: list[Color]
+    """The state pressed."""
+    position: Position
+    expected: list[Color] | None
+    """The reference's child, None if the press changes nothing."""
+    actual: list[Color] | None
+
+    def __str__(self) -> str:
+        def cells(colors: list[Color] | None) -> str:
+            return "no change" if colors is None else " ".join(color.name.lower() for color in colors)
+
+        return (
+            f"{self.backend}: pressing {tuple(self.position)} in {cells(self.colors)}"
+            f" gave {cells(self.actual)}, expected {cells(self.expected)}"
+        )
+
+
+def differences(
+    colors: frozenset[Color], states: Sequence[PackedState], backends: Iterable[str] | None = None
+) -> list[Mismatch]:
+    """Every press of the states where a backend's child differs from the reference's.
+
+    The states must only contain colors the room's starting ``colors`` can reach.
+    """
+    expected = _successors_reference(colors, states)
+    mismatches = []
+    for name in available() if backends is None else backends:
+        if name == "reference":
+            continue
+        actual = BACKENDS[name].successors(colors, states)
+        for state, want, got in zip(states, expected, actual):
+            for press_index, (a, b) in enumerate(zip(want, got)):
+                if a != b:
+                    mismatches.append(Mismatch(
+                        name,
+                        unpack(state),
+                        PRESS_ORDER[press_index][0],
+                        None if a is None else unpack(a),
+                        None if b is None else unpack(b),
+                    ))
+    return mismatches
+
+
+def random_room(rng: random.Random, size: int) -> tuple[frozenset[Color], list[PackedState]]:
+    """A random room's starting colors, and ``size`` random states over the colors it can reach."""
+    colors = frozenset(rng.sample(list(Color), k=rng.randint(1, 5)))
+    # by value, so a seed always draws the same cells
+    cells = sorted(reachable_colors(colors), key=lambda color: color.value)
+    return colors, [pack(rng.choices(cells, k=9)) for _ in range(size)]
+
+
+def fuzz(rooms: int, seed: int = 0, size: int = 32, backends: Iterable[str] | None = None) -> list[Mismatch]:
+    """``differences()`` over ``rooms`` random rooms of ``size`` states each.
+
+    Few colors per room, so ties, same-colored neighbors and blues copying each behavior come up often.
+    """
+    rng = random.Random(seed)
+    backends = available() if backends is None else list(backends)
+    mismatches = []
+    for _ in range(rooms):
+        mismatches += differences(*random_room(rng, size), backends)
+    return mismatches
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("backends", nargs="*", help="backends to check (default: every one installed)")
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=32, help="states per room")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, default=20, help="most mismatches printed")
+    args = parser.parse_args(argv)
+
+    mismatches = fuzz(args.rooms, args.seed, args.size, args.backends or None)
+    for mismatch in mismatches[:args.limit]:
+        print(mismatch)
+    print(f"{len(mismatches)} mismatches in {args.rooms * args.size} states")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
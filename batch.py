@@ -0,0 +1,226 @@
+"""Solve many puzzles at once, each in its own worker process with a deadline.
+
+Puzzles come as JSON lines or CSV rows with ``colors`` (9 color names, space-separated, top/middle/
+bottom row), ``goal`` (one color for all corners, or 4 space-separated corner colors: top left,
+top right, bottom left, bottom right), and optionally ``id`` and ``max_depth``. Results stream
+out as JSON lines in the order they finish::
+
+    python batch.py rooms.jsonl --workers 8 --timeout 30 > solutions.jsonl
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Any, Iterable, Iterator, TextIO
+
+from solver import Color, Goal, Grid, Play, Position, Unsolvable, corners, solve
+from stats import SolveStats
+
+CORNER_ORDER = (Position(-1, -1), Position(1, -1), Position(-1, 1), Position(1, 1))
+"""Corner order for mixed-color goals, as the interactive prompt takes them."""
+
+PARSE_ERRORS = (ValueError, KeyError, TypeError, AttributeError)
+"""What a malformed record raises while parsing (bad JSON is a ValueError)."""
+
+
+@dataclass
+class Puzzle:
+    id: str
+    colors: list[Color]
+    goal: Goal
+    max_depth: int = 10
+
+
+@dataclass
+class Result:
+    id: str
+    status: str
+    """``solved``, ``depth exceeded`` (no solution within max_depth), ``unsolvable``, ``timeout`` or ``error``."""
+    moves: list[tuple[int, int]] = field(default_factory=list)
+    """Positions to press, in order, as (x, y) with -1, 0, 1 indexes."""
+    states_explored: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def parse_goal(text: str) -> Goal:
+    names = text.upper().split()
+    if len(names) == 1:
+        return corners(Color[names[0]])
+    if len(names) != 4:
+        raise ValueError(f"Goal must be 1 or 4 colors: {text!r}")
+    return set(zip(CORNER_ORDER, (Color[name] for name in names)))
+
+
+def parse_puzzle(record: dict[str, Any], default_id: str) -> Puzzle:
+    colors = record["colors"]
+    if isinstance(colors, str):
+        colors = colors.split()
+    goal = record["goal"]
+    if not isinstance(goal, str):
+        goal = " ".join(goal)
+    return Puzzle(
+        id=str(record.get("id") or default_id),
+        colors=[Color[name.upper()] for name in colors],
+        goal=parse_goal(goal),
+        max_depth=10 if record.get("max_depth") in (None, "") else int(record["max_depth"]),
+    )
+
+
+def read_puzzles(file: TextIO, format: str = "jsonl") -> Iterator[Puzzle | Result]:
+    """Reads puzzles from JSON lines (``jsonl``) or a CSV file with a header row (``csv``).
+
+    A record that can't be parsed comes out as an ``error`` Result in its place, so one bad line
+    doesn't stop the rest.
+    """
+    records: Iterator[tuple[int, str | dict[str, Any]]]
+    if format == "csv":
+        records = enumerate(csv.DictReader(file), start=2)
+    elif format == "jsonl":
+        records = ((line_number, line) for line_number, line in enumerate(file, start=1) if line.strip())
+    else:
+        raise ValueError(f"Unknown format: {format}")
+
+    for line_number, record in records:
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            puzzle = parse_puzzle(record, str(line_number))
+        except PARSE_ERRORS as e:
+            record_id = record.get("id") if isinstance(record, dict) else None
+            yield Result(str(record_id or line_number), "error", error=f"Bad puzzle on line {line_number}: {e!r}")
+        else:
+            yield puzzle
+
+
+def moves(play: Play | None) -> list[tuple[int, int]]:
+    presses = []
+    while play:
+        presses.append((play.press.x, play.press.y))
+        play = play.previous
+    return presses[::-1]
+
+
+def solve_puzzle(puzzle: Puzzle, **options: Any) -> Result:
+    """Solves one puzzle in this process; ``options`` are passed on to ``solve()``."""
+    stats = SolveStats()
+    start = time.perf_counter()
+    try:
+        solution = solve(Grid(list(puzzle.colors), None), puzzle.goal, puzzle.max_depth, stats=stats, **options)
+    except Unsolvable:
+        status, play = "unsolvable", None
+    except ValueError as e:
+        return Result(puzzle.id, "error", seconds=time.perf_counter() - start, error=str(e))
+    else:
+        status, play = ("solved", solution[0]) if solution else ("depth exceeded", None)
+
+    return Result(puzzle.id, status, moves(play), stats.states_explored, time.perf_counter() - start)
+
+
+def _run(conn: Connection, puzzle: Puzzle, options: dict[str, Any]) -> None:
+    try:
+        result = solve_puzzle(puzzle, **options)
+    except Exception as e:
+        result = Result(puzzle.id, "error", error=repr(e))
+    conn.send(result)
+    conn.close()
+
+
+def solve_many(
+    puzzles: Iterable[Puzzle | Result],
+    workers: int | None = None,
+    timeout: float | None = None,
+    **options: Any,
+) -> Iterator[Result]:
+    """Solves puzzles concurrently, yielding results as they finish.
+
+    Each puzzle runs in a fresh process (at most ``workers`` at a time, default one per CPU) so a
+    puzzle that runs past ``timeout`` seconds can be killed outright. ``options`` go to ``solve()``.
+    Results among the puzzles (records ``read_puzzles()`` couldn't parse) are passed straight through.
+    """
+    workers = workers or os.cpu_count() or 1
+    context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    pending = iter(puzzles)
+    # connection -> (process, puzzle, started)
+    running = dict[Connection, tuple[mp.process.BaseProcess, Puzzle, float]]()
+
+    try:
+        while True:
+            while len(running) < workers and (puzzle := next(pending, None)) is not None:
+                if isinstance(puzzle, Result):
+                    yield puzzle
+                    continue
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_run, args=(sender, puzzle, options), daemon=True)
+                process.start()
+                sender.close()
+                running[receiver] = (process, puzzle, time.perf_counter())
+
+            if not running:
+                return
+
+            wait_for = None
+            if timeout is not None:
+                oldest = min(started for _, _, started in running.values())
+                wait_for = max(0.0, oldest + timeout - time.perf_counter())
+
+            for conn in wait(list(running), wait_for):
+                process, puzzle, started = running.pop(conn)
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    result = Result(puzzle.id, "error", seconds=time.perf_counter() - started,
+                                    error=f"worker exited with code {process.exitcode}")
+                conn.close()
+                process.join()
+                yield result
+
+            if timeout is not None:
+                now = time.perf_counter()
+                for conn, (process, puzzle, started) in list(running.items()):
+                    if now - started >= timeout:
+                        del running[conn]
+                        process.kill()
+                        process.join()
+                        conn.close()
+                        yield Result(puzzle.id, "timeout", seconds=now - started)
+    finally:
+        for conn, (process, _, _) in running.items():
+            process.kill()
+            process.join()
+            conn.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", default="-", help="puzzle file (default: stdin)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from the file extension, else jsonl)")
+    parser.add_argument("--workers", type=int, help="puzzles solved at once (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, help="seconds allowed per puzzle")
+    parser.add_argument("--backend", default="reference")
+    parser.add_argument("--strategy", default="bfs")
+    args = parser.parse_args(argv)
+
+    format = args.format or ("csv" if args.file.endswith(".csv") else "jsonl")
+    # stdin isn't ours to close
+    with nullcontext(sys.stdin) if args.file == "-" else open(args.file, newline="") as file:
+        results = solve_many(
+            read_puzzles(file, format),
+            workers=args.workers,
+            timeout=args.timeout,
+            backend=args.backend,
+            strategy=args.strategy,
+        )
+        for result in results:
+            print(json.dumps(asdict(result)), flush=True)
+
+
+if __name__ == "__main__":
+    main()
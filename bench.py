@@ -0,0 +1,293 @@
+"""Solver benchmarks. Run ``python bench.py --help``.
+
+``backends`` times each backend's presses (states per second) and solves on the known puzzles.
+
+``corpus`` times the known puzzles and a seeded corpus of random solvable rooms, each in a fresh
+process so peak RSS is per puzzle. Save a run with ``--save`` and check later runs against it with
+``--baseline``; the exit status is 1 if any puzzle got slower than the tolerance or its solution
+or state count changed::
+
+    python bench.py corpus --save baseline.json
+    python bench.py corpus --baseline baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from functools import partial
+from multiprocessing.connection import Connection
+from typing import Any
+
+from backends import BACKENDS, available
+from packed import PRESS_ORDER, PackedState, pack, press_packed
+from solver import Color, Goal, Grid, Unsolvable, corners, solve
+from stats import SolveStats
+
+C = Color
+
+PUZZLES: dict[str, tuple[list[Color], Color, int]] = {
+    # name: (colors, goal corner color, max depth), mirroring test_solve.py
+    "purple": ([C.GRAY, C.PURPLE, C.GRAY, C.GRAY, C.PINK, C.GRAY, C.PURPLE, C.PURPLE, C.PURPLE], C.PURPLE, 5),
+    "trading_post": ([C.PINK, C.GRAY, C.GRAY, C.GRAY, C.YELLOW, C.YELLOW, C.GRAY, C.YELLOW, C.YELLOW], C.YELLOW, 10),
+    "fenn": ([C.GRAY, C.GREEN, C.GRAY, C.ORANGE, C.RED, C.ORANGE, C.WHITE, C.GREEN, C.BLACK], C.RED, 30),
+    "sanctum_arch_aries": ([C.BLACK, C.YELLOW, C.GRAY, C.YELLOW, C.GREEN, C.YELLOW, C.GRAY, C.YELLOW, C.BLACK], C.YELLOW, 10),
+    "rough_draft_white": ([C.WHITE, C.WHITE, C.WHITE, C.YELLOW, C.WHITE, C.BLACK, C.BLUE, C.BLUE, C.BLUE], C.BLUE, 30),
+    "rough_draft_red": ([C.RED, C.WHITE, C.YELLOW, C.BLUE, C.GREEN, C.BLUE, C.BLUE, C.YELLOW, C.BLUE], C.RED, 50),
+}
+
+
+def puzzle(name: str) -> tuple[Grid, Goal, int]:
+    colors, goal_color, max_depth = PUZZLES[name]
+    return Grid(list(colors), None), corners(goal_color), max_depth
+
+
+def timed(fn, repeat: int) -> float:
+    """Best wall time of ``repeat`` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scaling(names: list[str], worker_counts: list[int], repeat: int) -> None:
+    """Wall time of the parallel BFS per worker count, against the serial search over the same packed states."""
+    print(f"{'puzzle':<20} {'workers':>7} {'seconds':>9} {'speedup':>8}")
+    for name in names:
+        serial = timed(lambda name=name: solve(*puzzle(name), backend="packed"), repeat)
+        print(f"{name:<20} {'serial':>7} {serial:>9.3f} {1:>8.2f}")
+        for workers in worker_counts:
+            seconds = timed(lambda name=name, workers=workers: solve(*puzzle(name), workers=workers), repeat)
+            print(f"{name:<20} {workers:>7} {seconds:>9.3f} {serial / seconds:>8.2f}")
+
+
+def sample_states(grid: Grid, size: int) -> list[PackedState]:
+    """Up to ``size`` states reachable from the grid, nearest first."""
+    states = [pack(grid.colors)]
+    seen = set(states)
+    for state in states:
+        if len(states) >= size:
+            break
+        for _, index in PRESS_ORDER:
+            if (child := press_packed(index, state)) is not None and child not in seen:
+                seen.add(child)
+                states.append(child)
+    return states[:size]
+
+
+def throughput(names: list[str], backends: list[str], size: int, repeat: int) -> None:
+    """States pressed per second by each backend's successor function, and its solve time, per puzzle."""
+    print(f"{'puzzle':<20} {'backend':<10} {'states/s':>10} {'speedup':>8} {'seconds':>9}")
+    for name in names:
+        grid, _, _ = puzzle(name)
+        colors, states = frozenset(grid.colors), sample_states(grid, size)
+        baseline = None
+        for backend_name in backends:
+            backend = BACKENDS[backend_name]
+            per_second = len(states) / timed(partial(backend.successors, colors, states), repeat)
+            baseline = baseline or per_second
+            # a fresh grid each time, as in a real solve
+            seconds = timed(lambda search=backend.search, name=name: search(*puzzle(name), None, None), repeat)
+            print(f"{name:<20} {backend_name:<10} {per_second:>10.0f} {per_second / baseline:>8.2f} {seconds:>9.3f}")
+
+
+def random_corpus(depths: list[int], per_depth: int, seed: int = 0) -> dict[str, tuple[list[Color], Color, int]]:
+    """Random rooms whose shortest solution takes exactly each of ``depths`` presses, in ``PUZZLES`` form."""
+    rng = random.Random(seed)
+    corpus = {}
+    for depth in depths:
+        found = 0
+        while found < per_depth:
+            palette = rng.sample(list(Color), k=4)
+            colors = rng.choices(palette, k=9)
+            goal_color = rng.choice(palette)
+            try:
+                solution = solve(Grid(list(colors), None), corners(goal_color), depth, backend="packed")
+            except (Unsolvable, ValueError):
+                continue
+            # BFS finds a shortest solution
+            if solution and solution[0].depth + 1 == depth:
+                corpus[f"random_{depth}_{found}"] = (colors, goal_color, depth)
+                found += 1
+    return corpus
+
+
+@dataclass
+class Measurement:
+    seconds: float
+    """Best wall time to the first solution (or to giving up)."""
+    states: int
+    states_per_second: float
+    peak_rss_kib: int
+    moves: int | None
+    """Presses in the solution found, None if there wasn't one."""
+
+
+def _peak_rss_kib() -> int:
+    # ru_maxrss survives exec on Linux, so it can be the parent's; the high water mark doesn't
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _measure(conn: Connection, spec: tuple[list[Color], Color, int], repeat: int, options: dict[str, Any]) -> None:
+    colors, goal_color, max_depth = spec
+    stats = SolveStats()
+    solution = None
+
+    def run() -> None:
+        nonlocal solution
+        try:
+            solution = solve(Grid(list(colors), None), corners(goal_color), max_depth, stats=stats, **options)
+        except Unsolvable:
+            solution = None
+
+    seconds = timed(run, repeat)
+    conn.send(Measurement(
+        seconds=seconds,
+        states=stats.states_explored,
+        states_per_second=stats.states_explored / seconds if seconds else 0.0,
+        peak_rss_kib=_peak_rss_kib(),
+        moves=solution[0].depth + 1 if solution else None,
+    ))
+    conn.close()
+
+
+def measure(spec: tuple[list[Color], Color, int], repeat: int = 3, **options: Any) -> Measurement:
+    """Times ``solve()`` on a puzzle in a fresh process; ``options`` are passed on to ``solve()``."""
+    # spawn, so the child's peak RSS isn't the parent's
+    context = mp.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure, args=(sender, spec, repeat, options))
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    finally:
+        receiver.close()
+        process.join()
+
+
+def regressions(results: dict[str, dict[str, Any]], baseline: dict[str, dict[str, Any]], tolerance: float) -> list[str]:
+    """What got worse against the baseline: slower than ``tolerance`` allows, or different results."""
+    problems = []
+    for name, result in results.items():
+        if (before := baseline.get(name)) is None:
+            continue
+        if result["seconds"] > before["seconds"] * (1 + tolerance):
+            problems.append(f"{name}: {before['seconds']:.3f}s -> {result['seconds']:.3f}s")
+        if result["moves"] != before["moves"]:
+            problems.append(f"{name}: solution {before['moves']} -> {result['moves']} moves")
+        if result["states"] != before["states"]:
+            problems.append(f"{name}: {before['states']} -> {result['states']} states explored")
+    return problems
+
+
+def corpus(
+    names: list[str],
+    depths: list[int],
+    per_depth: int,
+    seed: int,
+    repeat: int,
+    options: dict[str, Any],
+    save: str | None,
+    baseline: str | None,
+    tolerance: float,
+) -> bool:
+    """Benchmarks the puzzles, printing a table. Returns False if there were regressions against ``baseline``."""
+    specs = {name: PUZZLES[name] for name in names}
+    specs.update(random_corpus(depths, per_depth, seed))
+
+    results = {}
+    print(f"{'puzzle':<20} {'seconds':>9} {'states':>8} {'states/s':>10} {'rss KiB':>9} {'moves':>5}")
+    for name, spec in specs.items():
+        result = measure(spec, repeat, **options)
+        results[name] = asdict(result)
+        moves = "-" if result.moves is None else result.moves
+        print(
+            f"{name:<20} {result.seconds:>9.3f} {result.states:>8} {result.states_per_second:>10.0f}"
+            f" {result.peak_rss_kib:>9} {moves:>5}"
+        )
+
+    if save:
+        with open(save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if baseline:
+        with open(baseline) as file:
+            problems = regressions(results, json.load(file), tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        return not problems
+    return True
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scaling_parser = commands.add_parser("scaling", help="parallel BFS speedup per worker count")
+    scaling_parser.add_argument("puzzles", nargs="*", default=["fenn", "rough_draft_white", "rough_draft_red"])
+    scaling_parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[n for n in (2, 4, 8, 16, 32) if n <= (os.cpu_count() or 1)] or [2],
+    )
+    scaling_parser.add_argument("--repeat", type=int, default=3)
+
+    backends_parser = commands.add_parser("backends", help="press throughput and solve time per backend")
+    backends_parser.add_argument("puzzles", nargs="*", default=["fenn", "rough_draft_white", "rough_draft_red"])
+    backends_parser.add_argument("--backends", nargs="+", default=available(), help="the first is the speedup baseline")
+    backends_parser.add_argument("--size", type=int, default=5000, help="states pressed per puzzle")
+    backends_parser.add_argument("--repeat", type=int, default=3)
+
+    corpus_parser = commands.add_parser("corpus", help="time the known puzzles and random solvable rooms")
+    corpus_parser.add_argument("puzzles", nargs="*", default=list(PUZZLES))
+    corpus_parser.add_argument("--depths", type=int, nargs="*", default=[3, 5, 7], help="solution lengths of random rooms")
+    corpus_parser.add_argument("--per-depth", type=int, default=2, help="random rooms per depth")
+    corpus_parser.add_argument("--seed", type=int, default=0)
+    corpus_parser.add_argument("--repeat", type=int, default=3)
+    corpus_parser.add_argument("--backend", default="reference")
+    corpus_parser.add_argument("--strategy", default="bfs")
+    corpus_parser.add_argument("--save", help="write the results to this JSON file")
+    corpus_parser.add_argument("--baseline", help="JSON file from --save to compare against")
+    corpus_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction")
+
+    args = parser.parse_args(argv)
+    if args.command == "scaling":
+        scaling(args.puzzles, args.workers, args.repeat)
+    elif args.command == "backends":
+        throughput(args.puzzles, args.backends, args.size, args.repeat)
+    elif args.command == "corpus":
+        ok = corpus(
+            args.puzzles,
+            args.depths,
+            args.per_depth,
+            args.seed,
+            args.repeat,
+            {"backend": args.backend, "strategy": args.strategy},
+            args.save,
+            args.baseline,
+            args.tolerance,
+        )
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
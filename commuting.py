@@ -0,0 +1,79 @@
+"""Partial-order reduction: which presses commute, from the cells each press reads and writes.
+
+A press reads its own cell (its color picks the behavior) and the cells its behavior looks at, and
+writes the cells it may change. Blue also reads the center, whose color it borrows. Two presses
+commute when neither writes a cell the other reads. Then pressing them in either order leads to the
+same state, and each press behaves the same whichever goes first.
+
+So a search that has just pressed ``p`` can skip any press ``q`` that comes before ``p`` in press
+order and commutes with it. The state ``q`` then ``p`` is reached from the parent's other child
+instead, in the same number of presses, so no shortest solution is lost.
+"""
+
+from solver import ABOVE, BELOW, CENTER_INDEX, CYCLE_INDEXES, NEIGHBOR_INDEXES, OPPOSITE, ROWS, Color
+
+type Footprint = tuple[int, int]
+"""(cells read, cells written), as bit masks with bit ``i`` for cell index ``i``."""
+
+ALL_CELLS = (1 << 9) - 1
+CENTER_BIT = 1 << CENTER_INDEX
+
+
+def _mask(cells) -> int:
+    mask = 0
+    for cell in cells:
+        if cell is not None:
+            mask |= 1 << cell
+    return mask
+
+
+def _footprint(color: Color, index: int) -> Footprint:
+    own = 1 << index
+    match color:
+        case Color.PURPLE:
+            cells = _mask([index, BELOW[index]])
+            return cells, cells if BELOW[index] is not None else 0
+        case Color.YELLOW:
+            cells = _mask([index, ABOVE[index]])
+            return cells, cells if ABOVE[index] is not None else 0
+        case Color.GREEN:
+            cells = _mask([index, OPPOSITE[index]])
+            return cells, cells if OPPOSITE[index] is not None else 0
+        case Color.BLACK:
+            cells = _mask(ROWS[index])
+            return cells, cells
+        case Color.PINK:
+            cycle = _mask(CYCLE_INDEXES[index])
+            return own | cycle, cycle
+        case Color.WHITE:
+            cells = own | _mask(NEIGHBOR_INDEXES[index])
+            return cells, cells
+        case Color.ORANGE:
+            return own | _mask(NEIGHBOR_INDEXES[index]), own
+        case Color.RED:
+            # every white and black tile, wherever it is
+            return ALL_CELLS, ALL_CELLS
+    # gray, and blue copying blue, change nothing
+    return own, 0
+
+
+FOOTPRINTS = [[[(0, 0)] * 9 for _ in range(16)] for _ in range(16)]
+"""Footprint of a press by the center's color value, then the pressed cell's, then cell index."""
+for center in Color:
+    for color in Color:
+        for index in range(9):
+            if color is Color.BLUE:
+                reads, writes = _footprint(center, index)
+                FOOTPRINTS[center.value][color.value][index] = (reads | CENTER_BIT, writes)
+            else:
+                FOOTPRINTS[center.value][color.value][index] = _footprint(color, index)
+
+
+def footprint(color: int, index: int, center: int) -> Footprint:
+    """Footprint of pressing the cell, given its color value and the center's."""
+    return FOOTPRINTS[center][color][index]
+
+
+def commutes(a: Footprint, b: Footprint) -> bool:
+    """True if neither press writes a cell the other reads."""
+    return not (a[1] & b[0] or b[1] & a[0])
@@ -0,0 +1,258 @@
+"""Per-room expansion kernels: straight-line Python generated for the colors a room can contain.
+
+``solve_packed()`` dispatches every press through ``PACKED_BEHAVIORS`` and each behavior's general
+checks. But a room can only ever contain the colors ``reachable_colors()`` finds, and each cell's
+geometry is fixed. So ``kernel()`` generates one function that presses all nine cells of a state.
+For each cell, it branches only on the colors that can occur there and that can do something there,
+with the shifts, masks and neighbors written out as constants. Blue gets its center's behavior
+inlined the same way. Kernels are compiled once per color set and cached::
+
+    print(kernel_source(frozenset({Color.PURPLE, Color.YELLOW, Color.GRAY})))
+"""
+
+from functools import cache
+from typing import Callable
+
+from packed import (
+    BLACK_ROW,
+    CELL_MASK,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    pack,
+    pack_goal,
+    unpack,
+)
+from pruning import PruningIndex
+from reachability import reachable_colors
+from solver import (
+    ABOVE,
+    BELOW,
+    CENTER_INDEX,
+    CYCLE_INDEXES,
+    NEIGHBOR_INDEXES,
+    OPPOSITE,
+    ROWS,
+    Color,
+    Goal,
+    Grid,
+    Play,
+    PlayHistory,
+    Unsolvable,
+    cell_index,
+)
+from stats import SolveStats
+
+type Kernel = Callable[[PackedState], list[tuple[int, PackedState, bool]]]
+"""Every child of a state, in press order: (press index, new state, whether the press changed colors)."""
+
+GRAY, BLACK, WHITE = Color.GRAY.value, Color.BLACK.value, Color.WHITE.value
+
+
+def _mode(*colors: int) -> int | None:
+    """The most common color, or None if the top two are tied."""
+    counts = dict[int, int]()
+    for color in colors:
+        counts[color] = counts.get(color, 0) + 1
+    (color, count), *rest = sorted(counts.items(), key=lambda item: -item[1])
+    if rest and rest[0][1] == count:
+        return None
+    return color
+
+
+def _cell(index: int) -> str:
+    return f"(state >> {4 * index} & {CELL_MASK})"
+
+
+def _behavior(color: Color, press_index: int, index: int, colors: frozenset[Color]) -> list[str] | None:
+    """Lines appending the child of pressing the cell (whose color is ``c``) with this behavior, or
+    None if it can never change anything there."""
+    shift = 4 * index
+    recounted = color.value in RECOUNTING
+    append = f"children.append(({press_index}, {{}}, {recounted}))"
+
+    match color:
+        case Color.PURPLE | Color.YELLOW | Color.GREEN:
+            other = {Color.PURPLE: BELOW, Color.YELLOW: ABOVE, Color.GREEN: OPPOSITE}[color][index]
+            if other is None:
+                return None
+            return [
+                f"d = (state >> {shift} ^ state >> {4 * other}) & {CELL_MASK}",
+                "if d:",
+                "    " + append.format(f"state ^ d << {shift} ^ d << {4 * other}"),
+            ]
+        case Color.BLACK:
+            row_shift = 4 * ROWS[index][0]
+            return [
+                f"row = state >> {row_shift} & {0xFFF}",
+                f"if row != {BLACK_ROW}:",
+                "    " + append.format(f"state ^ (row ^ ((row << 4 & {0xFFF}) | row >> 8)) << {row_shift}"),
+            ]
+        case Color.PINK:
+            cells = CYCLE_INDEXES[index]
+            mask = sum(CELL_MASK << (4 * i) for i in cells)
+            # each cell takes the color of the one before it (clockwise)
+            moved = " | ".join(f"v{k - 1 if k else len(cells) - 1} << {4 * i}" for k, i in enumerate(cells))
+            return [
+                *(f"v{k} = {_cell(i)}" for k, i in enumerate(cells)),
+                f"if not {' == '.join(f'v{k}' for k in range(len(cells)))}:",
+                "    " + append.format(f"state & ~{mask} | {moved}"),
+            ]
+        case Color.WHITE:
+            lines = [f"n = state & ~{CELL_MASK << shift} | {GRAY << shift}"]
+            for neighbor in NEIGHBOR_INDEXES[index]:
+                lines += [
+                    f"v = {_cell(neighbor)}",
+                    "if v == c:",
+                    f"    n ^= (c ^ {GRAY}) << {4 * neighbor}",
+                    f"elif v == {GRAY}:",
+                    f"    n ^= ({GRAY} ^ c) << {4 * neighbor}",
+                ]
+            return [*lines, append.format("n")]
+        case Color.ORANGE:
+            neighbors = ", ".join(_cell(neighbor) for neighbor in NEIGHBOR_INDEXES[index])
+            return [
+                f"m = _mode({neighbors})",
+                f"if m is not None and m != {GRAY} and m != c:",
+                "    " + append.format(f"state ^ (c ^ m) << {shift}"),
+            ]
+        case Color.RED:
+            if Color.WHITE not in colors and Color.BLACK not in colors:
+                return None
+            lines = ["n = state"]
+            for i in range(9):
+                lines.append(f"v = {_cell(i)}")
+                if Color.WHITE in colors:
+                    lines += [f"if v == {WHITE}:", f"    n ^= {(WHITE ^ BLACK) << (4 * i)}"]
+                if Color.BLACK in colors:
+                    keyword = "elif" if Color.WHITE in colors else "if"
+                    lines += [f"{keyword} v == {BLACK}:", f"    n ^= ({BLACK} ^ c) << {4 * i}"]
+            return [*lines, "if n != state:", "    " + append.format("n")]
+    # gray, and blue copying blue
+    return None
+
+
+def _branches(colors: frozenset[Color], variable: str, behaviors: Callable[[Color], list[str] | None]) -> list[str]:
+    """An if/elif chain on ``variable`` over the colors whose behavior can do something at the cell."""
+    lines = []
+    for color in sorted(colors, key=lambda color: color.value):
+        body = behaviors(color)
+        if body is None:
+            continue
+        lines.append(f"{'elif' if lines else 'if'} {variable} == {color.value}:  # {color.name.lower()}")
+        lines += ["    " + line for line in body]
+    return lines
+
+
+def _press(press_index: int, index: int, colors: frozenset[Color]) -> list[str]:
+    """The if/elif chain pressing one cell, on its color ``c``."""
+
+    def behaviors(color: Color) -> list[str] | None:
+        if color is not Color.BLUE:
+            return _behavior(color, press_index, index, colors)
+        if index == CENTER_INDEX:
+            # the center is blue, so blue copies blue
+            return None
+        # blue does what the center's color does, to this cell
+        return _branches(colors, "center", lambda center: _behavior(center, press_index, index, colors)) or None
+
+    return _branches(colors, "c", behaviors)
+
+
+def kernel_source(colors: frozenset[Color]) -> str:
+    """Source of the kernel for rooms that can only ever contain these colors."""
+    lines = ["def expand(state):", "    children = []"]
+    if Color.BLUE in colors:
+        lines.append(f"    center = state >> {4 * CENTER_INDEX} & {CELL_MASK}")
+
+    for press_index, (_, index) in enumerate(PRESS_ORDER):
+        if branches := _press(press_index, index, colors):
+            lines.append(f"    c = {_cell(index)}")
+            lines += ["    " + line for line in branches]
+
+    lines.append("    return children")
+    return "\n".join(lines) + "\n"
+
+
+@cache
+def kernel(colors: frozenset[Color]) -> Kernel:
+    """The compiled kernel for rooms that can only ever contain these colors."""
+    names = " ".join(sorted(color.name.lower() for color in colors))
+    namespace = {"_mode": _mode}
+    exec(compile(kernel_source(colors), f"<kernel {names}>", "exec"), namespace)
+    return namespace["expand"]
+
+
+def solve_kernel(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int = 10,
+    pruning: PruningIndex | None = None,
+    stats: SolveStats | None = None,
+) -> tuple[Play, Grid] | None:
+    """``solve_packed()``, expanding states with the room's kernel. Returns the same Play."""
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    expand = kernel(reachable_colors(frozenset(grid.colors)))
+    goal_mask, goal_value = pack_goal(goal)
+    goal_cells = [(4 * cell_index(pos), color.value) for pos, color in goal]
+
+    def goals_remaining(state: PackedState) -> int:
+        return sum(1 for shift, value in goal_cells if (state >> shift) & CELL_MASK != value)
+
+    start = pack(grid.colors)
+    history = PlayHistory()
+    # (history entry, state)
+    current_generation: list[tuple[int, PackedState]] = [(PlayHistory.ROOT, start)]
+    next_generation = []
+    depth = 0
+    played_states = {start}
+
+    max_depth_reached = 0
+
+    if pruning is None:
+        pruning = PruningIndex(goal, grid.colors)
+    total_impossibles = 0
+
+    while current_generation:
+        entry, state = current_generation.pop()
+
+        for press_index, new_state, recounted in expand(state):
+            if new_state & goal_mask == goal_value:
+                if stats is not None:
+                    stats.states_explored, stats.depth_limited, stats.impossibles = (
+                        len(played_states), max_depth_reached, total_impossibles,
+                    )
+                return history.next(entry, press_index), Grid(unpack(new_state), None)
+
+            if new_state in played_states:
+                continue
+
+            played_states.add(new_state)
+
+            if pruning.prunes_packed(new_state, recounted):
+                total_impossibles += 1
+                continue
+
+            if depth >= max_depth:
+                max_depth_reached += 1
+                continue
+
+            next_generation.append((history.add(entry, press_index), new_state))
+
+        if not current_generation and next_generation:
+            current_generation = next_generation
+            next_generation = []
+            current_generation.sort(key=lambda s: -goals_remaining(s[1]))
+            depth += 1
+
+    if stats is not None:
+        stats.states_explored, stats.depth_limited, stats.impossibles = (
+            len(played_states), max_depth_reached, total_impossibles,
+        )
+
+    if not max_depth_reached:
+        raise Unsolvable(f"No solution found within max depth; {len(played_states)} unique states explored.")
+
+    return None
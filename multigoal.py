@@ -0,0 +1,112 @@
+"""Solve one room for several goals in a single search.
+
+Asking ``solve()`` about each candidate goal (``corners(color)`` for every color present, mixed
+corners, ...) repeats the same BFS per goal. ``solve_goals()`` runs it once over packed states and
+checks every new state against the goals still outstanding. Goals are indexed by the color of one of
+their cells, so a state is only compared against the goals that color could satisfy, usually one::
+
+    goals = [corners(color) for color in set(grid.colors) - {Color.GRAY}]
+    for goal, solution in zip(goals, solve_goals(grid, goals)):
+        ...
+"""
+
+from collections import defaultdict
+from typing import Iterable
+
+from packed import (
+    BLUE,
+    CELL_MASK,
+    CENTER_SHIFT,
+    PACKED_BEHAVIORS,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    cell_index,
+    pack,
+    pack_goal,
+    unpack,
+)
+from pruning import PruningIndex
+from solver import Goal, Grid, Play, PlayHistory
+
+
+def solve_goals(grid: Grid, goals: Iterable[Goal], max_depth: int = 10) -> list[tuple[Play, Grid] | None]:
+    """A shortest Play for each goal, in the order given, from one BFS.
+
+    A goal gets None if it has no solution within ``max_depth``, or none at all. The search stops
+    once every goal is solved or out of reach: a goal is given up on when no queued state can still
+    reach it (see ``PruningIndex``). The Play for a goal is as short as ``solve()``'s, though not
+    always the same one, since ``solve()`` orders each generation by its own goal.
+    """
+    goals = list(goals)
+    if any(grid.meets_goal(goal) for goal in goals):
+        raise ValueError("Grid already meets goal")
+
+    # goal index -> (mask, value); key cell and color value -> indexes of goals with that color there
+    packed_goals = [pack_goal(goal) for goal in goals]
+    by_key = defaultdict[tuple[int, int], list[int]](list)
+    for i, goal in enumerate(goals):
+        index = min(cell_index(pos) for pos, _ in goal)
+        by_key[4 * index, packed_goals[i][1] >> (4 * index) & CELL_MASK].append(i)
+    key_shifts = sorted({shift for shift, _ in by_key})
+
+    prunings = [PruningIndex(goal, grid.colors) for goal in goals]
+    behaviors = PACKED_BEHAVIORS
+
+    start = pack(grid.colors)
+    solutions: list[tuple[Play, Grid] | None] = [None] * len(goals)
+    # goals neither solved nor given up on; like solve(), the start's counts aren't checked
+    outstanding = {i for i, pruning in enumerate(prunings) if not pruning.prunes_packed(start, False)}
+
+    history = PlayHistory()
+    # (history entry, state)
+    current_generation: list[tuple[int, PackedState]] = [(PlayHistory.ROOT, start)]
+    played_states = {start}
+    depth = 0
+
+    while current_generation and outstanding:
+        next_generation = []
+        # goals some queued state can still reach
+        reachable = set[int]()
+        for entry, state in current_generation:
+            center_color = (state >> CENTER_SHIFT) & CELL_MASK
+            for press_index, (_, index) in enumerate(PRESS_ORDER):
+                color = (state >> (4 * index)) & CELL_MASK
+                new_state = behaviors[color](index, state)
+                if new_state is None:
+                    continue
+
+                for shift in key_shifts:
+                    for i in by_key.get((shift, (new_state >> shift) & CELL_MASK), ()):
+                        mask, value = packed_goals[i]
+                        if i in outstanding and new_state & mask == value:
+                            outstanding.discard(i)
+                            solutions[i] = history.next(entry, press_index), Grid(unpack(new_state), None)
+
+                if new_state in played_states:
+                    continue
+                played_states.add(new_state)
+                if depth >= max_depth:
+                    continue
+
+                # same pruning as the reference: counts are only rebuilt after a press that changed colors
+                recounted = (center_color if color == BLUE else color) in RECOUNTING
+                keep = False
+                for i in outstanding:
+                    # once the state is kept, only goals no other state reaches yet are worth checking
+                    if keep and i in reachable:
+                        continue
+                    if not prunings[i].prunes_packed(new_state, recounted):
+                        keep = True
+                        reachable.add(i)
+                if keep:
+                    next_generation.append((history.add(entry, press_index), new_state))
+
+            if not outstanding:
+                break
+
+        outstanding &= reachable
+        current_generation = next_generation
+        depth += 1
+
+    return solutions
@@ -0,0 +1,376 @@
+"""Packed grid states: 9 cells of 4 bits each in a single int.
+
+Cell ``i`` (in ``Grid.colors`` order) lives in bits ``4*i`` to ``4*i + 3`` and holds ``Color.value``.
+Every color behavior has a bit-twiddling twin here that takes a cell index and a packed state and
+returns the new packed state, or None if the press changes nothing.
+"""
+
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from solver import (
+    CYCLE_INDEXES,
+    GRID_POSITIONS,
+    NEIGHBOR_INDEXES,
+    Color,
+    Goal,
+    Grid,
+    Play,
+    PlayHistory,
+    TransitionCache,
+    Unsolvable,
+    cell_index,
+)
+from stats import SolveStats
+
+if TYPE_CHECKING:
+    from pruning import PruningIndex
+
+type PackedState = int
+"""Hashable grid state: cell colors packed 4 bits apiece."""
+
+CELL_MASK = 0xF
+ROW_MASK = 0xFFF
+
+GRAY = Color.GRAY.value
+RED = Color.RED.value
+BLACK = Color.BLACK.value
+GREEN = Color.GREEN.value
+YELLOW = Color.YELLOW.value
+PURPLE = Color.PURPLE.value
+WHITE = Color.WHITE.value
+BLUE = Color.BLUE.value
+ORANGE = Color.ORANGE.value
+PINK = Color.PINK.value
+
+COLORS_BY_VALUE = {color.value: color for color in Color}
+
+BLACK_ROW = BLACK * 0x111
+CENTER_SHIFT = 4 * 4
+
+
+PRESS_ORDER = [(position, cell_index(position)) for position in GRID_POSITIONS]
+"""Positions with their cell index, in the order ``solve()`` tries them."""
+
+RECOUNTING = {RED, WHITE, ORANGE}
+"""Behaviors that change colors, after which the possible color counts must be rebuilt."""
+
+
+def pack(colors: Iterable[Color]) -> PackedState:
+    state = 0
+    for i, color in enumerate(colors):
+        state |= color.value << (4 * i)
+    return state
+
+
+def unpack(state: PackedState) -> list[Color]:
+    return [COLORS_BY_VALUE[(state >> (4 * i)) & CELL_MASK] for i in range(9)]
+
+
+def pack_goal(goal: Goal) -> tuple[int, int]:
+    """Returns (mask, value) such that a state meets the goal iff ``state & mask == value``."""
+    mask = value = 0
+    for position, color in goal:
+        shift = 4 * cell_index(position)
+        mask |= CELL_MASK << shift
+        value |= color.value << shift
+    return mask, value
+
+
+type PackedBehavior = Callable[[int, PackedState], PackedState | None]
+
+PACKED_BEHAVIORS: list[PackedBehavior] = [lambda index, state: None] * (max(COLORS_BY_VALUE) + 1)
+"""Packed behaviors, indexed by ``Color.value``."""
+
+
+def _swap(state: PackedState, i: int, j: int) -> PackedState | None:
+    diff = ((state >> (4 * i)) ^ (state >> (4 * j))) & CELL_MASK
+    if not diff:
+        return None
+    return state ^ (diff << (4 * i)) ^ (diff << (4 * j))
+
+
+def purple(index: int, state: PackedState) -> PackedState | None:
+    if index >= 6:
+        return None
+    return _swap(state, index, index + 3)
+
+
+PACKED_BEHAVIORS[PURPLE] = purple
+
+
+def yellow(index: int, state: PackedState) -> PackedState | None:
+    if index < 3:
+        return None
+    return _swap(state, index, index - 3)
+
+
+PACKED_BEHAVIORS[YELLOW] = yellow
+
+
+def green(index: int, state: PackedState) -> PackedState | None:
+    if index == 4:
+        return None
+    return _swap(state, index, 8 - index)
+
+
+PACKED_BEHAVIORS[GREEN] = green
+
+
+def red(index: int, state: PackedState) -> PackedState | None:
+    pressed_color = (state >> (4 * index)) & CELL_MASK
+    new_state = state
+    for shift in range(0, 36, 4):
+        color = (state >> shift) & CELL_MASK
+        if color == WHITE:
+            new_state ^= (WHITE ^ BLACK) << shift
+        elif color == BLACK:
+            new_state ^= (BLACK ^ pressed_color) << shift
+
+    # no whites or blacks to change (the pressed color is never white or black)
+    if new_state == state:
+        return None
+    return new_state
+
+
+PACKED_BEHAVIORS[RED] = red
+
+
+def black(index: int, state: PackedState) -> PackedState | None:
+    shift = 12 * (index // 3)
+    row = (state >> shift) & ROW_MASK
+    if row == BLACK_ROW:
+        return None
+
+    # rotate right: the last cell wraps around to the first
+    rotated = ((row << 4) & ROW_MASK) | (row >> 8)
+    return state ^ ((row ^ rotated) << shift)
+
+
+PACKED_BEHAVIORS[BLACK] = black
+
+
+def white(index: int, state: PackedState) -> PackedState | None:
+    shift = 4 * index
+    color = (state >> shift) & CELL_MASK
+
+    # blank out this position
+    new_state = state & ~(CELL_MASK << shift) | (GRAY << shift)
+    for neighbor in NEIGHBOR_INDEXES[index]:
+        neighbor_shift = 4 * neighbor
+        neighbor_color = (state >> neighbor_shift) & CELL_MASK
+        if neighbor_color == color:
+            new_state ^= (color ^ GRAY) << neighbor_shift
+        elif neighbor_color == GRAY:
+            new_state ^= (GRAY ^ color) << neighbor_shift
+
+    return new_state
+
+
+PACKED_BEHAVIORS[WHITE] = white
+
+
+def blue(index: int, state: PackedState) -> PackedState | None:
+    center_color = (state >> CENTER_SHIFT) & CELL_MASK
+
+    # base case: copying blue is no-op
+    if center_color == BLUE:
+        return None
+
+    return PACKED_BEHAVIORS[center_color](index, state)
+
+
+PACKED_BEHAVIORS[BLUE] = blue
+
+
+def orange(index: int, state: PackedState) -> PackedState | None:
+    neighbor_counts = Counter((state >> (4 * n)) & CELL_MASK for n in NEIGHBOR_INDEXES[index])
+    (color, count), *rest = neighbor_counts.most_common(2)
+
+    # tied for most common: no change
+    if rest and rest[0][1] == count:
+        return None
+
+    shift = 4 * index
+    my_color = (state >> shift) & CELL_MASK
+    if color == GRAY or color == my_color:
+        return None
+
+    return state ^ ((my_color ^ color) << shift)
+
+
+PACKED_BEHAVIORS[ORANGE] = orange
+
+
+def pink(index: int, state: PackedState) -> PackedState | None:
+    cells = CYCLE_INDEXES[index]
+    to_cycle = [(state >> (4 * i)) & CELL_MASK for i in cells]
+    if all(c == to_cycle[0] for c in to_cycle):
+        return None
+
+    # each cell takes the color of the one before it (clockwise)
+    new_state = state
+    for i, before in zip(cells, [to_cycle[-1], *to_cycle[:-1]]):
+        new_state ^= (((state >> (4 * i)) & CELL_MASK) ^ before) << (4 * i)
+    return new_state
+
+
+PACKED_BEHAVIORS[PINK] = pink
+
+
+def behavior_color(index: int, state: PackedState) -> int:
+    """The color value whose behavior a press at index runs (blue runs the center's)."""
+    color = (state >> (4 * index)) & CELL_MASK
+    if color == BLUE:
+        return (state >> CENTER_SHIFT) & CELL_MASK
+    return color
+
+
+def press_packed(index: int, state: PackedState) -> PackedState | None:
+    """Returns the state updated by pressing the cell, or None if no change was made."""
+    return PACKED_BEHAVIORS[(state >> (4 * index)) & CELL_MASK](index, state)
+
+
+def play_from_parents(parents: list[list[tuple[int, int]]], ordinal: int, press_index: int) -> Play:
+    """Rebuilds the Play for a press of the state at ``ordinal`` in the latest generation.
+
+    ``parents`` holds, per generation after the first, each state's (parent ordinal, press index).
+    """
+    presses = [press_index]
+    for generation in reversed(parents):
+        ordinal, press_index = generation[ordinal]
+        presses.append(press_index)
+
+    play = None
+    for press_index in reversed(presses):
+        position = PRESS_ORDER[press_index][0]
+        play = play.next(position) if play else Play(None, position)
+    return play
+
+
+def solve_packed(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int = 10,
+    transitions: TransitionCache | None = None,
+    pruning: "PruningIndex | None" = None,
+    symmetry: bool = False,
+    stats: SolveStats | None = None,
+    skip_commuting: bool = False,
+) -> tuple[Play, Grid] | None:
+    """``solve()`` over packed states.
+
+    Explores states in exactly the same order as the reference ``solve()``, so returns the same Play.
+    """
+    from pruning import PruningIndex
+
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    goal_mask, goal_value = pack_goal(goal)
+    goal_cells = [(4 * cell_index(pos), color.value) for pos, color in goal]
+
+    def goals_remaining(state: PackedState) -> int:
+        return sum(1 for shift, value in goal_cells if (state >> shift) & CELL_MASK != value)
+
+    canonical = None
+    if symmetry:
+        from symmetry import Symmetries
+
+        if symmetries := Symmetries(goal, grid.colors):
+            canonical = symmetries.canonical
+
+    start = pack(grid.colors)
+    history = PlayHistory()
+    # (history entry, state)
+    current_generation: list[tuple[int, PackedState]] = [(PlayHistory.ROOT, start)]
+    next_generation = []
+    depth = 0
+    played_states = {canonical(start) if canonical else start}
+
+    max_depth_reached = 0
+
+    if pruning is None:
+        pruning = PruningIndex(goal, grid.colors)
+    total_impossibles = 0
+
+    # by history entry: the footprint of the press that led to the entry's state
+    footprints = None
+    if skip_commuting:
+        from commuting import FOOTPRINTS
+
+        footprints = list[tuple[int, int]]()
+    skipped = 0
+
+    behaviors = PACKED_BEHAVIORS
+    cached_press = transitions.press_packed if transitions is not None else None
+
+    while current_generation:
+        entry, state = current_generation.pop()
+        center_color = (state >> CENTER_SHIFT) & CELL_MASK
+        last = None
+        if footprints is not None:
+            center_footprints = FOOTPRINTS[center_color]
+            if entry != PlayHistory.ROOT:
+                last, last_footprint = history.presses[entry], footprints[entry]
+
+        for press_index, (_, index) in enumerate(PRESS_ORDER):
+            color = (state >> (4 * index)) & CELL_MASK
+            if footprints is not None:
+                press_footprint = center_footprints[color][index]
+                # pressed the other way round from the parent, in press order, and neither writes what
+                # the other reads
+                if (
+                    last is not None and press_index < last
+                    and not (press_footprint[1] & last_footprint[0] or last_footprint[1] & press_footprint[0])
+                ):
+                    skipped += 1
+                    continue
+
+            new_state = cached_press(index, state) if cached_press else behaviors[color](index, state)
+            if new_state is None:
+                continue
+
+            if new_state & goal_mask == goal_value:
+                if stats is not None:
+                    stats.states_explored, stats.depth_limited, stats.impossibles = (
+                        len(played_states), max_depth_reached, total_impossibles,
+                    )
+                    stats.skipped_commuting = skipped
+                return history.next(entry, press_index), Grid(unpack(new_state), None)
+
+            key = canonical(new_state) if canonical else new_state
+            if key in played_states:
+                continue
+
+            played_states.add(key)
+
+            # same pruning as the reference: counts are only rebuilt after a press that changed colors
+            if pruning.prunes_packed(new_state, (center_color if color == BLUE else color) in RECOUNTING):
+                total_impossibles += 1
+                continue
+
+            if depth >= max_depth:
+                max_depth_reached += 1
+                continue
+
+            next_generation.append((history.add(entry, press_index), new_state))
+            if footprints is not None:
+                footprints.append(press_footprint)
+
+        if not current_generation and next_generation:
+            current_generation = next_generation
+            next_generation = []
+            current_generation.sort(key=lambda s: -goals_remaining(s[1]))
+            depth += 1
+
+    if stats is not None:
+        stats.states_explored, stats.depth_limited, stats.impossibles = (
+            len(played_states), max_depth_reached, total_impossibles,
+        )
+        stats.skipped_commuting = skipped
+
+    if not max_depth_reached:
+        raise Unsolvable(f"No solution found within max depth; {len(played_states)} unique states explored.")
+
+    return None
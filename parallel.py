@@ -0,0 +1,189 @@
+"""Multi-process BFS: each generation is expanded in shards, and every worker owns a hash partition
+of the visited states, so duplicates are dropped without a shared set or a lock.
+
+Workers expand contiguous slices of the generation in the order the serial search would pop them,
+and children travel to their owners still tagged with (parent ordinal, press), so each owner keeps
+exactly the copy the serial search would have seen first. The result is the same Play ``solve()``
+returns.
+"""
+
+import heapq
+import multiprocessing as mp
+from multiprocessing.connection import Connection
+
+from packed import (
+    CELL_MASK,
+    CENTER_SHIFT,
+    BLUE,
+    PACKED_BEHAVIORS,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    cell_index,
+    pack,
+    pack_goal,
+    play_from_parents,
+    unpack,
+)
+from pruning import PruningIndex
+from solver import Color, Goal, Grid, Play, Unsolvable
+from stats import SolveStats
+
+# (parent ordinal, press index, state, whether the press changed colors)
+type Child = tuple[int, int, PackedState, bool]
+
+
+def owner(state: PackedState, workers: int) -> int:
+    """The worker whose shard of the visited set holds this state."""
+    # the low bits are just the first cell's color, so mix before partitioning
+    return ((state * 0x9E3779B97F4A7C15) >> 29 & 0xFFFFFFFF) % workers
+
+
+def _worker(conn: Connection, goal: Goal, colors: list[Color], max_depth: int, workers: int) -> None:
+    goal_mask, goal_value = pack_goal(goal)
+    pruning = PruningIndex(goal, colors)
+    behaviors = PACKED_BEHAVIORS
+
+    played_states = set[PackedState]()
+    max_depth_reached = 0
+    total_impossibles = 0
+
+    while (message := conn.recv()) is not None:
+        match message:
+            case ("seed", state):
+                played_states.add(state)
+
+            case ("expand", offset, states):
+                buckets: list[list[Child]] = [[] for _ in range(workers)]
+                found = None
+                for ordinal, state in enumerate(states, start=offset):
+                    center_color = (state >> CENTER_SHIFT) & CELL_MASK
+                    for press_index, (_, index) in enumerate(PRESS_ORDER):
+                        color = (state >> (4 * index)) & CELL_MASK
+                        new_state = behaviors[color](index, state)
+                        if new_state is None:
+                            continue
+                        if new_state & goal_mask == goal_value:
+                            found = (ordinal, press_index)
+                            break
+                        recounted = (center_color if color == BLUE else color) in RECOUNTING
+                        buckets[owner(new_state, workers)].append((ordinal, press_index, new_state, recounted))
+                    if found:
+                        # nothing later in this slice can come first
+                        break
+                conn.send((found, buckets))
+
+            case ("dedup", depth, children):
+                survivors = []
+                for ordinal, press_index, state, recounted in children:
+                    if state in played_states:
+                        continue
+                    played_states.add(state)
+                    if pruning.prunes_packed(state, recounted):
+                        total_impossibles += 1
+                        continue
+                    if depth >= max_depth:
+                        max_depth_reached += 1
+                        continue
+                    survivors.append((ordinal, press_index, state))
+                conn.send(survivors)
+
+            case ("stats",):
+                conn.send((len(played_states), max_depth_reached, total_impossibles))
+
+
+def solve_parallel(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int = 10,
+    workers: int = 2,
+    stats: SolveStats | None = None,
+) -> tuple[Play, Grid] | None:
+    """``solve()`` with each generation expanded across ``workers`` processes."""
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    goal_cells = [(4 * cell_index(pos), color.value) for pos, color in goal]
+
+    def goals_remaining(state: PackedState) -> int:
+        return sum(1 for shift, value in goal_cells if (state >> shift) & CELL_MASK != value)
+
+    context = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    connections = []
+    processes = []
+    for _ in range(workers):
+        parent_end, child_end = context.Pipe()
+        process = context.Process(
+            target=_worker,
+            args=(child_end, goal, grid.colors, max_depth, workers),
+            daemon=True,
+        )
+        process.start()
+        connections.append(parent_end)
+        processes.append(process)
+
+    try:
+        start = pack(grid.colors)
+        connections[owner(start, workers)].send(("seed", start))
+
+        # states of the current generation in the order the serial search pops them
+        generation = [start]
+        # per generation: (parent ordinal, press index) of each state, aligned with ``generation``
+        parents = list[list[tuple[int, int]]]()
+
+        depth = 0
+        while generation:
+            chunk = -(-len(generation) // workers)
+            for w, conn in enumerate(connections):
+                conn.send(("expand", w * chunk, generation[w * chunk:(w + 1) * chunk]))
+            replies = [conn.recv() for conn in connections]
+
+            found = min((found for found, _ in replies if found), default=None)
+            if found:
+                _collect_stats(connections, stats)
+                play = play_from_parents(parents, *found)
+                final = _press_path(start, play)
+                return play, Grid(unpack(final), None)
+
+            for o, conn in enumerate(connections):
+                # slices were handed out in order, so this is already sorted by (ordinal, press)
+                conn.send(("dedup", depth, [child for _, buckets in replies for child in buckets[o]]))
+            survivors = list(heapq.merge(*(conn.recv() for conn in connections)))
+
+            survivors.sort(key=lambda s: -goals_remaining(s[2]))
+            survivors.reverse()
+            generation = [state for _, _, state in survivors]
+            parents.append([(ordinal, press_index) for ordinal, press_index, _ in survivors])
+            depth += 1
+
+        played, max_depth_reached, _ = _collect_stats(connections, stats)
+    finally:
+        for conn in connections:
+            conn.send(None)
+        for process in processes:
+            process.join()
+
+    if not max_depth_reached:
+        raise Unsolvable(f"No solution found within max depth; {played} unique states explored.")
+
+    return None
+
+
+def _collect_stats(connections: list[Connection], stats: SolveStats | None) -> tuple[int, int, int]:
+    """Sums the workers' (states explored, depth limited, impossibles) counters."""
+    for conn in connections:
+        conn.send(("stats",))
+    totals = tuple(map(sum, zip(*(conn.recv() for conn in connections))))
+    if stats is not None:
+        stats.states_explored, stats.depth_limited, stats.impossibles = totals
+    return totals
+
+
+def _press_path(state: PackedState, play: Play) -> PackedState:
+    presses = []
+    while play:
+        presses.append(cell_index(play.press))
+        play = play.previous
+    for index in reversed(presses):
+        state = PACKED_BEHAVIORS[(state >> (4 * index)) & CELL_MASK](index, state)
+    return state
@@ -0,0 +1,81 @@
+"""Goal-specific pruning: reject states from which the goal is provably out of reach."""
+
+from collections import Counter
+from typing import Iterable
+
+from reachability import INF, creatable, move_distances, reachable_colors
+from solver import COLORS_BY_VALUE, Color, Goal, Grid, cell_index, goal_still_reachable, possible_tally_colors
+
+COUNTS = "color counts"
+"""Rule: fewer tiles of a goal color can ever exist than the goal needs (``goal_still_reachable()``)."""
+
+REACH = "goal reach"
+"""Rule: no tile of a goal color sits anywhere that can ever move to a goal cell needing it."""
+
+
+class PruningIndex:
+    """Precomputed per-goal-cell source cells, plus per-rule prune counts.
+
+    For every goal cell, the cells whose tile could ever be moved there given the colors the room
+    can contain (see ``reachability.py``): purple only drops, yellow only rises, green only hops to
+    the opposite cell, and so on. A state with no tile of the goal color on any of those cells is
+    pruned. Goal colors that a recolor press could create from scratch are never pruned this way.
+    """
+
+    def __init__(self, goal: Goal, colors: Iterable[Color]) -> None:
+        self.goal_counts = Counter(color for _, color in goal)
+        self.pruned = Counter[str]()
+
+        reachable = reachable_colors(frozenset(colors))
+
+        # (goal cell, goal color, cells that can feed it)
+        self.sources = list[tuple[int, Color, tuple[int, ...]]]()
+        for position, color in goal:
+            if creatable(color, reachable):
+                continue
+            target = cell_index(position)
+            distances = move_distances(color, reachable)
+            self.sources.append((
+                target,
+                color,
+                tuple(source for source in range(9) if distances[source][target] < INF),
+            ))
+
+    def prunes(self, grid: Grid) -> bool:
+        """True if the goal is unreachable from the grid. Clears ``grid.counts`` once checked."""
+        if grid.counts:
+            if not goal_still_reachable(grid.counts, self.goal_counts):
+                self.pruned[COUNTS] += 1
+                return True
+            # clear counts until next recount
+            grid.counts = None
+
+        colors = grid.colors
+        for target, color, sources in self.sources:
+            if colors[target] is color:
+                continue
+            if not any(colors[source] is color for source in sources):
+                self.pruned[REACH] += 1
+                return True
+
+        return False
+
+    def prunes_packed(self, state: int, recounted: bool) -> bool:
+        """``prunes()`` for a packed state; ``recounted`` if a color-changing press produced it."""
+        if recounted:
+            counts = [0] * len(COLORS_BY_VALUE)
+            for shift in range(0, 36, 4):
+                counts[(state >> shift) & 0xF] += 1
+            if not goal_still_reachable(possible_tally_colors(tuple(counts)), self.goal_counts):
+                self.pruned[COUNTS] += 1
+                return True
+
+        for target, color, sources in self.sources:
+            value = color.value
+            if (state >> (4 * target)) & 0xF == value:
+                continue
+            if not any((state >> (4 * source)) & 0xF == value for source in sources):
+                self.pruned[REACH] += 1
+                return True
+
+        return False
@@ -0,0 +1,103 @@
+"""Visited sets as bitmaps, for rooms whose presses only ever rearrange the starting colors.
+
+Without white, red, orange or blue tiles no press changes a color, so every reachable state is an
+arrangement of the starting multiset of colors. Ranking arrangements in lexicographic order is a
+perfect hash onto ``0 .. 9! / (k1! k2! ...) - 1``, so the visited set fits in that many bits (at
+most 45KB) and a lookup is a rank plus a bit probe.
+
+The rank of an arrangement sums, cell by cell, the arrangements of the remaining colors that start
+with a smaller color than this cell's. Those sums depend only on which colors remain, and there are
+at most 2**9 sub-multisets of nine tiles, so they are tabulated up front.
+"""
+
+import itertools as it
+import sys
+from math import factorial, prod
+from typing import Iterable, Sequence
+
+from solver import Color
+
+RECOLORING = frozenset({Color.WHITE, Color.RED, Color.ORANGE, Color.BLUE})
+"""Colors whose presses can change colors (blue may borrow one of the others' behaviors)."""
+
+# cells last to first, by packed shift
+SHIFTS = range(32, -4, -4)
+
+
+def permutation_only(colors: Iterable[Color]) -> bool:
+    """True if no press can change the room's colors, only move them."""
+    return not RECOLORING.intersection(colors)
+
+
+class VisitedPermutations:
+    """A set of the arrangements of one multiset of colors, one bit each.
+
+    Holds ranks: look states up as ``rank_colors(grid.colors)`` or ``rank_packed(state)``.
+    """
+
+    def __init__(self, colors: Sequence[Color]) -> None:
+        counts = [0] * 16
+        for color in colors:
+            counts[color.value] += 1
+        present = [value for value, count in enumerate(counts) if count]
+
+        # sub-multisets are numbered in mixed radix, one digit per color present
+        self._radix = [0] * 16
+        size = 1
+        for value in present:
+            self._radix[value] = size
+            size *= counts[value] + 1
+
+        # for sub-multiset code and color value: arrangements of the sub-multiset that start with a
+        # smaller color than the value
+        self._smaller = [0] * (size << 4)
+        for remaining in it.product(*(range(counts[value] + 1) for value in present)):
+            code = sum(n * self._radix[value] for n, value in zip(remaining, present))
+            total = sum(remaining)
+            below = 0
+            for n, value in zip(remaining, present):
+                self._smaller[code << 4 | value] = below
+                if n:
+                    # arrangements starting with this color: the rest arranged freely
+                    below += factorial(total - 1) * n // prod(factorial(m) for m in remaining)
+
+        self.capacity = factorial(len(colors)) // prod(factorial(counts[value]) for value in present)
+        """Number of distinct arrangements."""
+        self.bits = bytearray((self.capacity + 7) >> 3)
+        self.count = 0
+
+    def rank_colors(self, colors: Sequence[Color]) -> int:
+        """Lexicographic rank (by color value) of an arrangement."""
+        radix, smaller = self._radix, self._smaller
+        code = rank = 0
+        for color in reversed(colors):
+            # the plain attribute behind ``.value``, which is a much slower property
+            value = color._value_
+            code += radix[value]
+            rank += smaller[code << 4 | value]
+        return rank
+
+    def rank_packed(self, state: int) -> int:
+        """``rank_colors()`` of a packed state."""
+        radix, smaller = self._radix, self._smaller
+        code = rank = 0
+        for shift in SHIFTS:
+            value = (state >> shift) & 0xF
+            code += radix[value]
+            rank += smaller[code << 4 | value]
+        return rank
+
+    def add(self, rank: int) -> None:
+        bit = 1 << (rank & 7)
+        if not self.bits[rank >> 3] & bit:
+            self.bits[rank >> 3] |= bit
+            self.count += 1
+
+    def __contains__(self, rank: int) -> bool:
+        return bool(self.bits[rank >> 3] & (1 << (rank & 7)))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.bits) + sys.getsizeof(self._smaller)
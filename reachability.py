@@ -0,0 +1,99 @@
+"""Where can a color ever get to? Lower bounds on presses, per color and cell.
+
+A press moves every tile at most one step along a small, fixed set of edges (swaps, row rotations,
+pink cycles, white spreading), and which edges exist depends only on the colors that can appear.
+The distances on those edge graphs never overestimate the presses needed to bring a color into a
+cell, which makes them safe both as an A* heuristic and for pruning.
+"""
+
+from functools import cache
+
+from solver import CENTER, INDEX_POSITIONS, Color, Position, cell_index, cycle, neighbors
+
+INF = float("inf")
+
+
+def reachable_colors(colors: frozenset[Color] | set[Color] | list[Color]) -> frozenset[Color]:
+    """Every color that can ever appear in a grid starting from these colors."""
+    reachable = set(colors)
+    if Color.WHITE in reachable:
+        # whites (and blues copying white) blank themselves
+        reachable.add(Color.GRAY)
+        # reds turn whites black
+        if Color.RED in reachable:
+            reachable.add(Color.BLACK)
+    # everything else only ever recolors to a color already present
+    return frozenset(reachable)
+
+
+def creatable(color: Color, colors: frozenset[Color]) -> bool:
+    """True if a single press could make a new tile of this color anywhere, not just next to one."""
+    if Color.ORANGE in colors and color != Color.GRAY:
+        # oranges (and blues copying orange) take on a neighbor color
+        return True
+    match color:
+        case Color.GRAY:
+            return Color.WHITE in colors
+        case Color.BLACK:
+            return Color.RED in colors and Color.WHITE in colors
+        case Color.RED:
+            return Color.RED in colors and Color.BLACK in colors
+        case Color.BLUE:
+            return Color.BLUE in colors and Color.RED in colors and Color.BLACK in colors
+    return False
+
+
+@cache
+def move_edges(color: Color, colors: frozenset[Color]) -> tuple[frozenset[int], ...]:
+    """For each cell, the cells a tile of ``color`` can move to in one press."""
+    blue = Color.BLUE in colors
+    edges = [set[int]() for _ in range(9)]
+
+    for i, pos in enumerate(INDEX_POSITIONS):
+        below, above = i + 3, i - 3
+        if Color.PURPLE in colors:
+            # a pressed purple drops, the tile below it rises
+            if below < 9 and (color in (Color.PURPLE, Color.BLUE)):
+                edges[i].add(below)
+            if above >= 0 and (color != Color.PURPLE or blue):
+                edges[i].add(above)
+        if Color.YELLOW in colors:
+            if above >= 0 and (color in (Color.YELLOW, Color.BLUE)):
+                edges[i].add(above)
+            if below < 9 and (color != Color.YELLOW or blue):
+                edges[i].add(below)
+        if Color.GREEN in colors and pos != CENTER:
+            edges[i].add(cell_index(Position(-pos.x, -pos.y)))
+        if Color.BLACK in colors:
+            edges[i].add(cell_index(Position((pos.x + 2) % 3 - 1, pos.y)))
+        if Color.WHITE in colors and color in (Color.WHITE, Color.BLUE):
+            edges[i].update(cell_index(p) for p in neighbors(pos))
+
+    if Color.PINK in colors:
+        for pos in INDEX_POSITIONS:
+            ring = [cell_index(p) for p in cycle(pos)]
+            for a, b in zip(ring, ring[1:] + ring[:1]):
+                edges[a].add(b)
+
+    for i, targets in enumerate(edges):
+        targets.discard(i)
+    return tuple(frozenset(targets) for targets in edges)
+
+
+@cache
+def move_distances(color: Color, colors: frozenset[Color]) -> tuple[tuple[float, ...], ...]:
+    """``move_distances(color, colors)[source][target]``: minimum presses to move a tile."""
+    edges = move_edges(color, colors)
+    distances = []
+    for source in range(9):
+        row = [INF] * 9
+        row[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            frontier = [t for s in frontier for t in edges[s] if row[t] == INF]
+            for t in frontier:
+                row[t] = depth
+        distances.append(tuple(row))
+    return tuple(distances)
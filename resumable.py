@@ -0,0 +1,264 @@
+"""A breadth-first search that keeps its frontier and visited set between calls.
+
+``solve()`` returns None when it hits ``max_depth``, and a retry with a bigger budget starts over.
+A ``Solver`` instead picks up where it stopped, so going from depth 10 to 30 only pays for the
+new levels, and it can be checkpointed to disk and restored in between::
+
+    solver = Solver(grid, goal, max_depth=10)
+    if solver.run() is None:
+        solver.save("room.ckpt")
+        ...
+        solver = Solver.load("room.ckpt")
+        solver.extend_depth(30)
+        solution = solver.run()
+
+Checkpoints are plain data (packed states and the history arrays), never pickles, so loading one
+can't run code.
+"""
+
+import os
+import struct
+import sys
+from array import array
+from typing import Self
+
+from packed import (
+    CELL_MASK,
+    CENTER_SHIFT,
+    COLORS_BY_VALUE,
+    BLUE,
+    PACKED_BEHAVIORS,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    cell_index,
+    pack,
+    pack_goal,
+    unpack,
+)
+from pruning import PruningIndex
+from solver import GRID_POSITIONS, INDEX_POSITIONS, Goal, Grid, Play, PlayHistory, Unsolvable
+from stats import SolveStats
+
+CHECKPOINT_MAGIC = b"MJCK1"
+
+# magic, start state, goal mask and value, max depth, depth, impossibles, solution state; then the
+# lengths of the generation, the visited states, the history and the solution's presses
+_HEADER = struct.Struct("<5sQQQIIQQIIII")
+
+NO_SOLUTION = 0xFFFFFFFF
+"""Solution length recorded when there is no solution yet."""
+
+
+def _to_bytes(items: array) -> bytes:
+    # checkpoints are little-endian wherever they were written
+    if sys.byteorder == "big":
+        items = array(items.typecode, items)
+        items.byteswap()
+    return items.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    items = array(typecode)
+    items.frombytes(data)
+    if sys.byteorder == "big":
+        items.byteswap()
+    return items
+
+
+def _unpack_goal(mask: int, value: int) -> Goal:
+    """The goal ``pack_goal()`` packed to (mask, value)."""
+    return {
+        (INDEX_POSITIONS[index], COLORS_BY_VALUE[(value >> (4 * index)) & CELL_MASK])
+        for index in range(9)
+        if (mask >> (4 * index)) & CELL_MASK
+    }
+
+
+class Solver:
+    """Resumable ``solve()`` over packed states; explores in the same order, so finds the same Play."""
+
+    def __init__(self, grid: Grid, goal: Goal, max_depth: int = 10) -> None:
+        if grid.meets_goal(goal):
+            raise ValueError("Grid already meets goal")
+
+        start = pack(grid.colors)
+        self._set_goal(goal, start)
+        self.max_depth = max_depth
+        self.history = PlayHistory()
+        self.generation: list[tuple[int, PackedState]] = [(PlayHistory.ROOT, start)]
+        """(history entry, state) to expand next, in reverse order (popped from the end)."""
+        self.played_states = {start}
+        self.depth = 0
+        """``Play.depth`` of the children the next ``step()`` produces."""
+        self.solution: tuple[Play, PackedState] | None = None
+        self.impossibles = 0
+
+    def _set_goal(self, goal: Goal, start: PackedState) -> None:
+        self.goal = goal
+        self.start = start
+        self.goal_mask, self.goal_value = pack_goal(goal)
+        self.goal_cells = [(4 * cell_index(pos), color.value) for pos, color in goal]
+        self.pruning = PruningIndex(goal, unpack(start))
+
+    @property
+    def stats(self) -> SolveStats:
+        return SolveStats(
+            states_explored=len(self.played_states),
+            depth_limited=len(self.generation) if self.depth > self.max_depth else 0,
+            impossibles=self.impossibles,
+        )
+
+    def _goals_remaining(self, state: PackedState) -> int:
+        return sum(1 for shift, value in self.goal_cells if (state >> shift) & CELL_MASK != value)
+
+    def _result(self) -> tuple[Play, Grid] | None:
+        if self.solution is None:
+            return None
+        play, state = self.solution
+        return play, Grid(unpack(state), None)
+
+    def step(self) -> tuple[Play, Grid] | None:
+        """Expands one generation, ignoring ``max_depth``. Returns the solution once found."""
+        if self.solution is not None:
+            return self._result()
+
+        goal_mask, goal_value = self.goal_mask, self.goal_value
+        played_states = self.played_states
+        behaviors = PACKED_BEHAVIORS
+        next_generation = []
+
+        while self.generation:
+            entry, state = self.generation.pop()
+            center_color = (state >> CENTER_SHIFT) & CELL_MASK
+
+            for press_index, (_, index) in enumerate(PRESS_ORDER):
+                color = (state >> (4 * index)) & CELL_MASK
+                new_state = behaviors[color](index, state)
+                if new_state is None:
+                    continue
+
+                if new_state & goal_mask == goal_value:
+                    self.solution = self.history.next(entry, press_index), new_state
+                    return self._result()
+
+                if new_state in played_states:
+                    continue
+                played_states.add(new_state)
+
+                if self.pruning.prunes_packed(new_state, (center_color if color == BLUE else color) in RECOUNTING):
+                    self.impossibles += 1
+                    continue
+
+                next_generation.append((self.history.add(entry, press_index), new_state))
+
+        next_generation.sort(key=lambda s: -self._goals_remaining(s[1]))
+        self.generation = next_generation
+        self.depth += 1
+        return None
+
+    def extend_depth(self, max_depth: int) -> None:
+        """Raises the depth budget; the next ``run()`` continues from the current frontier."""
+        self.max_depth = max(self.max_depth, max_depth)
+
+    def run(self) -> tuple[Play, Grid] | None:
+        """Steps until a solution is found or ``max_depth`` is reached, like ``solve()``.
+
+        Returns None if the depth budget ran out first; raises Unsolvable if there is nothing left to explore.
+        """
+        while self.solution is None and self.generation and self.depth <= self.max_depth:
+            self.step()
+
+        if self.solution is None and not self.generation:
+            raise Unsolvable(f"No solution found within max depth; {len(self.played_states)} unique states explored.")
+
+        return self._result()
+
+    def dumps(self) -> bytes:
+        """The search as a checkpoint: a fixed header, then the generation, visited states and history arrays."""
+        presses = array("B")
+        solution_state = 0
+        if self.solution is not None:
+            play, solution_state = self.solution
+            while play:
+                presses.append(GRID_POSITIONS.index(play.press))
+                play = play.previous
+            presses.reverse()
+
+        header = _HEADER.pack(
+            CHECKPOINT_MAGIC,
+            self.start,
+            self.goal_mask,
+            self.goal_value,
+            self.max_depth,
+            self.depth,
+            self.impossibles,
+            solution_state,
+            len(self.generation),
+            len(self.played_states),
+            len(self.history),
+            len(presses) if self.solution is not None else NO_SOLUTION,
+        )
+        sections = [
+            array("I", [entry for entry, _ in self.generation]),
+            array("Q", [state for _, state in self.generation]),
+            array("Q", self.played_states),
+            self.history.parents,
+            self.history.presses,
+            presses,
+        ]
+        return header + b"".join(map(_to_bytes, sections))
+
+    @classmethod
+    def loads(cls, data: bytes) -> Self:
+        """Restores a search from ``dumps()``. Raises ValueError if the data isn't a checkpoint."""
+        if len(data) < _HEADER.size or not data.startswith(CHECKPOINT_MAGIC):
+            raise ValueError(f"Not a {cls.__name__} checkpoint")
+        (
+            _, start, goal_mask, goal_value, max_depth, depth, impossibles, solution_state,
+            generation_length, played_length, history_length, solution_length,
+        ) = _HEADER.unpack_from(data)
+
+        lengths = [generation_length, generation_length, played_length, history_length, history_length]
+        lengths.append(0 if solution_length == NO_SOLUTION else solution_length)
+        sections = []
+        offset = _HEADER.size
+        for typecode, length in zip("IQQIBB", lengths):
+            end = offset + array(typecode).itemsize * length
+            if end > len(data):
+                raise ValueError(f"Truncated {cls.__name__} checkpoint")
+            sections.append(_from_bytes(typecode, data[offset:end]))
+            offset = end
+        if offset != len(data):
+            raise ValueError(f"Trailing data in {cls.__name__} checkpoint")
+        entries, states, played_states, parents, presses, solution_presses = sections
+
+        solver = cls.__new__(cls)
+        solver._set_goal(_unpack_goal(goal_mask, goal_value), start)
+        solver.max_depth = max_depth
+        solver.history = PlayHistory()
+        solver.history.parents, solver.history.presses = parents, presses
+        solver.generation = list(zip(entries, states))
+        solver.played_states = set(played_states)
+        solver.depth = depth
+        solver.impossibles = impossibles
+        solver.solution = None
+        if solution_length != NO_SOLUTION:
+            play = None
+            for press_index in solution_presses:
+                position = GRID_POSITIONS[press_index]
+                play = play.next(position) if play else Play(None, position)
+            solver.solution = play, solution_state
+        return solver
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        """Checkpoints the search to a file."""
+        with open(path, "wb") as file:
+            file.write(self.dumps())
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        """Restores a search checkpointed by ``save()``."""
+        with open(path, "rb") as file:
+            return cls.loads(file.read())
+
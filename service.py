@@ -0,0 +1,269 @@
+"""Solve from asyncio code without blocking the event loop, and a small HTTP/JSON front end for it.
+
+``SolveService.solve_async()`` runs every search in its own worker process, at most ``workers`` at a
+time, so a search that is cancelled or runs past its deadline can be killed outright, as in batch.py.
+Identical requests in flight (same grid, goal, max_depth and options) share one search, which is
+only killed once every caller waiting on it has given up::
+
+    service = SolveService(workers=4)
+    play, grid = await service.solve_async(grid, corners(Color.RED), timeout=5)
+
+The front end takes a batch.py puzzle as a JSON object, plus an optional ``timeout`` in seconds, and
+answers with a batch.py result::
+
+    python service.py --port 8080 --workers 4 --timeout 30
+    curl -d '{"colors": "gray green gray orange red orange white green black", "goal": "red"}' localhost:8080/solve
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import time
+from dataclasses import asdict, dataclass
+from functools import partial
+from http import HTTPStatus
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+from batch import PARSE_ERRORS, Result, moves, parse_puzzle
+from packed import PackedState, pack, pack_goal
+from solver import Color, Goal, Grid, Play, Unsolvable, solve
+from stats import SolveStats
+
+type Solution = tuple[Play, Grid] | None
+
+# start state, goal mask, goal value, max depth, solve() options
+type Key = tuple[PackedState, int, int, int, tuple[tuple[str, Any], ...]]
+
+
+def _run(conn: Connection, colors: list[Color], goal: Goal, max_depth: int, options: dict[str, Any]) -> None:
+    stats = SolveStats()
+    try:
+        outcome = solve(Grid(colors, None), goal, max_depth, stats=stats, **options)
+    except Exception as e:
+        outcome = e
+    conn.send((outcome, stats))
+    conn.close()
+
+
+@dataclass
+class _Search:
+    task: asyncio.Task[tuple[Solution | Exception, SolveStats]]
+    waiters: int = 0
+
+
+class SolveService:
+    """Runs ``solve()`` in worker processes for asyncio callers, sharing identical searches in flight."""
+
+    def __init__(self, workers: int | None = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = asyncio.Semaphore(self.workers)
+        # forking a process with threads (ours wait on the workers) can deadlock the child
+        self._context = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+        self._searches = dict[Key, _Search]()
+
+    @property
+    def in_flight(self) -> int:
+        """Distinct searches running or waiting for a worker."""
+        return len(self._searches)
+
+    async def solve_async(
+        self,
+        grid: Grid,
+        goal: Goal,
+        max_depth: int = 10,
+        *,
+        timeout: float | None = None,
+        stats: SolveStats | None = None,
+        **options: Any,
+    ) -> Solution:
+        """``solve()``, without blocking the event loop.
+
+        Raises TimeoutError if there's no answer within ``timeout`` seconds. Cancelling the call, or
+        running out of time, stops the search unless other callers are still waiting on it. ``stats``
+        is filled in from the (possibly shared) search once it finishes.
+        """
+        if grid.meets_goal(goal):
+            raise ValueError("Grid already meets goal")
+
+        key = (pack(grid.colors), *pack_goal(goal), max_depth, tuple(sorted(options.items())))
+        search = self._searches.get(key)
+        if search is None:
+            task = asyncio.create_task(self._search(list(grid.colors), goal, max_depth, options))
+            search = self._searches[key] = _Search(task)
+            task.add_done_callback(partial(self._forget, key, search))
+
+        search.waiters += 1
+        try:
+            async with asyncio.timeout(timeout):
+                outcome, searched = await asyncio.shield(search.task)
+        finally:
+            search.waiters -= 1
+            if not search.waiters and not search.task.done():
+                # nobody wants it any more; a new caller starts over rather than joining a dying search
+                self._forget(key, search)
+                search.task.cancel()
+
+        if stats is not None:
+            stats.states_explored = searched.states_explored
+            stats.depth_limited = searched.depth_limited
+            stats.impossibles = searched.impossibles
+            stats.depths = list(searched.depths)
+            if stats.on_depth:
+                for depth in stats.depths:
+                    stats.on_depth(depth)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def _forget(self, key: Key, search: _Search, task: asyncio.Task | None = None) -> None:
+        if self._searches.get(key) is search:
+            del self._searches[key]
+        if task is not None and not task.cancelled():
+            # the callers may all have gone; don't let a crashed worker go unreported as never retrieved
+            task.exception()
+
+    async def _search(
+        self, colors: list[Color], goal: Goal, max_depth: int, options: dict[str, Any]
+    ) -> tuple[Solution | Exception, SolveStats]:
+        async with self._slots:
+            receiver, sender = self._context.Pipe(duplex=False)
+            process = self._context.Process(target=_run, args=(sender, colors, goal, max_depth, options), daemon=True)
+            process.start()
+            sender.close()
+            # waiting on the pipe blocks, so it's done in a thread; killing the worker wakes it
+            waiting = asyncio.get_running_loop().run_in_executor(None, wait, [receiver, process.sentinel])
+            try:
+                await asyncio.shield(waiting)
+                try:
+                    return receiver.recv()
+                except EOFError:
+                    raise RuntimeError(f"worker exited with code {process.exitcode}") from None
+            finally:
+                process.kill()
+                await waiting
+                process.join()
+                receiver.close()
+
+
+async def respond(
+    service: SolveService, method: str, path: str, body: bytes, timeout: float | None = None, **options: Any
+) -> tuple[HTTPStatus, dict[str, Any]]:
+    """The status and JSON body answering one request. ``timeout`` caps the one the request asks for."""
+    if path != "/solve":
+        return HTTPStatus.NOT_FOUND, {"error": f"Not found: {path}"}
+    if method != "POST":
+        return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "POST a puzzle to /solve"}
+
+    try:
+        record = json.loads(body)
+        puzzle = parse_puzzle(record, "")
+        if record.get("timeout") is not None:
+            requested = float(record["timeout"])
+            timeout = requested if timeout is None else min(timeout, requested)
+    except PARSE_ERRORS as e:
+        return HTTPStatus.BAD_REQUEST, {"error": f"Bad puzzle: {e!r}"}
+
+    stats = SolveStats()
+    start = time.perf_counter()
+    try:
+        solution = await service.solve_async(
+            Grid(list(puzzle.colors), None), puzzle.goal, puzzle.max_depth, timeout=timeout, stats=stats, **options
+        )
+    except Unsolvable:
+        status, play = "unsolvable", None
+    except TimeoutError:
+        return HTTPStatus.OK, asdict(Result(puzzle.id, "timeout", seconds=time.perf_counter() - start))
+    except ValueError as e:
+        return HTTPStatus.BAD_REQUEST, asdict(Result(puzzle.id, "error", seconds=time.perf_counter() - start, error=str(e)))
+    except Exception as e:
+        return HTTPStatus.INTERNAL_SERVER_ERROR, asdict(
+            Result(puzzle.id, "error", seconds=time.perf_counter() - start, error=repr(e))
+        )
+    else:
+        status, play = ("solved", solution[0]) if solution else ("depth exceeded", None)
+
+    return HTTPStatus.OK, asdict(Result(puzzle.id, status, moves(play), stats.states_explored, time.perf_counter() - start))
+
+
+async def _read_request(reader: asyncio.StreamReader) -> tuple[str, str, bytes, bool] | None:
+    """(method, path, body, keep the connection open) of the next request, or None once the client is done."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, version = request_line.decode("latin-1").split()
+
+    headers = {}
+    while (line := await reader.readline()).strip():
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, path, body, keep_alive
+
+
+async def _handle(
+    service: SolveService,
+    timeout: float | None,
+    options: dict[str, Any],
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        while (request := await _read_request(reader)) is not None:
+            method, path, body, keep_alive = request
+            status, response = await respond(service, method, path, body, timeout, **options)
+            payload = json.dumps(response).encode()
+            head = [
+                f"HTTP/1.1 {status.value} {status.phrase}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(payload)}",
+            ]
+            if not keep_alive:
+                head.append("Connection: close")
+            writer.write("\r\n".join(head).encode() + b"\r\n\r\n" + payload)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        # dropped or malformed; there's no one to answer
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    service: SolveService, host: str = "127.0.0.1", port: int = 8080, timeout: float | None = None, **options: Any
+) -> asyncio.Server:
+    """Serves ``POST /solve`` from the service; ``options`` go to ``solve()``."""
+    return await asyncio.start_server(partial(_handle, service, timeout, options), host, port)
+
+
+async def serve(host: str, port: int, workers: int | None, timeout: float | None, **options: Any) -> None:
+    server = await start_server(SolveService(workers), host, port, timeout, **options)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, help="searches run at once (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, help="most seconds allowed per request")
+    parser.add_argument("--backend", default="reference")
+    parser.add_argument("--strategy", default="bfs")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.timeout, backend=args.backend, strategy=args.strategy))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
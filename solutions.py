@@ -0,0 +1,121 @@
+"""Every shortest solution, not just the first one ``solve()`` finds.
+
+The search keeps, for every state, all the (parent, press) pairs that reach it in the fewest presses,
+which makes a DAG over the BFS layers. Once a layer meets the goal the DAG is trimmed to the states
+on some path to a solution, and solutions are walked out of it one at a time, so callers can pick
+among them (fewest distinct buttons, least movement, ...) without holding them all::
+
+    # fewest distinct buttons (``moves()`` is in batch.py)
+    best = min(shortest_solutions(grid, goal), key=lambda solution: len(set(moves(solution[0]))))
+"""
+
+from collections import defaultdict
+from typing import Iterator
+
+from packed import (
+    CELL_MASK,
+    CENTER_SHIFT,
+    BLUE,
+    PACKED_BEHAVIORS,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    pack,
+    pack_goal,
+    unpack,
+)
+from pruning import PruningIndex
+from solver import Goal, Grid, Play, Unsolvable
+
+# state -> every (parent state, press index) that reaches it from the previous layer
+type Layer = dict[PackedState, list[tuple[PackedState, int]]]
+
+
+def shortest_solutions(grid: Grid, goal: Goal, max_depth: int = 10) -> Iterator[tuple[Play, Grid]]:
+    """Yields every shortest Play that solves the grid to the goal, in press order.
+
+    Like ``solve()``, yields nothing if there is no solution within ``max_depth`` and raises
+    Unsolvable if there is none at all.
+    """
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    goal_mask, goal_value = pack_goal(goal)
+    pruning = PruningIndex(goal, grid.colors)
+    behaviors = PACKED_BEHAVIORS
+
+    start = pack(grid.colors)
+    visited = {start}
+    frontier = [start]
+    layers = list[Layer]()
+    goals = set[PackedState]()
+
+    while frontier:
+        layer: Layer = {}
+        recounted = set[PackedState]()
+        for state in frontier:
+            center_color = (state >> CENTER_SHIFT) & CELL_MASK
+            for press_index, (_, index) in enumerate(PRESS_ORDER):
+                color = (state >> (4 * index)) & CELL_MASK
+                new_state = behaviors[color](index, state)
+                if new_state is None or new_state in visited:
+                    continue
+
+                if (ways := layer.get(new_state)) is not None:
+                    # another shortest way here
+                    ways.append((state, press_index))
+                    continue
+
+                layer[new_state] = [(state, press_index)]
+                if new_state & goal_mask == goal_value:
+                    goals.add(new_state)
+                elif (center_color if color == BLUE else color) in RECOUNTING:
+                    # the first way is enough: any other keeps the colors of a parent that wasn't pruned
+                    recounted.add(new_state)
+
+        layers.append(layer)
+        if goals:
+            break
+
+        visited.update(layer)
+        frontier = [state for state in layer if not pruning.prunes_packed(state, state in recounted)]
+        if len(layers) > max_depth:
+            break
+
+    if not goals:
+        # nothing left to explore, rather than cut off by max_depth
+        if not frontier:
+            raise Unsolvable(f"No solution found within max depth; {len(visited)} unique states explored.")
+        return
+
+    # walk back from the solutions, linking each state on a shortest path to its children on one
+    children = defaultdict[PackedState, list[tuple[int, PackedState]]](list)
+    on_path = goals
+    for layer in reversed(layers):
+        parents = set()
+        for state in on_path:
+            for parent, press_index in layer[state]:
+                children[parent].append((press_index, state))
+                parents.add(parent)
+        on_path = parents
+    for edges in children.values():
+        edges.sort()
+    # the layers aren't needed to walk the paths
+    del layers, visited
+
+    yield from _walk(children, goals, None, start)
+
+
+def _walk(
+    children: dict[PackedState, list[tuple[int, PackedState]]],
+    goals: set[PackedState],
+    play: Play | None,
+    state: PackedState,
+) -> Iterator[tuple[Play, Grid]]:
+    if state in goals:
+        yield play, Grid(unpack(state), None)
+        return
+
+    for press_index, child in children[state]:
+        position = PRESS_ORDER[press_index][0]
+        yield from _walk(children, goals, play.next(position) if play else Play(None, position), child)
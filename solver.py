@@ -1,13 +1,29 @@
 #TODO: report total press count?
 
-from dataclasses import field
 import itertools as it
+import time
+from functools import cache
 
-from collections import Counter
+from array import array
+from collections import Counter, OrderedDict
 from enum import Enum, auto
-from typing import Callable, Collection, Iterable, Iterator, MutableMapping, NamedTuple, Self
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Hashable,
+    Iterable,
+    Iterator,
+    MutableMapping,
+    NamedTuple,
+    Self,
+)
+
+if TYPE_CHECKING:
+    from pruning import PruningIndex
+    from stats import SolveStats
 
-from test.test_dataclasses import dataclass
 
 
 class Color(Enum):
@@ -97,14 +113,35 @@ def possible_colors(colors: Collection[Color]) -> Counter[Color]:
     return counts
 
 
+type Tally = tuple[int, ...]
+"""How many cells of each color a grid has, indexed by ``Color.value``."""
+
+COLORS_BY_VALUE = [None, *Color]
+
+
+def tally(colors: Iterable[Color]) -> Tally:
+    counts = [0] * len(COLORS_BY_VALUE)
+    for color in colors:
+        counts[color.value] += 1
+    return tuple(counts)
+
+
+@cache
+def possible_tally_colors(tally: Tally) -> Counter[Color]:
+    """``possible_colors()`` of any grid with this tally. Shared between calls: don't modify it."""
+    return possible_colors(Counter({COLORS_BY_VALUE[value]: count for value, count in enumerate(tally) if count}))
+
+
 # 3x3 grid of colors, -1, 0, 1 indexes
 class Grid(MutableMapping[Position, Color]):
-    def __init__(self, colors: list[Color], counts: Counter[Color] | None) -> None:
+    def __init__(self, colors: list[Color], counts: Counter[Color] | None, tally: Tally | None = None) -> None:
         """Initializes a grid with the given colors."""
         if len(colors) != 9:
             raise ValueError("Grid must have exactly 9 colors")
         self.colors = colors
         self.counts = counts
+        self.tally = tally
+        """Color counts carried along from grid to grid, or None until the first recount."""
 
     colors: list[Color]
 
@@ -148,16 +185,30 @@ class Grid(MutableMapping[Position, Color]):
         
         Retains the last color counts.
         """
-        return Grid(list(self.colors), self.counts)
+        return Grid(list(self.colors), self.counts, self.tally)
 
-    def recount(self) -> None:
-        """Recounts the colors in the grid."""
-        self.counts = possible_colors(self.colors)
+    def recount(self, changes: Iterable[tuple[Color, Color]] | None = None) -> None:
+        """Recounts the colors in the grid.
+
+        ``changes`` lists the (old, new) color of every cell changed since the grid was copied, so
+        the tally is updated in O(changed cells) instead of counted from scratch.
+        """
+        if changes is None or self.tally is None:
+            self.tally = tally(self.colors)
+        else:
+            counts = list(self.tally)
+            for old, new in changes:
+                counts[old.value] -= 1
+                counts[new.value] += 1
+            self.tally = tuple(counts)
+        self.counts = possible_tally_colors(self.tally)
 
     def swap(self, pos1: Position, pos2: Position) -> Self | None:
         """Return a cloned grid iff the swap results in a new state."""
-        idx1 = self._index(pos1)
-        idx2 = self._index(pos2)
+        return self.swap_cells(self._index(pos1), self._index(pos2))
+
+    def swap_cells(self, idx1: int, idx2: int) -> Self | None:
+        """``swap()`` by cell index."""
         if idx1 == idx2:
             return None
 
@@ -183,13 +234,14 @@ COLOR_BEHAVIORS[Color.GRAY] = lambda position, grid: None
 
 def purple(position: Position, grid: Grid) -> Grid | None:
     """Drops down one, swapping with the color below."""
+    index = CELL_INDEXES[position]
 
     # no change if on bottom row
-    if position.y == 1:
+    below = BELOW[index]
+    if below is None:
         return None
 
-    new_position = Position(position.x, position.y + 1)
-    return grid.swap(position, new_position)
+    return grid.swap_cells(index, below)
 
 
 COLOR_BEHAVIORS[Color.PURPLE] = purple
@@ -197,13 +249,14 @@ COLOR_BEHAVIORS[Color.PURPLE] = purple
 
 def yellow(position: Position, grid: Grid) -> Grid | None:
     """Moves up one, swapping with the color above."""
+    index = CELL_INDEXES[position]
 
     # no change if on top row
-    if position.y == -1:
+    above = ABOVE[index]
+    if above is None:
         return None
 
-    new_position = Position(position.x, position.y - 1)
-    return grid.swap(position, new_position)
+    return grid.swap_cells(index, above)
 
 
 COLOR_BEHAVIORS[Color.YELLOW] = yellow
@@ -212,19 +265,22 @@ COLOR_BEHAVIORS[Color.YELLOW] = yellow
 def red(position: Position, grid: Grid) -> Grid | None:
     """When any red is pressed, all whites turn black, and all blacks turn red."""
 
-    pressed_color = grid[position]
-    whites = [pos for pos, color in grid.items() if color == Color.WHITE]
-    blacks = [pos for pos, color in grid.items() if color == Color.BLACK]
+    colors = grid.colors
+    pressed_color = colors[CELL_INDEXES[position]]
+    whites = [i for i, color in enumerate(colors) if color == Color.WHITE]
+    blacks = [i for i, color in enumerate(colors) if color == Color.BLACK]
     if not whites and not blacks:
         return None
 
     new_grid = grid.copy()
+    new_colors = new_grid.colors
     for white in whites:
-        new_grid[white] = Color.BLACK
+        new_colors[white] = Color.BLACK
     for black in blacks:
-        new_grid[black] = pressed_color
+        new_colors[black] = pressed_color
 
-    new_grid.recount()  # rebuild possible future colors
+    # rebuild possible future colors
+    new_grid.recount([(Color.WHITE, Color.BLACK)] * len(whites) + [(Color.BLACK, pressed_color)] * len(blacks))
     return new_grid
 
 
@@ -233,11 +289,12 @@ COLOR_BEHAVIORS[Color.RED] = red
 
 def green(position: Position, grid: Grid) -> Grid | None:
     """Swaps with opposite corner or edge. Does nothing in the center."""
-    if position == CENTER:
+    index = CELL_INDEXES[position]
+    opposite = OPPOSITE[index]
+    if opposite is None:
         return None
 
-    new_position = Position(-position.x, -position.y)
-    return grid.swap(position, new_position)
+    return grid.swap_cells(index, opposite)
 
 
 COLOR_BEHAVIORS[Color.GREEN] = green
@@ -245,13 +302,14 @@ COLOR_BEHAVIORS[Color.GREEN] = green
 
 def black(position: Position, grid: Grid) -> Grid | None:
     """Rotates the row to the right."""
-    row = [grid[Position(x, position.y)] for x in (1, -1, 0)]
-    if all(c == Color.BLACK for c in row):
+    left, middle, right = ROWS[CELL_INDEXES[position]]
+    colors = grid.colors
+    if colors[left] == colors[middle] == colors[right] == Color.BLACK:
         return None
 
     new_grid = grid.copy()
-    for i, color in enumerate(row, start=-1):
-        new_grid[Position(i, position.y)] = color
+    new_colors = new_grid.colors
+    new_colors[left], new_colors[middle], new_colors[right] = colors[right], colors[left], colors[middle]
 
     return new_grid
 
@@ -276,20 +334,26 @@ def white(position: Position, grid: Grid) -> Grid | None:
 
     Using the position is necessary because when blue triggers this, it should be blue.
     """
-    color = grid[position]
+    index = CELL_INDEXES[position]
+    colors = grid.colors
+    color = colors[index]
     new_grid = grid.copy()
+    new_colors = new_grid.colors
 
     # blank out this position
-    del new_grid[position]  
-    for neighbor in neighbors(position):
-        neighbor_color = grid[neighbor]
+    new_colors[index] = Color.GRAY
+    changes = [(color, Color.GRAY)]
+    for neighbor in NEIGHBOR_INDEXES[index]:
+        neighbor_color = colors[neighbor]
         if neighbor_color == color:
-            del new_grid[neighbor]
+            new_colors[neighbor] = Color.GRAY
+            changes.append((color, Color.GRAY))
         elif neighbor_color == Color.GRAY:
-            new_grid[neighbor] = color
+            new_colors[neighbor] = color
+            changes.append((Color.GRAY, color))
     
     # it's possible white (or blue) was completely blanked out, so recount
-    new_grid.recount()
+    new_grid.recount(changes)
 
     return new_grid
 
@@ -298,7 +362,7 @@ COLOR_BEHAVIORS[Color.WHITE] = white
 
 
 def blue(position: Position, grid: Grid) -> Grid | None:
-    center_color = grid[CENTER]
+    center_color = grid.colors[CENTER_INDEX]
 
     # base case: copying blue is no-op
     if center_color == Color.BLUE:
@@ -313,10 +377,12 @@ COLOR_BEHAVIORS[Color.BLUE] = blue
 
 def orange(position: Position, grid: Grid) -> Grid | None:
     """Changes the color to the most common neighbor color."""
-    neighbor_counts = Counter(grid[p] for p in neighbors(position))
+    index = CELL_INDEXES[position]
+    colors = grid.colors
+    neighbor_counts = Counter(colors[n] for n in NEIGHBOR_INDEXES[index])
 
     most_common = neighbor_counts.most_common(2)
-    my_color = grid[position]
+    my_color = colors[index]
 
     # if there is no most common color, or if the top two are tied, return None
     if len(most_common) < 2 or most_common[0][1] != most_common[1][1]:
@@ -329,10 +395,10 @@ def orange(position: Position, grid: Grid) -> Grid | None:
         return None
 
     new_grid = grid.copy()
-    new_grid[position] = color
+    new_grid.colors[index] = color
 
     # 1 less orange (or blue), which should decrease the other colors
-    new_grid.recount()
+    new_grid.recount([(my_color, color)])
     return new_grid
 
 
@@ -355,18 +421,55 @@ def cycle(position: Position) -> Iterable[Position]:
     return (p for adj in CYCLE_POSITIONS if (p := position + adj).valid())
 
 
+# move tables: the geometry of every behavior, by cell index, so presses never do Position math
+
+def cell_index(position: Position) -> int:
+    """Index of the position in the flat color list (same as ``Grid._index``)."""
+    return ((position.y + 1) * 3) + position.x + 1
+
+
+INDEX_POSITIONS = [Position(i % 3 - 1, i // 3 - 1) for i in range(9)]
+"""Position of each cell index."""
+
+CELL_INDEXES = {position: i for i, position in enumerate(INDEX_POSITIONS)}
+"""Cell index of each position."""
+
+CENTER_INDEX = cell_index(CENTER)
+
+
+def _step(position: Position, step: Position) -> int | None:
+    return cell_index(p) if (p := position + step).valid() else None
+
+
+BELOW = [_step(position, Position(0, 1)) for position in INDEX_POSITIONS]
+"""Cell purple swaps with, or None on the bottom row."""
+ABOVE = [_step(position, Position(0, -1)) for position in INDEX_POSITIONS]
+"""Cell yellow swaps with, or None on the top row."""
+OPPOSITE = [None if position == CENTER else cell_index(Position(-position.x, -position.y)) for position in INDEX_POSITIONS]
+"""Cell green swaps with, or None in the center."""
+ROWS = [tuple(cell_index(Position(x, position.y)) for x in (-1, 0, 1)) for position in INDEX_POSITIONS]
+"""Cells of the row black rotates, left to right."""
+NEIGHBOR_INDEXES = [[cell_index(p) for p in neighbors(position)] for position in INDEX_POSITIONS]
+"""Cells white and orange look at."""
+CYCLE_INDEXES = [[cell_index(p) for p in cycle(position)] for position in INDEX_POSITIONS]
+"""Cells pink cycles, clockwise."""
+
+
 def pink(position: Position, grid: Grid) -> Grid | None:
     """Cycles the colors clockwise around the position."""
+    cells = CYCLE_INDEXES[CELL_INDEXES[position]]
+    colors = grid.colors
 
-    to_cycle = [grid[p] for p in cycle(position)]
+    to_cycle = [colors[i] for i in cells]
     # all colors to rotate are the same, so no change
     if all(c == to_cycle[0] for c in to_cycle):
         return None
 
     new_grid = grid.copy()
+    new_colors = new_grid.colors
     to_cycle.insert(0, to_cycle.pop())  # rotate the list clockwise
-    for i, pos in enumerate(cycle(position)):
-        new_grid[pos] = to_cycle[i]
+    for i, color in zip(cells, to_cycle):
+        new_colors[i] = color
 
     return new_grid
 
@@ -383,10 +486,54 @@ class Play(NamedTuple):
         return Play(self, position, self.depth + 1)
 
 class State(NamedTuple):
-    play: Play | None
+    entry: int
+    """The state's ``PlayHistory`` entry."""
     grid: Grid 
 
 
+class PlayHistory:
+    """The presses that led to every queued state, as flat arrays instead of a ``Play`` apiece.
+
+    Entry ``i`` holds the entry it was pressed from (``ROOT`` for the starting state) and the index
+    of the pressed position in ``GRID_POSITIONS``: 5 bytes per state. ``play()`` rebuilds the Play
+    linked list on demand.
+    """
+
+    ROOT = 0xFFFFFFFF
+
+    def __init__(self) -> None:
+        self.parents = array("I")
+        self.presses = array("B")
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def add(self, parent: int, press_index: int) -> int:
+        """Records a press from the ``parent`` entry; returns the new entry."""
+        self.parents.append(parent)
+        self.presses.append(press_index)
+        return len(self.parents) - 1
+
+    def play(self, entry: int) -> Play | None:
+        """The Play that leads to the entry's state (None for ``ROOT``)."""
+        presses = []
+        while entry != self.ROOT:
+            presses.append(self.presses[entry])
+            entry = self.parents[entry]
+
+        play = None
+        for press_index in reversed(presses):
+            position = GRID_POSITIONS[press_index]
+            play = play.next(position) if play else Play(None, position)
+        return play
+
+    def next(self, entry: int, press_index: int) -> Play:
+        """The Play for pressing a position from the entry's state, without recording it."""
+        last_play = self.play(entry)
+        position = GRID_POSITIONS[press_index]
+        return last_play.next(position) if last_play else Play(None, position)
+
+
 def press(
     position: Position,
     grid: Grid,
@@ -396,6 +543,78 @@ def press(
     return behavior(position, grid)
 
 
+class TransitionCache:
+    """Memoizes press() results for a puzzle, keyed by (state, position).
+
+    Built lazily while solving; pass the same cache to repeated solves of a room (e.g. for
+    different goals or depths) to skip recomputing moves. Least recently used entries are evicted
+    once ``maxsize`` is reached (``None`` for unbounded).
+    """
+
+    def __init__(self, maxsize: int | None = 1 << 20) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict[Hashable, Any]()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def _get(self, key: Hashable) -> Any:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def press(self, position: Position, grid: Grid, state: GridState | None = None) -> Grid | None:
+        """Cached ``press()``. Pass the grid's ``hashable_state()`` if it is already at hand."""
+        key = (state or grid.hashable_state(), position)
+        try:
+            entry = self._get(key)
+        except KeyError:
+            new_grid = press(position, grid)
+            # only keep counts the behavior rebuilt; inherited counts belong to the caller's grid
+            self._put(key, new_grid and (
+                new_grid.hashable_state(),
+                new_grid.tally if new_grid.tally is not grid.tally else None,
+            ))
+            return new_grid
+
+        if entry is None:
+            return None
+        colors, recounted = entry
+        if recounted is None:
+            return Grid(list(colors), grid.counts, grid.tally)
+        return Grid(list(colors), possible_tally_colors(recounted), recounted)
+
+    def press_packed(self, index: int, state: int) -> int | None:
+        """Cached ``packed.press_packed()``."""
+        key = (state, index)
+        try:
+            return self._get(key)
+        except KeyError:
+            from packed import press_packed
+
+            new_state = press_packed(index, state)
+            self._put(key, new_state)
+            return new_state
+
+
 def goals_remaining(
     grid: Grid,
     goal: Goal,
@@ -419,75 +638,251 @@ def goal_still_reachable(
 class Unsolvable(Exception):
     """Raised when queue is exhausted without finding a solution."""
 
+
+def __getattr__(name: str) -> Any:
+    # the stats types pull in dataclasses (and inspect), so only import them when used
+    if name in ("DepthStats", "SolveStats", "timed_behaviors"):
+        import stats
+
+        return getattr(stats, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def solve(
     grid: Grid,
     goal: Goal,
     max_depth: int = 10,
+    backend: str = "reference",
+    transitions: TransitionCache | None = None,
+    strategy: str = "bfs",
+    pruning: "PruningIndex | None" = None,
+    symmetry: bool = False,
+    workers: int | None = None,
+    stats: "SolveStats | None" = None,
+    memory: int | None = None,
+    skip_commuting: bool = False,
 ) -> tuple[Play, Grid] | None:
-    """Finds a Play linked list that solves the grid to the goal."""
+    """Finds a Play linked list that solves the grid to the goal.
+
+    ``backend="packed"`` runs the same search over packed int states (see ``packed.py``).
+    ``backend="numpy"`` presses whole generations at once over NumPy arrays (see ``vectorized.py``).
+    ``backend="kernel"`` runs the packed search with presses generated for the room's colors (see ``kernel.py``).
+    Backends are looked up by name in ``BACKENDS``, with the options each supports (see ``backends.py``).
+    ``transitions`` memoizes presses across solves of the same room.
+    ``strategy="astar"`` runs an A* search (always over packed states) that also finds a shortest solution.
+    ``pruning`` rejects states the goal can't be reached from; pass one to read its per-rule ``pruned`` counts.
+    ``symmetry`` treats states that are mirror images under a symmetry of the room and goal as already played.
+    ``workers`` > 1 expands each generation across that many processes (see ``parallel.py``); the
+    result is the same as the serial search's.
+    ``stats`` is filled in with the search's counters, whether or not a solution is found; the
+    reference backend also records them per generation (see ``SolveStats.depths``).
+    ``memory`` caps the bytes of states held at once (always over packed states), spilling the queue
+    and the visited set to disk (see ``spill.py``); the result is the same as the serial search's.
+    ``skip_commuting`` skips presses that only reorder the press that led to a state (see
+    ``commuting.py``); the solution is still a shortest one, though not always the same Play.
+    """
+    from pruning import PruningIndex
+    from ranking import VisitedPermutations, permutation_only
+
+    registered = None
+    if backend != "reference":
+        from backends import BACKENDS
+
+        if (registered := BACKENDS.get(backend)) is None:
+            raise ValueError(f"Unknown backend: {backend}")
+    if strategy not in ("bfs", "astar"):
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    parallel = workers is not None and workers > 1
+    # A*, the spilled and the parallel searches press packed states their own way
+    if backend not in ("reference", "packed") and (strategy != "bfs" or memory is not None or parallel):
+        raise ValueError(f"The {backend} backend only supports the serial in-memory BFS search")
+
+    if skip_commuting and (symmetry or strategy != "bfs" or memory is not None or parallel):
+        raise ValueError("skip_commuting only supports the plain BFS search")
+
+    if parallel:
+        if strategy != "bfs" or transitions is not None or pruning is not None or symmetry:
+            raise ValueError("workers only supports the plain BFS search")
+        from parallel import solve_parallel
+
+        return solve_parallel(grid, goal, max_depth, workers, stats)
+
+    if memory is not None:
+        if strategy != "bfs" or transitions is not None or symmetry:
+            raise ValueError("memory only supports the plain BFS search")
+        from spill import solve_spilled
+
+        return solve_spilled(grid, goal, max_depth, memory, pruning, stats)
+
+    if strategy == "astar":
+        if symmetry:
+            raise ValueError("astar doesn't support symmetry")
+        from astar import solve_astar
+
+        return solve_astar(grid, goal, max_depth, transitions, pruning, stats)
+
+    if registered is not None:
+        options = {"transitions": transitions, "symmetry": symmetry, "skip_commuting": skip_commuting}
+        # an empty TransitionCache is falsy, but still asked for
+        if unsupported := [
+            name for name, value in options.items() if value not in (None, False) and name not in registered.supports
+        ]:
+            raise ValueError(f"The {backend} backend doesn't support {' or '.join(unsupported)}")
+        supported = {name: value for name, value in options.items() if name in registered.supports}
+        return registered.search(grid, goal, max_depth, pruning, stats, **supported)
 
     if grid.meets_goal(goal):
         raise ValueError("Grid already meets goal")
 
+    # canonical packed states stand in for hashable states when symmetries apply
+    canonical = None
+    if symmetry:
+        from packed import pack
+        from symmetry import Symmetries
+
+        if symmetries := Symmetries(goal, grid.colors):
+            canonical = symmetries.canonical
+
     # initialize the queue with the starting state
-    current_generation = [State(play=None, grid=grid)]
+    history = PlayHistory()
+    current_generation = [State(entry=PlayHistory.ROOT, grid=grid)]
     next_generation = []
-    played_states = {grid.hashable_state()}  # max size: 9! (~362k, not accounting for color changes)
+    # ``Play.depth`` of the current generation's children
+    depth = 0
+    # max size: 9! (~362k, not accounting for color changes; see spill.py)
+    played_states: set | VisitedPermutations
+    rank = None
+    if canonical:
+        played_states = {canonical(pack(grid.colors))}
+    elif permutation_only(grid.colors):
+        # only arrangements of the starting colors can come up, so a bit apiece will do
+        played_states = VisitedPermutations(grid.colors)
+        rank = played_states.rank_colors
+        played_states.add(rank(grid.colors))
+    else:
+        played_states = {grid.hashable_state()}
 
     max_depth_reached = 0
 
-    goal_counts = Counter(color for _, color in goal)
+    if pruning is None:
+        pruning = PruningIndex(goal, grid.colors)
     total_impossibles = 0
 
-    while current_generation:
-        last_play, grid = current_generation.pop()
+    # by history entry: the footprint of the press that led to the entry's state
+    footprints = None
+    if skip_commuting:
+        from commuting import FOOTPRINTS
 
-        for pos in GRID_POSITIONS:
-            play = last_play.next(pos) if last_play else Play(None, pos)
+        footprints = list[tuple[int, int]]()
+    skipped = 0
+
+    # counters for the generation being expanded, only kept when asked for
+    level = None
+    if stats is not None:
+        from stats import DepthStats
+
+        level = DepthStats(0)
+    level_started = time.perf_counter()
+
+    while current_generation:
+        entry, grid = current_generation.pop()
+        state = grid.hashable_state() if transitions is not None else None
+        last = None
+        if footprints is not None:
+            center_footprints = FOOTPRINTS[grid.colors[CENTER_INDEX].value]
+            if entry != PlayHistory.ROOT:
+                last, last_footprint = history.presses[entry], footprints[entry]
+
+        for press_index, pos in enumerate(GRID_POSITIONS):
+            if footprints is not None:
+                index = CELL_INDEXES[pos]
+                press_footprint = center_footprints[grid.colors[index].value][index]
+                # pressed the other way round from the parent, in press order, and neither writes what
+                # the other reads
+                if (
+                    last is not None and press_index < last
+                    and not (press_footprint[1] & last_footprint[0] or last_footprint[1] & press_footprint[0])
+                ):
+                    skipped += 1
+                    continue
 
-            new_grid = press(pos, grid)
+            new_grid = transitions.press(pos, grid, state) if transitions is not None else press(pos, grid)
             if new_grid is None:
+                if level:
+                    level.noops[grid[pos]] += 1
                 continue
 
             # immediately return if the new grid meets the goal!
             if new_grid.meets_goal(goal):
-                return play, new_grid
-
-            hs = new_grid.hashable_state()
+                if stats is not None:
+                    level.generated += 1
+                    stats._finish_depth(level, played_states, level_started)
+                    stats.states_explored, stats.depth_limited, stats.impossibles = (
+                        len(played_states), max_depth_reached, total_impossibles,
+                    )
+                    stats.skipped_commuting = skipped
+                return history.next(entry, press_index), new_grid
+
+            if level:
+                level.generated += 1
+
+            if canonical:
+                hs = canonical(pack(new_grid.colors))
+            elif rank:
+                hs = rank(new_grid.colors)
+            else:
+                hs = new_grid.hashable_state()
             if hs in played_states:
                 # cycle or shorter path already played
+                if level:
+                    level.duplicates += 1
                 continue
 
             # capture this reachable state
             played_states.add(hs)
 
             # prune this branch if the goal is provably unreachable
-            if new_grid.counts:
-                if not goal_still_reachable(new_grid.counts, goal_counts):
-                    total_impossibles += 1
-                    continue
-                else:
-                    # clear counts until next recount
-                    new_grid.counts = None
-            
+            if pruning.prunes(new_grid):
+                total_impossibles += 1
+                if level:
+                    level.pruned += 1
+                continue
 
             # if we've reached the max depth, skip this state
-            if play.depth >= max_depth:
+            if depth >= max_depth:
                 max_depth_reached += 1
+                if level:
+                    level.depth_limited += 1
                 continue
 
             # enqueue state into next generation
             next_generation.append(State(
-                play=play,
+                entry=history.add(entry, press_index),
                 grid=new_grid,
             ))
+            if footprints is not None:
+                footprints.append(press_footprint)
+
+        if level and not current_generation:
+            level.frontier = len(next_generation)
+            stats._finish_depth(level, played_states, level_started)
+            level = DepthStats(level.depth + 1)
+            level_started = time.perf_counter()
 
         # if the current generation is empty, swap in the next generation
         if not current_generation and next_generation:
             current_generation = next_generation
             next_generation = []
             current_generation.sort(key=lambda s: -goals_remaining(s.grid, goal))
-    
+            depth += 1
+
+    if stats is not None:
+        stats.states_explored, stats.depth_limited, stats.impossibles = (
+            len(played_states), max_depth_reached, total_impossibles,
+        )
+        stats.skipped_commuting = skipped
+
     if not max_depth_reached:
         raise Unsolvable(f"No solution found within max depth; {len(played_states)} unique states explored.")
     
@@ -0,0 +1,296 @@
+"""BFS under a fixed memory budget, with the generations and the visited set spilled to disk.
+
+Rooms with recoloring tiles can reach far more states than the 9! arrangements of their colors, so
+``played_states`` can outgrow RAM. This search keeps neither the visited set nor the queue in memory.
+Each generation is a file of (state, parent) records. The children of a generation are buffered
+unchecked, and when the buffer is full it is sorted and written out as a run. Once the generation is
+expanded, the runs are merged and joined against the visited runs, which are sorted files of states
+(delayed duplicate detection). Runs are read back through memory maps, a chunk at a time.
+
+Children are tagged with their parent's position in the generation and their press. The first copy
+of each state is the one the serial search meets first, and the next generation is written in the
+order the serial search would pop it. So the Play is the same one ``solve()`` returns.
+"""
+
+import heapq
+import mmap
+import os
+import tempfile
+from array import array
+from itertools import count
+from typing import Iterable, Iterator
+
+from packed import (
+    BLUE,
+    CELL_MASK,
+    CENTER_SHIFT,
+    PACKED_BEHAVIORS,
+    PRESS_ORDER,
+    RECOUNTING,
+    PackedState,
+    cell_index,
+    pack,
+    pack_goal,
+    unpack,
+)
+from pruning import PruningIndex
+from solver import Goal, Grid, Play, Unsolvable
+from stats import SolveStats
+
+KEY_BYTES = 48
+"""Memory taken by one buffered key: a list slot and a small Python int."""
+
+CHUNK_WORDS = 1 << 13
+"""64-bit words read from a run at a time."""
+
+MAX_VISITED_RUNS = 8
+"""Visited runs kept before they are merged into one."""
+
+WORD_MASK = (1 << 64) - 1
+STATE_BITS = 36
+# a child's sequence number: its parent's position in the generation * 9 + its press index
+SEQ_BITS = 36
+SEQ_MASK = (1 << SEQ_BITS) - 1
+ROOT = SEQ_MASK
+"""Sequence number of the starting state, which has no parent."""
+
+
+class _Run:
+    """A file of 64-bit words, written a chunk at a time."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, "wb")
+        self.buffer = array("Q")
+
+    def append(self, word: int) -> None:
+        self.buffer.append(word)
+        if len(self.buffer) == CHUNK_WORDS:
+            self.buffer.tofile(self.file)
+            del self.buffer[:]
+
+    def close(self) -> str:
+        self.buffer.tofile(self.file)
+        self.file.close()
+        return self.path
+
+
+class _Scratch:
+    """Numbered run files in a scratch directory."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.files = count()
+
+    def open(self) -> _Run:
+        return _Run(os.path.join(self.directory, f"{next(self.files)}.run"))
+
+    def write(self, words: Iterable[int]) -> str:
+        run = self.open()
+        for word in words:
+            run.append(word)
+        return run.close()
+
+
+def _words(path: str) -> Iterator[int]:
+    """The words of a file, in order."""
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            step = CHUNK_WORDS * 8
+            for offset in range(0, len(mapped), step):
+                # a copy per chunk, so no view outlives the map if the reader stops early
+                yield from array("Q", mapped[offset:offset + step])
+
+
+def _pairs(path: str) -> Iterator[int]:
+    """Two-word keys, written high word first."""
+    words = _words(path)
+    for high in words:
+        yield high << 64 | next(words)
+
+
+def _split(keys: Iterable[int]) -> Iterator[int]:
+    for key in keys:
+        yield key >> 64
+        yield key & WORD_MASK
+
+
+class _SortedRuns:
+    """Keys buffered up to ``capacity`` at a time, then sorted and spilled; read back merged."""
+
+    def __init__(self, scratch: _Scratch, capacity: int) -> None:
+        self.scratch = scratch
+        self.capacity = capacity
+        self.keys = list[int]()
+        self.runs = list[str]()
+
+    def add(self, key: int) -> None:
+        self.keys.append(key)
+        if len(self.keys) >= self.capacity:
+            self.keys.sort()
+            self.runs.append(self.scratch.write(_split(self.keys)))
+            self.keys = []
+
+    def __iter__(self) -> Iterator[int]:
+        self.keys.sort()
+        if not self.runs:
+            return iter(self.keys)
+        return heapq.merge(self.keys, *map(_pairs, self.runs))
+
+    def close(self) -> None:
+        for run in self.runs:
+            os.remove(run)
+        self.runs = []
+        self.keys = []
+
+
+def _record(path: str, ordinal: int) -> tuple[PackedState, int]:
+    """(state, sequence number) of one record of a generation file."""
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        state, seq = array("Q", mapped[16 * ordinal:16 * ordinal + 16])
+    return state, seq
+
+
+def solve_spilled(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int = 10,
+    memory: int = 64 << 20,
+    pruning: PruningIndex | None = None,
+    stats: SolveStats | None = None,
+    directory: str | None = None,
+) -> tuple[Play, Grid] | None:
+    """``solve()`` holding about ``memory`` bytes of states at once, spilling the rest under ``directory``.
+
+    Scratch files go in a temporary directory there (default: the system's), removed when done.
+    Reading the runs back takes a further 64KiB per run merged.
+    """
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    goal_mask, goal_value = pack_goal(goal)
+    goal_cells = [(4 * cell_index(pos), color.value) for pos, color in goal]
+
+    def goals_remaining(state: PackedState) -> int:
+        return sum(1 for shift, value in goal_cells if (state >> shift) & CELL_MASK != value)
+
+    if pruning is None:
+        pruning = PruningIndex(goal, grid.colors)
+    behaviors = PACKED_BEHAVIORS
+
+    # children and survivors are never buffered at the same time, but the last sorted chunk of
+    # children is merged in memory while survivors fill
+    capacity = max(1024, memory // (2 * KEY_BYTES))
+
+    with tempfile.TemporaryDirectory(prefix="mora-jai-", dir=directory) as scratch_directory:
+        scratch = _Scratch(scratch_directory)
+        start = pack(grid.colors)
+        # one file per generation, the starting state first: (state, sequence number) in pop order
+        generations = [scratch.write([start, ROOT])]
+        visited_runs = [scratch.write([start])]
+        states_explored = 1
+        max_depth_reached = 0
+        total_impossibles = 0
+
+        for depth in count():
+            # (state, sequence number, recounted), so the first copy of a state sorts first
+            children = _SortedRuns(scratch, capacity)
+            found = None
+            words = _words(generations[-1])
+            for ordinal, state in enumerate(words):
+                next(words)
+                center_color = (state >> CENTER_SHIFT) & CELL_MASK
+                for press_index, (_, index) in enumerate(PRESS_ORDER):
+                    color = (state >> (4 * index)) & CELL_MASK
+                    new_state = behaviors[color](index, state)
+                    if new_state is None:
+                        continue
+                    if new_state & goal_mask == goal_value:
+                        found = (ordinal, press_index, new_state)
+                        break
+                    recounted = (center_color if color == BLUE else color) in RECOUNTING
+                    children.add(((new_state << SEQ_BITS | 9 * ordinal + press_index) << 1) | recounted)
+                if found:
+                    break
+            words.close()
+
+            # (goals remaining, sequence number descending, state): the order the serial search pops
+            survivors = _SortedRuns(scratch, capacity)
+            new_states = scratch.open()
+            visited = heapq.merge(*map(_words, visited_runs))
+            seen = next(visited, None)
+            previous = None
+            for key in children:
+                state = key >> (SEQ_BITS + 1)
+                if state == previous:
+                    # a later copy of a state met earlier in this generation
+                    continue
+                previous = state
+                while seen is not None and seen < state:
+                    seen = next(visited, None)
+                if seen == state:
+                    continue
+
+                new_states.append(state)
+                states_explored += 1
+
+                # same pruning as the reference: counts are only rebuilt after a press that changed colors
+                if pruning.prunes_packed(state, bool(key & 1)):
+                    total_impossibles += 1
+                    continue
+                if depth >= max_depth:
+                    max_depth_reached += 1
+                    continue
+                if found:
+                    # counted like the children the serial search meets before the solution, never queued
+                    continue
+                seq = (key >> 1) & SEQ_MASK
+                survivors.add(((goals_remaining(state) << SEQ_BITS | SEQ_MASK - seq) << STATE_BITS) | state)
+            visited_runs.append(new_states.close())
+            children.close()
+
+            if found:
+                survivors.close()
+                break
+
+            if len(visited_runs) > MAX_VISITED_RUNS:
+                merged = scratch.write(heapq.merge(*map(_words, visited_runs)))
+                for run in visited_runs:
+                    os.remove(run)
+                visited_runs = [merged]
+
+            generation = scratch.write(
+                word
+                for key in survivors
+                for word in (key & ((1 << STATE_BITS) - 1), SEQ_MASK - ((key >> STATE_BITS) & SEQ_MASK))
+            )
+            survivors.close()
+            if not os.path.getsize(generation):
+                break
+            generations.append(generation)
+
+        if stats is not None:
+            stats.states_explored, stats.depth_limited, stats.impossibles = (
+                states_explored, max_depth_reached, total_impossibles,
+            )
+
+        if found:
+            ordinal, press_index, state = found
+            presses = [press_index]
+            for generation in reversed(generations[1:]):
+                _, seq = _record(generation, ordinal)
+                ordinal, press_index = divmod(seq, 9)
+                presses.append(press_index)
+
+            play = None
+            for press_index in reversed(presses):
+                position = PRESS_ORDER[press_index][0]
+                play = play.next(position) if play else Play(None, position)
+            return play, Grid(unpack(state), None)
+
+    if not max_depth_reached:
+        raise Unsolvable(f"No solution found within max depth; {states_explored} unique states explored.")
+
+    return None
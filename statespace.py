@@ -0,0 +1,202 @@
+"""Whole-room precomputation: every state reachable from a starting grid, and per-goal distances.
+
+``explore()`` runs the BFS to exhaustion with no goal, recording each state's successors. From that,
+``StateSpace.distances()`` builds a ``DistanceIndex`` for a goal: for every state of the room, the
+fewest presses to the goal and the press that starts such a path. Indexes are saved as flat binary
+files, and a lookup from any state of the room is a binary search, so a hint mid-puzzle or a full
+solution costs O(path length) lookups instead of a search::
+
+    space = explore(grid)
+    space.distances(corners(Color.RED)).save("fenn-red.idx")
+    ...
+    index = DistanceIndex.load("fenn-red.idx")
+    distance, position = index.lookup(current_grid)
+"""
+
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Self
+
+from packed import PRESS_ORDER, PackedState, pack, pack_goal, press_packed, unpack
+from solver import GRID_POSITIONS, Goal, Grid, Play, Position, Unsolvable
+
+UNREACHABLE = 0xFF
+"""Distance of states the goal can't be reached from."""
+
+NO_MOVE = 0xFF
+"""Best move of states that already meet the goal, or can't reach it."""
+
+# magic, version, goal mask, goal value, state count; all little-endian
+HEADER = struct.Struct("<4sBQQQ")
+MAGIC = b"MJDI"
+VERSION = 1
+
+
+class StateSpace:
+    """Every state reachable from a start state, in BFS order, with each state's successors."""
+
+    def __init__(self, states: list[PackedState], successors: array) -> None:
+        self.states = states
+        """Packed states, the start state first."""
+        self.successors = successors
+        """For state ``i``, entries ``9*i`` to ``9*i + 8``: the index of the state each press in
+        ``PRESS_ORDER`` leads to, or -1 if the press changes nothing."""
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def distances(self, goal: Goal) -> "DistanceIndex":
+        """Fewest presses to the goal and the best press from every state, by BFS back from the goal states."""
+        goal_mask, goal_value = pack_goal(goal)
+        states, successors = self.states, self.successors
+        count = len(states)
+
+        # predecessors, CSR style: those of state j are predecessors[offsets[j]:offsets[j + 1]]
+        offsets = array("I", bytes(4 * (count + 1)))
+        for j in successors:
+            if j >= 0:
+                offsets[j + 1] += 1
+        for j in range(count):
+            offsets[j + 1] += offsets[j]
+        predecessors = array("I", bytes(4 * offsets[count]))
+        filled = offsets[:-1]
+        for i in range(count):
+            for j in successors[9 * i:9 * i + 9]:
+                if j >= 0:
+                    predecessors[filled[j]] = i
+                    filled[j] += 1
+
+        distances = bytearray([UNREACHABLE]) * count
+        frontier = [i for i, state in enumerate(states) if state & goal_mask == goal_value]
+        for i in frontier:
+            distances[i] = 0
+        distance = 0
+        while frontier:
+            distance += 1
+            if distance >= UNREACHABLE:
+                raise ValueError(f"Room has states more than {UNREACHABLE - 1} presses from the goal")
+            next_frontier = []
+            for j in frontier:
+                for i in predecessors[offsets[j]:offsets[j + 1]]:
+                    if distances[i] == UNREACHABLE:
+                        distances[i] = distance
+                        next_frontier.append(i)
+            frontier = next_frontier
+
+        # the first press (in solve() order) onto a state one step closer
+        moves = bytearray([NO_MOVE]) * count
+        for i, distance in enumerate(distances):
+            if distance == 0 or distance == UNREACHABLE:
+                continue
+            for press_index, j in enumerate(successors[9 * i:9 * i + 9]):
+                if j >= 0 and distances[j] == distance - 1:
+                    moves[i] = press_index
+                    break
+
+        order = sorted(range(count), key=states.__getitem__)
+        return DistanceIndex(
+            goal_mask,
+            goal_value,
+            array("Q", (states[i] for i in order)),
+            bytes(distances[i] for i in order),
+            bytes(moves[i] for i in order),
+        )
+
+
+def explore(grid: Grid) -> StateSpace:
+    """Every state reachable from the grid, by BFS to exhaustion."""
+    start = pack(grid.colors)
+    states = [start]
+    indexes = {start: 0}
+    successors = array("i")
+
+    # the states list is the queue
+    for state in states:
+        for _, index in PRESS_ORDER:
+            new_state = press_packed(index, state)
+            if new_state is None:
+                successors.append(-1)
+                continue
+            if (j := indexes.get(new_state)) is None:
+                j = indexes[new_state] = len(states)
+                states.append(new_state)
+            successors.append(j)
+
+    return StateSpace(states, successors)
+
+
+class DistanceIndex:
+    """Fewest presses to one goal, and the best press, for every state of a room; sorted by state."""
+
+    def __init__(self, goal_mask: int, goal_value: int, states: array, distances: bytes, moves: bytes) -> None:
+        self.goal_mask = goal_mask
+        self.goal_value = goal_value
+        self.states = states
+        self.distances = distances
+        self.moves = moves
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def _find(self, state: PackedState) -> int:
+        i = bisect_left(self.states, state)
+        if i == len(self.states) or self.states[i] != state:
+            raise KeyError("State is not part of the indexed room")
+        return i
+
+    def lookup(self, grid: Grid) -> tuple[int, Position | None] | None:
+        """(presses to the goal, the press to make next) from the grid, or None if the goal is out of reach.
+
+        Raises KeyError if the grid isn't a state of the room the index was built for.
+        """
+        i = self._find(pack(grid.colors))
+        if self.distances[i] == UNREACHABLE:
+            return None
+        move = self.moves[i]
+        return self.distances[i], None if move == NO_MOVE else GRID_POSITIONS[move]
+
+    def solution(self, grid: Grid) -> tuple[Play, Grid]:
+        """A shortest Play from the grid to the goal, following the best presses, as ``solve()`` returns it."""
+        state = pack(grid.colors)
+        i = self._find(state)
+        if self.distances[i] == 0:
+            raise ValueError("Grid already meets goal")
+        if self.distances[i] == UNREACHABLE:
+            raise Unsolvable("No solution from this state (indexed).")
+
+        play = None
+        while self.distances[i]:
+            position, index = PRESS_ORDER[self.moves[i]]
+            play = play.next(position) if play else Play(None, position)
+            state = press_packed(index, state)
+            i = self._find(state)
+        return play, Grid(unpack(state), None)
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        states = array("Q", self.states)
+        if sys.byteorder == "big":
+            states.byteswap()
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.goal_mask, self.goal_value, len(states)))
+            file.write(states.tobytes())
+            file.write(self.distances)
+            file.write(self.moves)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> Self:
+        with open(path, "rb") as file:
+            magic, version, goal_mask, goal_value, count = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a distance index: {path}")
+            states = array("Q")
+            states.frombytes(file.read(8 * count))
+            if sys.byteorder == "big":
+                states.byteswap()
+            distances = file.read(count)
+            moves = file.read(count)
+        if len(states) != count or len(distances) != count or len(moves) != count:
+            raise ValueError(f"Truncated distance index: {path}")
+        return cls(goal_mask, goal_value, states, distances, moves)
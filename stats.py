@@ -0,0 +1,89 @@
+"""Search instrumentation: ``solve()``'s counters, per generation, and behavior timing."""
+
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from solver import COLOR_BEHAVIORS, Behavior, Color, Grid, Position
+
+
+@dataclass
+class DepthStats:
+    """Counters for the presses made from one generation of the search."""
+
+    depth: int
+    """``Play.depth`` of the states this generation's presses produced."""
+    generated: int = 0
+    """Presses that changed the grid."""
+    duplicates: int = 0
+    """Changed grids that had already been played."""
+    pruned: int = 0
+    """New states pruned because the goal was unreachable from them."""
+    depth_limited: int = 0
+    """New states not expanded because they hit ``max_depth``."""
+    noops: Counter[Color] = field(default_factory=Counter)
+    """Presses that changed nothing, by the pressed tile's color."""
+    frontier: int = 0
+    """States queued for the next generation."""
+    visited_bytes: int = 0
+    """Size of the visited set itself (not the states in it) once this generation was done."""
+    seconds: float = 0.0
+    """Time spent on this generation."""
+
+
+@dataclass
+class SolveStats:
+    """Search counters, filled in by ``solve()`` when passed as ``stats``."""
+
+    states_explored: int = 0
+    """Unique states reached (the size of the visited set)."""
+    depth_limited: int = 0
+    """New states not expanded because they hit ``max_depth``."""
+    impossibles: int = 0
+    """New states pruned because the goal was unreachable from them."""
+    skipped_commuting: int = 0
+    """Presses ``skip_commuting`` skipped without making, as reorderings of the press before them."""
+    depths: list[DepthStats] = field(default_factory=list)
+    """Per generation counters, in search order. Only the reference backend fills these in."""
+    on_depth: Callable[[DepthStats], None] | None = field(default=None, compare=False, repr=False)
+    """Called with each generation's counters as soon as it is done, e.g. to watch a search that blows up."""
+
+    @property
+    def peak_visited_bytes(self) -> int:
+        return max((depth.visited_bytes for depth in self.depths), default=0)
+
+    def _finish_depth(self, depth: DepthStats, visited: set, started: float) -> None:
+        depth.visited_bytes = sys.getsizeof(visited)
+        depth.seconds = time.perf_counter() - started
+        self.depths.append(depth)
+        if self.on_depth is not None:
+            self.on_depth(depth)
+
+
+@contextmanager
+def timed_behaviors() -> Iterator[Counter[Color]]:
+    """Times every ``COLOR_BEHAVIORS`` handler while active, yielding the total seconds per color.
+
+    Only the reference backend calls these handlers; blue's time includes the behavior it copies.
+    """
+    seconds = Counter[Color]()
+    behaviors = dict(COLOR_BEHAVIORS)
+
+    def timed(color: Color, behavior: Behavior) -> Behavior:
+        def timed_behavior(position: Position, grid: Grid) -> Grid | None:
+            start = time.perf_counter()
+            try:
+                return behavior(position, grid)
+            finally:
+                seconds[color] += time.perf_counter() - start
+
+        return timed_behavior
+
+    COLOR_BEHAVIORS.update((color, timed(color, behavior)) for color, behavior in behaviors.items())
+    try:
+        yield seconds
+    finally:
+        COLOR_BEHAVIORS.update(behaviors)
@@ -0,0 +1,169 @@
+"""Persistent solution cache, keyed by packed starting state and goal.
+
+Solutions are stored as move strings (one digit per press: the pressed cell's index), and
+searches that came up empty are stored too: ``Unsolvable`` for good, or "nothing within N presses"
+so a later call with the same or a smaller budget returns at once. Plain BFS searches that ran out
+of depth also keep a ``Solver`` checkpoint, so a later call with a deeper budget resumes from there.
+Searches with options (strategy, backend, symmetry, ...) bypass the store.
+"""
+
+import os
+import sqlite3
+from typing import Any
+
+from packed import pack, pack_goal
+from resumable import Solver
+from solver import INDEX_POSITIONS, Goal, Grid, Play, Unsolvable, cell_index, press, solve
+from stats import SolveStats
+
+SOLVED = "solved"
+UNSOLVABLE = "unsolvable"
+DEPTH_EXCEEDED = "depth exceeded"
+
+SCHEMA = """
+create table if not exists solutions (
+    start integer not null,
+    goal_mask integer not null,
+    goal_value integer not null,
+    status text not null,
+    moves text,
+    -- for depth exceeded: the max_depth searched without finding a solution
+    max_depth integer,
+    -- for depth exceeded: a resumable.Solver checkpoint, if one was kept
+    checkpoint blob,
+    primary key (start, goal_mask, goal_value)
+)
+"""
+
+
+def encode_moves(play: Play | None) -> str:
+    moves = []
+    while play:
+        moves.append(str(cell_index(play.press)))
+        play = play.previous
+    return "".join(reversed(moves))
+
+
+def decode_moves(moves: str) -> Play | None:
+    play = None
+    for move in moves:
+        position = INDEX_POSITIONS[int(move)]
+        play = play.next(position) if play else Play(None, position)
+    return play
+
+
+class SolutionStore:
+    """SQLite-backed ``solve()`` results. Use ``":memory:"`` for a throwaway store."""
+
+    def __init__(self, path: str | os.PathLike[str] = ":memory:") -> None:
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "SolutionStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _key(grid: Grid, goal: Goal) -> tuple[int, int, int]:
+        return pack(grid.colors), *pack_goal(goal)
+
+    def lookup(self, grid: Grid, goal: Goal) -> tuple[str, str | None, int | None, bytes | None] | None:
+        """The stored (status, moves, max depth, checkpoint) for this puzzle, if any."""
+        return self.connection.execute(
+            "select status, moves, max_depth, checkpoint from solutions"
+            " where start = ? and goal_mask = ? and goal_value = ?",
+            self._key(grid, goal),
+        ).fetchone()
+
+    def record(
+        self,
+        grid: Grid,
+        goal: Goal,
+        status: str,
+        moves: str | None = None,
+        max_depth: int | None = None,
+        checkpoint: bytes | None = None,
+    ) -> None:
+        with self.connection:
+            self.connection.execute(
+                "insert or replace into solutions values (?, ?, ?, ?, ?, ?, ?)",
+                (*self._key(grid, goal), status, moves, max_depth, checkpoint),
+            )
+
+    def solve(
+        self, grid: Grid, goal: Goal, max_depth: int = 10, stats: SolveStats | None = None, **options: Any
+    ) -> tuple[Play, Grid] | None:
+        """``solve()``, answered from the store when it already knows the outcome.
+
+        Only the plain BFS is stored: ``options`` change how the search runs and which Play it
+        finds, so a call with any of them always searches and leaves the store alone. ``stats`` is
+        filled in by the search; an answer from the store searched nothing, so it is zeroed.
+        """
+        if options:
+            self.misses += 1
+            return solve(grid, goal, max_depth, stats=stats, **options)
+
+        checkpoint = None
+        match self.lookup(grid, goal):
+            case (status, moves, _, _) if status == SOLVED:
+                self._hit(stats)
+                # the plain BFS meets its solution at the same depth whatever the budget, so a
+                # smaller budget finds nothing
+                if len(moves) > max_depth + 1:
+                    return None
+                play = decode_moves(moves)
+                final = grid
+                for move in moves:
+                    final = press(INDEX_POSITIONS[int(move)], final)
+                return play, final
+            case (status, _, _, _) if status == UNSOLVABLE:
+                self._hit(stats)
+                raise Unsolvable("No solution found (cached).")
+            case (status, _, searched, _) if status == DEPTH_EXCEEDED and max_depth <= searched:
+                self._hit(stats)
+                return None
+            case (status, _, _, checkpoint) if status == DEPTH_EXCEEDED:
+                pass
+
+        self.misses += 1
+        solver = None
+        if checkpoint is not None:
+            try:
+                solver = Solver.loads(checkpoint)
+                solver.extend_depth(max_depth)
+            except ValueError:
+                # unreadable (or from an older version): search again from the start
+                solver = None
+        if solver is None:
+            solver = Solver(grid, goal, max_depth)
+
+        try:
+            solution = solver.run()
+        except Unsolvable:
+            self.record(grid, goal, UNSOLVABLE)
+            raise
+        finally:
+            if stats is not None:
+                searched = solver.stats
+                stats.states_explored, stats.depth_limited, stats.impossibles = (
+                    searched.states_explored, searched.depth_limited, searched.impossibles,
+                )
+
+        if solution is None:
+            self.record(grid, goal, DEPTH_EXCEEDED, max_depth=max_depth, checkpoint=solver.dumps())
+        else:
+            self.record(grid, goal, SOLVED, encode_moves(solution[0]))
+        return solution
+
+    def _hit(self, stats: SolveStats | None) -> None:
+        self.hits += 1
+        if stats is not None:
+            stats.states_explored = stats.depth_limited = stats.impossibles = stats.skipped_commuting = 0
+            stats.depths = []
@@ -0,0 +1,75 @@
+"""Goal-preserving grid symmetries, for collapsing mirror-image states into one visited entry.
+
+A symmetry of the square only holds for the search if every behavior that can ever run looks the
+same after applying it: purple and yellow pin down up vs down, black rotates rows to the right and
+pink cycles clockwise. Green, white, red, orange and gray don't care about direction, and blue
+just borrows the behavior of one of the other colors present.
+"""
+
+from typing import Callable
+
+from packed import CELL_MASK, PackedState
+from reachability import reachable_colors
+from solver import INDEX_POSITIONS, Color, Goal, Position, cell_index
+
+type Transform = Callable[[Position], Position]
+
+SYMMETRIES: dict[str, tuple[Transform, frozenset[Color]]] = {
+    # name: (transform, colors whose behavior it breaks)
+    "mirror": (lambda p: Position(-p.x, p.y), frozenset({Color.BLACK, Color.PINK})),
+    "flip": (lambda p: Position(p.x, -p.y), frozenset({Color.PURPLE, Color.YELLOW, Color.PINK})),
+    "rotate 90": (lambda p: Position(-p.y, p.x), frozenset({Color.PURPLE, Color.YELLOW, Color.BLACK})),
+    "rotate 180": (lambda p: Position(-p.x, -p.y), frozenset({Color.PURPLE, Color.YELLOW, Color.BLACK})),
+    "rotate 270": (lambda p: Position(p.y, -p.x), frozenset({Color.PURPLE, Color.YELLOW, Color.BLACK})),
+    "transpose": (
+        lambda p: Position(p.y, p.x),
+        frozenset({Color.PURPLE, Color.YELLOW, Color.BLACK, Color.PINK}),
+    ),
+    "antitranspose": (
+        lambda p: Position(-p.y, -p.x),
+        frozenset({Color.PURPLE, Color.YELLOW, Color.BLACK, Color.PINK}),
+    ),
+}
+"""Non-identity symmetries of the square, and the colors that rule each one out."""
+
+
+class Symmetries:
+    """The symmetries that hold for a room and goal, as cell permutations.
+
+    Only symmetries that map the goal onto itself and that no color the room can ever contain
+    breaks are kept; these form a group, so the smallest image of a state is a canonical form
+    shared by all of its images.
+    """
+
+    def __init__(self, goal: Goal, colors: list[Color]) -> None:
+        reachable = reachable_colors(frozenset(colors))
+
+        self.names = list[str]()
+        # (source shift, target shift) pairs for each kept symmetry
+        self._shifts = list[tuple[tuple[int, int], ...]]()
+        for name, (transform, breaking) in SYMMETRIES.items():
+            if breaking & reachable:
+                continue
+            if {(transform(pos), color) for pos, color in goal} != goal:
+                continue
+            self.names.append(name)
+            self._shifts.append(tuple(
+                (4 * i, 4 * cell_index(transform(pos))) for i, pos in enumerate(INDEX_POSITIONS)
+            ))
+
+    def __bool__(self) -> bool:
+        return bool(self._shifts)
+
+    def images(self, state: PackedState) -> list[PackedState]:
+        """The state under each kept symmetry (identity excluded)."""
+        images = []
+        for shifts in self._shifts:
+            image = 0
+            for source, target in shifts:
+                image |= ((state >> source) & CELL_MASK) << target
+            images.append(image)
+        return images
+
+    def canonical(self, state: PackedState) -> PackedState:
+        """The smallest of the state and its images."""
+        return min(state, *self.images(state)) if self._shifts else state
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+from astar import goal_heuristic
+from packed import pack
+from solver import Color, Unsolvable, corners, playthrough, solve
+from test_solve import create_grid
+
+
+def random_puzzle(rng: random.Random):
+    colors = rng.sample(list(Color), k=4)
+    grid = create_grid(*(tuple(rng.choices(colors, k=3)) for _ in range(3)))
+    return grid, corners(rng.choice(colors))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test__astar_finds_shortest(seed):
+    rng = random.Random(seed)
+    grid, goal = random_puzzle(rng)
+    try:
+        expected = solve(grid, goal, max_depth=6, backend="packed")
+    except (Unsolvable, ValueError):
+        return
+
+    actual = solve(grid, goal, max_depth=6, strategy="astar")
+    if expected is None:
+        assert actual is None
+        return
+
+    play, final = actual
+    assert play.depth == expected[0].depth
+    assert final.meets_goal(goal)
+
+
+def test__heuristic_is_admissible_along_solution():
+    grid = create_grid(
+        (Color.GRAY, Color.GREEN, Color.GRAY),
+        (Color.ORANGE, Color.RED, Color.ORANGE),
+        (Color.WHITE, Color.GREEN, Color.BLACK),
+    )
+    goal = corners(Color.RED)
+    heuristic = goal_heuristic(goal, grid.colors)
+    play, _ = solve(grid, goal, max_depth=30)
+
+    remaining = play.depth + 1
+    assert heuristic(pack(grid.colors)) <= remaining
+    for _, state in playthrough(play, grid):
+        remaining -= 1
+        assert heuristic(pack(state.colors)) <= remaining
+
+
+def test__unreachable_color():
+    grid = create_grid(
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.GRAY, Color.PURPLE, Color.GRAY),
+        (Color.PURPLE, Color.GRAY, Color.PURPLE),
+    )
+    # purples only ever drop: nothing can reach the top corners
+    with pytest.raises(Unsolvable):
+        solve(grid, corners(Color.PURPLE), strategy="astar")
+
+
+def test__rejects_symmetry():
+    grid, goal = random_puzzle(random.Random(0))
+    with pytest.raises(ValueError, match="symmetry"):
+        solve(grid, goal, strategy="astar", symmetry=True)
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+from backends import BACKENDS, Backend, available, differences, fuzz, random_room
+from bench import puzzle
+from packed import pack
+from solver import Color, Position, TransitionCache, corners, solve
+from test_solve import create_grid
+
+C = Color
+
+
+def test__backends_press_like_the_reference():
+    assert fuzz(150, seed=1) == []
+
+
+@pytest.mark.parametrize(
+    "rows",
+    [
+        # orange with tied neighbors, and with a majority
+        ((C.GRAY, C.RED, C.GRAY), (C.BLUE, C.ORANGE, C.RED), (C.GRAY, C.BLUE, C.GRAY)),
+        ((C.GRAY, C.RED, C.GRAY), (C.RED, C.ORANGE, C.RED), (C.GRAY, C.BLUE, C.GRAY)),
+        # white next to whites (blanked) and blanks (whitened)
+        ((C.WHITE, C.WHITE, C.GRAY), (C.GRAY, C.WHITE, C.WHITE), (C.RED, C.GRAY, C.WHITE)),
+        # blues borrowing the center's behavior
+        ((C.BLUE, C.BLUE, C.GRAY), (C.BLUE, C.WHITE, C.GRAY), (C.GRAY, C.BLUE, C.BLUE)),
+        ((C.BLUE, C.YELLOW, C.BLUE), (C.YELLOW, C.ORANGE, C.BLUE), (C.BLUE, C.YELLOW, C.BLUE)),
+        ((C.BLUE, C.WHITE, C.BLACK), (C.BLACK, C.RED, C.BLUE), (C.WHITE, C.BLUE, C.BLACK)),
+        ((C.BLUE, C.BLACK, C.BLUE), (C.PINK, C.BLUE, C.PURPLE), (C.BLUE, C.GREEN, C.BLUE)),
+    ],
+)
+def test__edge_cases(rows):
+    grid = create_grid(*rows)
+    assert differences(frozenset(grid.colors), [pack(grid.colors)]) == []
+
+
+def test__reports_mismatches(monkeypatch):
+    # a backend that never changes anything
+    broken = Backend(BACKENDS["packed"].search, lambda colors, states: [[None] * 9 for _ in states])
+    monkeypatch.setitem(BACKENDS, "broken", broken)
+    grid = create_grid((C.GRAY, C.GRAY, C.GRAY), (C.GRAY, C.PURPLE, C.GRAY), (C.GRAY, C.GRAY, C.GRAY))
+
+    [mismatch] = differences(frozenset(grid.colors), [pack(grid.colors)], ["broken"])
+    assert mismatch.backend == "broken"
+    assert mismatch.position == Position(0, 0)
+    assert mismatch.expected[4:8:3] == [C.GRAY, C.PURPLE]
+    assert mismatch.actual is None
+    assert "gave no change" in str(mismatch)
+
+
+def test__random_rooms_are_seeded():
+    assert random_room(random.Random(4), 8) == random_room(random.Random(4), 8)
+
+
+def test__solve_dispatches_to_every_backend():
+    expected, _ = solve(*puzzle("fenn"))
+    for name in available():
+        play, _ = solve(*puzzle("fenn"), backend=name)
+        assert play == expected, name
+
+
+def test__unsupported_options():
+    grid = create_grid((C.GRAY, C.PURPLE, C.GRAY), (C.GRAY, C.PINK, C.GRAY), (C.PURPLE, C.PURPLE, C.PURPLE))
+    with pytest.raises(ValueError, match="Unknown backend"):
+        solve(grid, corners(C.PURPLE), backend="fortran")
+    with pytest.raises(ValueError, match="kernel backend doesn't support transitions or skip_commuting"):
+        solve(grid, corners(C.PURPLE), backend="kernel", transitions=TransitionCache(), skip_commuting=True)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"backend": "fortran", "strategy": "astar"},
+        {"backend": "fortran", "memory": 10**6},
+        {"backend": "kernel", "strategy": "astar"},
+        {"backend": "kernel", "memory": 10**6},
+        {"backend": "numpy", "workers": 2},
+        {"strategy": "dfs"},
+    ],
+)
+def test__backend_and_search_mismatches(options):
+    grid, goal, max_depth = puzzle("fenn")
+    with pytest.raises(ValueError):
+        solve(grid, goal, max_depth, **options)
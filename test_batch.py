@@ -0,0 +1,89 @@
+import io
+import json
+
+from batch import Puzzle, main, parse_goal, parse_puzzle, read_puzzles, solve_many
+from solver import Color, Position, corners
+
+FENN = "gray green gray orange red orange white green black"
+
+
+def test__parse_goal():
+    assert parse_goal("red") == corners(Color.RED)
+    assert parse_goal("red red blue blue") == {
+        (Position(-1, -1), Color.RED),
+        (Position(1, -1), Color.RED),
+        (Position(-1, 1), Color.BLUE),
+        (Position(1, 1), Color.BLUE),
+    }
+
+
+def test__read_csv():
+    file = io.StringIO(f"id,colors,goal,max_depth\nfenn,{FENN},red,30\n")
+    [puzzle] = read_puzzles(file, "csv")
+    assert puzzle == Puzzle("fenn", [Color[name.upper()] for name in FENN.split()], corners(Color.RED), 30)
+
+
+def test__solve_many():
+    puzzles = [
+        Puzzle("fenn", [Color[name.upper()] for name in FENN.split()], corners(Color.RED), 30),
+        Puzzle("shallow", [Color[name.upper()] for name in FENN.split()], corners(Color.RED), 2),
+        Puzzle("slow", [Color[name.upper()] for name in FENN.split()], corners(Color.RED), 30),
+    ]
+    results = {r.id: r for r in solve_many(puzzles[:2], workers=2)}
+    [slow] = solve_many(puzzles[2:], timeout=0.01)
+
+    assert results["fenn"].status == "solved"
+    assert len(results["fenn"].moves) == 11
+    assert results["fenn"].states_explored > 0
+    assert results["shallow"].status == "depth exceeded"
+    assert slow.status == "timeout"
+
+
+def test__cli(tmp_path, capsys):
+    path = tmp_path / "rooms.jsonl"
+    path.write_text(json.dumps({"id": "fenn", "colors": FENN, "goal": "red", "max_depth": 30}) + "\n")
+
+    main([str(path), "--workers", "1", "--backend", "packed"])
+
+    [line] = capsys.readouterr().out.splitlines()
+    result = json.loads(line)
+    assert result["id"] == "fenn"
+    assert result["status"] == "solved"
+    assert len(result["moves"]) == 11
+
+
+def test__max_depth():
+    assert parse_puzzle({"colors": FENN, "goal": "red", "max_depth": 0}, "1").max_depth == 0
+    assert parse_puzzle({"colors": FENN, "goal": "red", "max_depth": ""}, "1").max_depth == 10
+    assert parse_puzzle({"colors": FENN, "goal": "red"}, "1").max_depth == 10
+
+
+def test__cli_reports_bad_lines(tmp_path, capsys):
+    path = tmp_path / "rooms.jsonl"
+    path.write_text("\n".join([
+        json.dumps({"id": "fenn", "colors": FENN, "goal": "red", "max_depth": 30}),
+        '{"id": "truncated", "colors"',
+        json.dumps({"id": "mauve", "colors": FENN.replace("black", "mauve"), "goal": "red"}),
+        json.dumps({"colors": FENN}),
+    ]) + "\n")
+
+    main([str(path), "--workers", "1"])
+
+    results = {result["id"]: result for result in map(json.loads, capsys.readouterr().out.splitlines())}
+    assert results["fenn"]["status"] == "solved"
+    assert results["2"]["status"] == "error"
+    assert "line 2" in results["2"]["error"]
+    assert results["mauve"]["status"] == "error"
+    assert "MAUVE" in results["mauve"]["error"]
+    assert results["4"]["status"] == "error"
+    assert "goal" in results["4"]["error"]
+
+
+def test__cli_leaves_stdin_open(monkeypatch, capsys):
+    stdin = io.StringIO(json.dumps({"id": "fenn", "colors": FENN, "goal": "red", "max_depth": 30}) + "\n")
+    monkeypatch.setattr("sys.stdin", stdin)
+
+    main(["-", "--workers", "1"])
+
+    assert not stdin.closed
+    assert json.loads(capsys.readouterr().out)["status"] == "solved"
@@ -0,0 +1,30 @@
+from bench import puzzle, random_corpus, regressions, sample_states
+from packed import pack
+from solver import Grid, corners, solve
+
+
+def test__random_corpus_is_seeded_and_exact():
+    corpus = random_corpus([3, 4], per_depth=2, seed=5)
+    assert corpus == random_corpus([3, 4], per_depth=2, seed=5)
+    assert list(corpus) == ["random_3_0", "random_3_1", "random_4_0", "random_4_1"]
+    for colors, goal_color, depth in corpus.values():
+        play, _ = solve(Grid(list(colors), None), corners(goal_color), depth, backend="packed")
+        assert play.depth + 1 == depth
+
+
+def test__regressions():
+    baseline = {"a": {"seconds": 1.0, "moves": 5, "states": 100}, "b": {"seconds": 1.0, "moves": None, "states": 9}}
+    results = {
+        "a": {"seconds": 1.1, "moves": 5, "states": 100},
+        "b": {"seconds": 1.5, "moves": 4, "states": 9},
+        "new": {"seconds": 9.0, "moves": 1, "states": 1},
+    }
+    assert regressions(results, baseline, tolerance=0.2) == ["b: 1.000s -> 1.500s", "b: solution None -> 4 moves"]
+
+
+def test__sample_states():
+    grid, _, _ = puzzle("fenn")
+    states = sample_states(grid, 500)
+    assert len(states) == len(set(states)) == 500
+    assert states[0] == pack(grid.colors)
+    assert sample_states(grid, 10) == states[:10]
@@ -1,17 +1,29 @@
 from solver import Color, black, Position
+from test_solve import create_grid
 
 
 def test__black():
-    grid = {
-        Position(-1, 0): Color.BLACK,
-        Position(0, 0): Color.WHITE,
-        Position(1, 0): Color.RED,
-    }
+    grid = create_grid(
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.BLACK, Color.WHITE, Color.RED),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+    )
 
     actual = black(Position(-1, 0), grid)
 
-    assert actual == {
-        Position(-1, 0): Color.RED,
-        Position(0, 0): Color.BLACK,
-        Position(1, 0): Color.WHITE,
-    }
+    assert actual[Position(-1, 0)] == Color.RED
+    assert actual[Position(0, 0)] == Color.BLACK
+    assert actual[Position(1, 0)] == Color.WHITE
+    assert actual[Position(0, -1)] == Color.GRAY
+    # the pressed grid is untouched
+    assert grid[Position(-1, 0)] == Color.BLACK
+
+
+def test__black_row_all_black():
+    grid = create_grid(
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.BLACK, Color.BLACK, Color.BLACK),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+    )
+
+    assert black(Position(0, 0), grid) is None
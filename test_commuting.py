@@ -0,0 +1,65 @@
+import random
+
+import pytest
+from commuting import commutes, footprint
+from packed import CENTER_SHIFT, CELL_MASK, PRESS_ORDER, press_packed
+from solver import Color, SolveStats, Unsolvable, corners, solve
+from test_astar import random_puzzle
+from test_solve import create_grid
+
+
+def test__commuting_presses_commute():
+    rng = random.Random(3)
+    checked = 0
+    for _ in range(3000):
+        state = 0
+        for shift in range(0, 36, 4):
+            state |= rng.choice(list(Color)).value << shift
+
+        for _, p in PRESS_ORDER:
+            after_p = press_packed(p, state)
+            if after_p is None:
+                continue
+            p_footprint = footprint((state >> (4 * p)) & CELL_MASK, p, (state >> CENTER_SHIFT) & CELL_MASK)
+            for _, q in PRESS_ORDER:
+                q_footprint = footprint((after_p >> (4 * q)) & CELL_MASK, q, (after_p >> CENTER_SHIFT) & CELL_MASK)
+                if not commutes(p_footprint, q_footprint):
+                    continue
+                after_q = press_packed(q, state)
+                assert (press_packed(q, after_p) or after_p) == (press_packed(p, after_q) if after_q else after_p)
+                checked += 1
+    assert checked > 10_000
+
+
+@pytest.mark.parametrize("backend", ["reference", "packed"])
+def test__still_shortest(backend):
+    for seed in range(60):
+        grid, goal = random_puzzle(random.Random(seed))
+        try:
+            expected = solve(grid, goal, max_depth=6, backend=backend)
+        except (Unsolvable, ValueError) as e:
+            with pytest.raises(type(e)):
+                solve(grid, goal, max_depth=6, backend=backend, skip_commuting=True)
+            continue
+
+        actual = solve(grid, goal, max_depth=6, backend=backend, skip_commuting=True)
+        if expected is None:
+            assert actual is None
+        else:
+            assert actual[0].depth == expected[0].depth
+            assert actual[1].meets_goal(goal)
+
+
+def test__reports_skipped_presses():
+    grid = create_grid(
+        (Color.BLACK, Color.YELLOW, Color.GRAY),
+        (Color.YELLOW, Color.GREEN, Color.YELLOW),
+        (Color.GRAY, Color.YELLOW, Color.BLACK),
+    )
+    stats = SolveStats()
+    play, _ = solve(grid, corners(Color.YELLOW), max_depth=10, skip_commuting=True, stats=stats)
+    assert play.depth == solve(grid, corners(Color.YELLOW), max_depth=10)[0].depth
+    assert stats.skipped_commuting > 0
+
+    with pytest.raises(ValueError):
+        solve(grid, corners(Color.YELLOW), symmetry=True, skip_commuting=True)
@@ -0,0 +1,47 @@
+"""Searches that must find the same Play, with the same stats, as the packed BFS."""
+
+import random
+from importlib.util import find_spec
+
+import pytest
+from bench import PUZZLES, puzzle
+from packed import pack
+from solver import SolveStats, Unsolvable, solve
+from test_astar import random_puzzle
+
+SEARCHES = [
+    pytest.param({"backend": "numpy"}, id="numpy", marks=pytest.mark.skipif(not find_spec("numpy"), reason="needs numpy")),
+    pytest.param({"backend": "kernel"}, id="kernel"),
+    # the smallest buffer, so bigger searches spill several runs per generation
+    pytest.param({"memory": 0}, id="spilled"),
+]
+
+
+def assert_same_as_packed(grid, goal, max_depth, **options):
+    expected_stats, actual_stats = SolveStats(), SolveStats()
+    try:
+        expected = solve(grid, goal, max_depth, backend="packed", stats=expected_stats)
+    except (Unsolvable, ValueError) as e:
+        with pytest.raises(type(e)):
+            solve(grid, goal, max_depth, **options)
+        return
+
+    actual = solve(grid, goal, max_depth, stats=actual_stats, **options)
+    assert actual_stats == expected_stats
+    if expected is None:
+        assert actual is None
+    else:
+        assert actual[0] == expected[0]
+        assert pack(actual[1].colors) == pack(expected[1].colors)
+
+
+@pytest.mark.parametrize("options", SEARCHES)
+@pytest.mark.parametrize("seed", range(40))
+def test__random_puzzles(options, seed):
+    assert_same_as_packed(*random_puzzle(random.Random(seed)), 6, **options)
+
+
+@pytest.mark.parametrize("options", SEARCHES)
+@pytest.mark.parametrize("name", PUZZLES)
+def test__known_puzzles(options, name):
+    assert_same_as_packed(*puzzle(name), **options)
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+from kernel import kernel, kernel_source
+from packed import PRESS_ORDER, RECOUNTING, behavior_color, pack, press_packed
+from reachability import reachable_colors
+from solver import Color
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test__kernel_matches_packed(seed):
+    rng = random.Random(seed)
+    colors = reachable_colors(frozenset(rng.sample(list(Color), k=rng.randint(2, 6))))
+    expand = kernel(colors)
+    for _ in range(300):
+        state = pack(rng.choices(sorted(colors, key=lambda color: color.value), k=9))
+        expected = []
+        for press_index, (_, index) in enumerate(PRESS_ORDER):
+            if (new_state := press_packed(index, state)) is not None:
+                expected.append((press_index, new_state, behavior_color(index, state) in RECOUNTING))
+        assert expand(state) == expected, kernel_source(colors)
+
+
+def test__kernels_are_cached_and_specialized():
+    colors = frozenset({Color.GRAY, Color.PURPLE})
+    assert kernel(colors) is kernel(frozenset({Color.PURPLE, Color.GRAY}))
+    source = kernel_source(colors)
+    # purples on the bottom row can't move, and gray never does anything
+    assert source.count("# purple") == 6
+    assert "# gray" not in source
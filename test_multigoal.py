@@ -0,0 +1,54 @@
+import random
+
+import pytest
+from multigoal import solve_goals
+from solver import Color, Position, corners, solve
+from statespace import explore
+from test_astar import random_puzzle
+from test_solve import create_grid
+
+
+def candidate_goals(grid):
+    goals = [corners(color) for color in sorted(set(grid.colors), key=lambda color: color.value)]
+    top_left, top_right, bottom_left, bottom_right = grid.colors[0], grid.colors[2], grid.colors[6], grid.colors[8]
+    # mixed corners: the start's corners rotated a quarter turn
+    goals.append({
+        (Position(-1, -1), bottom_left),
+        (Position(1, -1), top_left),
+        (Position(-1, 1), bottom_right),
+        (Position(1, 1), top_right),
+    })
+    return [goal for goal in goals if not grid.meets_goal(goal)]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test__shortest_for_every_goal(seed):
+    grid, _ = random_puzzle(random.Random(seed))
+    goals = candidate_goals(grid)
+    space = explore(grid)
+    for goal, actual in zip(goals, solve_goals(grid, goals, max_depth=6), strict=True):
+        # presses needed, from the whole state space
+        distance = space.distances(goal).lookup(grid)
+        if distance is None or distance[0] > 7:
+            assert actual is None
+        else:
+            assert actual[0].depth + 1 == distance[0]
+            assert actual[1].meets_goal(goal)
+
+
+def test__fenn_goals():
+    grid = create_grid(
+        (Color.GRAY, Color.GREEN, Color.GRAY),
+        (Color.ORANGE, Color.RED, Color.ORANGE),
+        (Color.WHITE, Color.GREEN, Color.BLACK),
+    )
+    red, green, orange = solve_goals(grid, [corners(Color.RED), corners(Color.GREEN), corners(Color.ORANGE)], 30)
+    assert red[0].depth == solve(grid, corners(Color.RED), 30)[0].depth
+    assert green is None
+    assert orange is None
+
+
+def test__already_met():
+    grid = create_grid(*[(Color.GRAY,) * 3] * 3)
+    with pytest.raises(ValueError):
+        solve_goals(grid, [corners(Color.GRAY)])
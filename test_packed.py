@@ -0,0 +1,47 @@
+import random
+
+import pytest
+from packed import cell_index, pack, press_packed, unpack
+from solver import GRID_POSITIONS, Color, corners, playthrough, press, solve
+from test_solve import create_grid
+
+
+def test__pack_roundtrip():
+    colors = list(Color)[:9]
+    assert unpack(pack(colors)) == colors
+
+
+def test__press_matches_reference():
+    rng = random.Random(1)
+    for _ in range(2000):
+        grid = create_grid(*(tuple(rng.choices(list(Color), k=3)) for _ in range(3)))
+        state = pack(grid.colors)
+        for pos in GRID_POSITIONS:
+            expected = press(pos, grid)
+            actual = press_packed(cell_index(pos), state)
+            if expected is None:
+                assert actual is None, (grid.display(), pos)
+            else:
+                assert actual is not None and unpack(actual) == expected.colors, (grid.display(), pos)
+
+
+@pytest.mark.parametrize("rows, goal_color, max_depth", [
+    (((Color.GRAY, Color.PURPLE, Color.GRAY),
+      (Color.GRAY, Color.PINK, Color.GRAY),
+      (Color.PURPLE, Color.PURPLE, Color.PURPLE)), Color.PURPLE, 5),
+    (((Color.GRAY, Color.GREEN, Color.GRAY),
+      (Color.ORANGE, Color.RED, Color.ORANGE),
+      (Color.WHITE, Color.GREEN, Color.BLACK)), Color.RED, 30),
+    (((Color.RED, Color.WHITE, Color.YELLOW),
+      (Color.BLUE, Color.GREEN, Color.BLUE),
+      (Color.BLUE, Color.YELLOW, Color.BLUE)), Color.RED, 50),
+])
+def test__solve_matches_reference(rows, goal_color, max_depth):
+    goal = corners(goal_color)
+    expected_play, expected_grid = solve(create_grid(*rows), goal, max_depth)
+    play, grid = solve(create_grid(*rows), goal, max_depth, backend="packed")
+
+    assert play == expected_play
+    assert grid.colors == expected_grid.colors
+    *_, (_, final) = playthrough(play, create_grid(*rows))
+    assert final.meets_goal(goal)
@@ -0,0 +1,40 @@
+import pytest
+from solver import Color, Unsolvable, corners, solve
+from test_solve import create_grid
+
+PUZZLES = {
+    "fenn": (
+        ((Color.GRAY, Color.GREEN, Color.GRAY),
+         (Color.ORANGE, Color.RED, Color.ORANGE),
+         (Color.WHITE, Color.GREEN, Color.BLACK)),
+        Color.RED,
+    ),
+    "rough_draft_red": (
+        ((Color.RED, Color.WHITE, Color.YELLOW),
+         (Color.BLUE, Color.GREEN, Color.BLUE),
+         (Color.BLUE, Color.YELLOW, Color.BLUE)),
+        Color.RED,
+    ),
+}
+
+
+@pytest.mark.parametrize("name", PUZZLES)
+@pytest.mark.parametrize("workers", [2, 3])
+def test__same_play_as_serial(name, workers):
+    rows, color = PUZZLES[name]
+    expected_play, expected_grid = solve(create_grid(*rows), corners(color), max_depth=30)
+
+    play, grid = solve(create_grid(*rows), corners(color), max_depth=30, workers=workers)
+
+    assert play == expected_play
+    assert grid.colors == expected_grid.colors
+
+
+def test__unsolvable():
+    grid = create_grid(
+        (Color.GRAY, Color.GRAY, Color.YELLOW),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.YELLOW, Color.YELLOW, Color.YELLOW),
+    )
+    with pytest.raises(Unsolvable):
+        solve(grid, corners(Color.YELLOW), workers=2)
@@ -1,5 +1,6 @@
+import random
 from collections import Counter
-from solver import possible_colors, Color, goal_still_reachable
+from solver import GRID_POSITIONS, Grid, possible_colors, possible_tally_colors, press, tally, Color, goal_still_reachable
 
 def test__red_black_white():
     colors = [Color.RED, Color.WHITE, Color.BLACK]
@@ -39,4 +40,26 @@ def test__counter_comparison():
 
     goal = Counter([Color.RED, Color.RED, Color.RED, Color.RED])
 
-    assert not goal_still_reachable(possibles, goal), "Possible colors should not include more reds than available"
\ No newline at end of file
+    assert not goal_still_reachable(possibles, goal), "Possible colors should not include more reds than available"
+
+
+def test__incremental_tally():
+    """Recolor presses update the carried tally to the grid's actual color counts."""
+    rng = random.Random(4)
+    for _ in range(200):
+        grid = Grid(rng.choices(list(Color), k=9), None)
+        for _ in range(20):
+            new_grid = press(rng.choice(GRID_POSITIONS), grid)
+            if new_grid is None:
+                continue
+            grid = new_grid
+            if grid.tally is not None:
+                assert grid.tally == tally(grid.colors)
+                assert grid.counts is None or grid.counts == possible_colors(grid.colors)
+
+
+def test__possible_tally_colors():
+    rng = random.Random(5)
+    for _ in range(500):
+        colors = rng.choices(list(Color), k=9)
+        assert possible_tally_colors(tally(colors)) == possible_colors(colors)
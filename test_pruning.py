@@ -0,0 +1,38 @@
+import random
+
+import pytest
+from pruning import REACH, PruningIndex
+from solver import Color, Unsolvable, corners, playthrough, solve
+from test_astar import random_puzzle
+from test_solve import create_grid
+
+
+def test__yellows_only_rise():
+    grid = create_grid(
+        (Color.GRAY, Color.GRAY, Color.YELLOW),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.YELLOW, Color.YELLOW, Color.YELLOW),
+    )
+    pruning = PruningIndex(corners(Color.YELLOW), grid.colors)
+
+    with pytest.raises(Unsolvable):
+        solve(grid, corners(Color.YELLOW), pruning=pruning)
+
+    assert pruning.pruned[REACH]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test__reach_never_prunes_a_solution(seed):
+    grid, goal = random_puzzle(random.Random(seed))
+    try:
+        solution = solve(grid, goal, max_depth=6, backend="packed")
+    except (Unsolvable, ValueError):
+        return
+    if solution is None:
+        return
+
+    pruning = PruningIndex(goal, grid.colors)
+    play, _ = solution
+    for _, state in playthrough(play, grid):
+        state.counts = None
+        assert not pruning.prunes(state)
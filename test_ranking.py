@@ -0,0 +1,45 @@
+import itertools as it
+import sys
+
+from packed import pack
+from ranking import VisitedPermutations, permutation_only
+from solver import Color, SolveStats, corners, solve
+from test_solve import create_grid
+
+
+def test__ranks_are_lexicographic_and_dense():
+    colors = [Color.PINK, Color.BLACK, Color.GREEN, Color.YELLOW, Color.PINK, Color.GRAY, Color.GRAY, Color.BLACK, Color.PINK]
+    visited = VisitedPermutations(colors)
+    arrangements = sorted(set(it.permutations(colors)), key=lambda colors: [color.value for color in colors])
+
+    assert visited.capacity == len(arrangements)
+    for expected, arrangement in enumerate(arrangements):
+        assert visited.rank_colors(arrangement) == expected
+        assert visited.rank_packed(pack(arrangement)) == expected
+
+
+def test__visited_permutations():
+    visited = VisitedPermutations([Color.GRAY] * 7 + [Color.PURPLE] * 2)
+    assert visited.capacity == 36
+    visited.add(3)
+    visited.add(3)
+    visited.add(35)
+    assert 3 in visited and 35 in visited
+    assert 4 not in visited
+    assert len(visited) == 2
+
+
+def test__solve_uses_bitmap_for_permutation_only_rooms():
+    grid = create_grid(
+        (Color.BLACK, Color.YELLOW, Color.GRAY),
+        (Color.YELLOW, Color.GREEN, Color.YELLOW),
+        (Color.GRAY, Color.YELLOW, Color.BLACK),
+    )
+    assert permutation_only(grid.colors)
+    assert not permutation_only([*grid.colors[:-1], Color.BLUE])
+
+    stats = SolveStats()
+    play, _ = solve(grid, corners(Color.YELLOW), max_depth=10, stats=stats)
+    assert play == solve(grid, corners(Color.YELLOW), max_depth=10, backend="packed")[0]
+    # 9! / (2! 4! 2!) bits and the rank table, instead of a set of over a thousand tuples
+    assert stats.peak_visited_bytes < 16_000 < sys.getsizeof(set(range(stats.states_explored)))
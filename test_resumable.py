@@ -0,0 +1,81 @@
+import pickle
+
+import pytest
+from resumable import Solver
+from solver import Color, Unsolvable, corners, solve
+from test_solve import create_grid
+
+
+def rough_draft_red():
+    return create_grid(
+        (Color.RED, Color.WHITE, Color.YELLOW),
+        (Color.BLUE, Color.GREEN, Color.BLUE),
+        (Color.BLUE, Color.YELLOW, Color.BLUE),
+    )
+
+
+def test__same_play_as_solve():
+    goal = corners(Color.RED)
+    expected_play, expected_grid = solve(rough_draft_red(), goal, max_depth=50)
+
+    play, grid = Solver(rough_draft_red(), goal, max_depth=50).run()
+
+    assert play == expected_play
+    assert grid.colors == expected_grid.colors
+
+
+def test__extend_depth_resumes(tmp_path):
+    goal = corners(Color.RED)
+    expected_play, _ = solve(rough_draft_red(), goal, max_depth=50)
+    assert solve(rough_draft_red(), goal, max_depth=4) is None
+
+    solver = Solver(rough_draft_red(), goal, max_depth=4)
+    assert solver.run() is None
+    explored = len(solver.played_states)
+    assert solver.depth == 5
+
+    solver.save(tmp_path / "room.ckpt")
+    restored = Solver.load(tmp_path / "room.ckpt")
+    restored.extend_depth(50)
+    play, _ = restored.run()
+
+    assert play == expected_play
+    assert len(restored.played_states) > explored
+
+
+def test__unsolvable():
+    grid = create_grid(
+        (Color.GRAY, Color.GRAY, Color.YELLOW),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.YELLOW, Color.YELLOW, Color.YELLOW),
+    )
+    with pytest.raises(Unsolvable):
+        Solver(grid, corners(Color.YELLOW)).run()
+
+
+def test__checkpoints_are_data():
+    goal = corners(Color.RED)
+    solver = Solver(rough_draft_red(), goal, max_depth=4)
+    solver.run()
+
+    restored = Solver.loads(solver.dumps())
+    assert restored.goal == goal
+    assert restored.generation == solver.generation
+    assert restored.played_states == solver.played_states
+    assert restored.history.parents == solver.history.parents
+    assert restored.history.presses == solver.history.presses
+    assert restored.stats == solver.stats
+
+    solved = Solver(rough_draft_red(), goal, max_depth=50)
+    play, _ = solved.run()
+    assert Solver.loads(solved.dumps()).run()[0] == play
+
+
+def test__rejects_other_data():
+    data = Solver(rough_draft_red(), corners(Color.RED)).dumps()
+    with pytest.raises(ValueError):
+        Solver.loads(pickle.dumps({"not": "a checkpoint"}))
+    with pytest.raises(ValueError):
+        Solver.loads(data[:-1])
+    with pytest.raises(ValueError):
+        Solver.loads(data + b"\0")
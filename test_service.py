@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+import pytest
+from batch import moves
+from service import SolveService, start_server
+from solver import Color, SolveStats, corners, solve
+from test_solve import create_grid
+
+
+def fenn():
+    grid = create_grid(
+        (Color.GRAY, Color.GREEN, Color.GRAY),
+        (Color.ORANGE, Color.RED, Color.ORANGE),
+        (Color.WHITE, Color.GREEN, Color.BLACK),
+    )
+    return grid, corners(Color.RED)
+
+
+def test__solve_async():
+    async def main():
+        service = SolveService(workers=2)
+        stats = SolveStats()
+        solution = await service.solve_async(*fenn(), max_depth=30, backend="packed", stats=stats)
+        assert service.in_flight == 0
+        return solution, stats
+
+    (play, grid), stats = asyncio.run(main())
+    expected_stats = SolveStats()
+    expected_play, expected_grid = solve(*fenn(), max_depth=30, backend="packed", stats=expected_stats)
+    assert moves(play) == moves(expected_play)
+    assert grid.colors == expected_grid.colors
+    assert stats == expected_stats
+
+
+def test__coalesces_identical_requests():
+    async def main():
+        service = SolveService(workers=2)
+        first = asyncio.create_task(service.solve_async(*fenn(), max_depth=30, backend="packed"))
+        second = asyncio.create_task(service.solve_async(*fenn(), max_depth=30, backend="packed"))
+        other = asyncio.create_task(service.solve_async(*fenn(), max_depth=29, backend="packed"))
+        await asyncio.sleep(0)
+        assert service.in_flight == 2
+
+        # one caller giving up leaves the shared search running for the other
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        solution, _ = await asyncio.gather(second, other)
+        assert service.in_flight == 0
+        return solution
+
+    play, _ = asyncio.run(main())
+    assert play is not None
+
+
+def test__deadline():
+    async def main():
+        service = SolveService(workers=1)
+        with pytest.raises(TimeoutError):
+            await service.solve_async(*fenn(), max_depth=30, timeout=0.01)
+        assert service.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test__http():
+    async def request(port, method, path, body=b""):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        status = int((await reader.readline()).split()[1])
+        while (await reader.readline()).strip():
+            pass
+        response = json.loads(await reader.read())
+        writer.close()
+        return status, response
+
+    async def main():
+        server = await start_server(SolveService(workers=2), port=0, backend="packed")
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            puzzle = {"id": "fenn", "colors": "gray green gray orange red orange white green black", "goal": "red",
+                      "max_depth": 30}
+            solved = await request(port, "POST", "/solve", json.dumps(puzzle).encode())
+            bad = await request(port, "POST", "/solve", b'{"colors": "mauve"}')
+            missing = await request(port, "GET", "/nowhere")
+        return solved, bad, missing
+
+    (status, response), bad, missing = asyncio.run(main())
+    expected, _ = solve(*fenn(), max_depth=30, backend="packed")
+    assert status == 200
+    assert response["id"] == "fenn"
+    assert response["status"] == "solved"
+    assert [tuple(move) for move in response["moves"]] == moves(expected)
+    assert response["states_explored"] > 0
+    assert bad[0] == 400
+    assert missing[0] == 404
@@ -0,0 +1,72 @@
+import itertools as it
+import random
+
+import pytest
+from solutions import shortest_solutions
+from solver import GRID_POSITIONS, Color, Unsolvable, corners, press, solve
+from test_astar import random_puzzle
+from test_solve import create_grid
+
+
+def all_solutions(grid, goal, presses):
+    """Brute force: every sequence of ``presses`` presses that changes the grid each time and ends on the goal."""
+    found = []
+    for positions in it.product(GRID_POSITIONS, repeat=presses):
+        current = grid
+        for position in positions:
+            current = press(position, current)
+            if current is None:
+                break
+        if current is not None and current.meets_goal(goal):
+            found.append(positions)
+    return found
+
+
+def positions(play):
+    presses = []
+    while play:
+        presses.append(play.press)
+        play = play.previous
+    return tuple(reversed(presses))
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test__matches_brute_force(seed):
+    grid, goal = random_puzzle(random.Random(seed))
+    try:
+        first = solve(grid, goal, max_depth=3, backend="packed")
+    except (Unsolvable, ValueError):
+        return
+    if first is None:
+        assert list(shortest_solutions(grid, goal, max_depth=3)) == []
+        return
+
+    # a path as short as the shortest one can't visit a state more than once, or the goal early
+    solutions = list(shortest_solutions(grid, goal, max_depth=3))
+    assert [positions(play) for play, _ in solutions] == all_solutions(grid, goal, first[0].depth + 1)
+    for play, final in solutions:
+        assert final.meets_goal(goal)
+
+
+def test__includes_solve_result():
+    grid = create_grid(
+        (Color.PINK, Color.GRAY, Color.GRAY),
+        (Color.GRAY, Color.YELLOW, Color.YELLOW),
+        (Color.GRAY, Color.YELLOW, Color.YELLOW),
+    )
+    goal = corners(Color.YELLOW)
+    play, _ = solve(grid, goal)
+    solutions = [solution for solution, _ in shortest_solutions(grid, goal)]
+    assert play in solutions
+    assert len(set(solutions)) == len(solutions) > 1
+    assert {solution.depth for solution in solutions} == {play.depth}
+
+
+def test__unsolvable():
+    grid = create_grid(
+        (Color.GRAY, Color.YELLOW, Color.GRAY),
+        (Color.GRAY, Color.YELLOW, Color.GRAY),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+    )
+    with pytest.raises(Unsolvable):
+        next(shortest_solutions(grid, corners(Color.YELLOW)))
@@ -1,5 +1,5 @@
 import pytest
-from solver import Color, Grid, Position, corners, playthrough, solve
+from solver import GRID_POSITIONS, Color, Grid, Play, PlayHistory, Position, corners, playthrough, solve
 
 type Row = tuple[Color, Color, Color]
 type InputGrid = tuple[Row, Row, Row]
@@ -20,6 +20,19 @@ def test__corners():
     }
 
 
+def test__play_history():
+    history = PlayHistory()
+    first = history.add(PlayHistory.ROOT, 2)
+    second = history.add(first, 5)
+    history.add(first, 7)
+
+    assert history.play(PlayHistory.ROOT) is None
+    assert history.play(second) == Play(None, GRID_POSITIONS[2]).next(GRID_POSITIONS[5])
+    assert history.next(second, 0) == history.play(second).next(GRID_POSITIONS[0])
+    assert history.next(PlayHistory.ROOT, 4) == Play(None, GRID_POSITIONS[4])
+    assert len(history) == 3
+
+
 def test__purple():
     grid = create_grid(
         (Color.GRAY, Color.PURPLE, Color.GRAY),
@@ -0,0 +1,14 @@
+import os
+
+from bench import puzzle
+from solver import solve
+from spill import solve_spilled
+
+
+def test__solves_fenn_and_cleans_up(tmp_path):
+    grid, goal, max_depth = puzzle("fenn")
+    expected, _ = solve(grid, goal, max_depth, backend="packed")
+
+    actual, _ = solve_spilled(grid, goal, max_depth, memory=0, directory=str(tmp_path))
+    assert actual == expected
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,61 @@
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = {
+    "asyncio",
+    "dataclasses",
+    "inspect",
+    "multiprocessing",
+    "numpy",
+    "packed",
+    "pruning",
+    "sqlite3",
+    "stats",
+    "test",
+    "unittest",
+}
+"""Modules ``import solver`` must not pull in; each is only imported by the feature that needs it."""
+
+IMPORT_BUDGET_US = 100_000
+"""Cumulative ``import solver`` time allowed, in microseconds: about 20ms on a laptop. Loose enough
+for a slow machine, tight enough to catch a heavy import (pulling in the test suite added ~110ms)."""
+
+
+def run(code: str, *options: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        # so the bytecode cache gets written, and later runs measure a normal start
+        env={name: value for name, value in os.environ.items() if name != "PYTHONDONTWRITEBYTECODE"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def imported_modules(module: str) -> set[str]:
+    """Every module loaded by ``import module`` in a fresh interpreter."""
+    return set(json.loads(run(f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))").stdout))
+
+
+def import_time(module: str, runs: int = 3) -> int:
+    """Best cumulative ``import module`` time of a few fresh interpreters, from ``python -X importtime``."""
+    best = None
+    for _ in range(runs + 1):
+        for line in run(f"import {module}", "-X", "importtime").stderr.splitlines():
+            _, _, cumulative_and_name = line.partition("|")
+            cumulative, _, name = cumulative_and_name.partition("|")
+            if name.strip() == module:
+                best = int(cumulative) if best is None else min(best, int(cumulative))
+    assert best is not None, f"no -X importtime entry for {module}"
+    return best
+
+
+def test__solver_imports_lean():
+    assert not HEAVY_MODULES & imported_modules("solver")
+
+
+def test__solver_import_time():
+    assert import_time("solver") < IMPORT_BUDGET_US
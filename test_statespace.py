@@ -0,0 +1,57 @@
+import random
+
+import pytest
+from bench import puzzle
+from packed import unpack
+from solver import Color, Grid, Unsolvable, corners, playthrough, solve
+from statespace import DistanceIndex, explore
+from test_solve import create_grid
+
+
+def test__distances_match_solve(tmp_path):
+    grid, goal, _ = puzzle("sanctum_arch_aries")
+    space = explore(grid)
+    assert len(space) == 3690
+
+    space.distances(goal).save(tmp_path / "sanctum.idx")
+    index = DistanceIndex.load(tmp_path / "sanctum.idx")
+
+    # the start and random other states of the room
+    rng = random.Random(3)
+    for state in [space.states[0], *rng.sample(space.states, 30)]:
+        current = Grid(unpack(state), None)
+        try:
+            play, _ = solve(current, goal, max_depth=30, backend="packed")
+        except Unsolvable:
+            assert index.lookup(current) is None
+        except ValueError:
+            assert index.lookup(current) == (0, None)
+        else:
+            distance, position = index.lookup(current)
+            assert distance == play.depth + 1
+            solution, final = index.solution(current)
+            assert solution.depth == play.depth
+            assert final.meets_goal(goal)
+            assert list(playthrough(solution, current))[-1][1].colors == final.colors
+            while solution.previous:
+                solution = solution.previous
+            assert solution.press == position
+
+
+def test__state_outside_room():
+    grid, goal, _ = puzzle("purple")
+    index = explore(grid).distances(goal)
+    with pytest.raises(KeyError):
+        index.lookup(create_grid(*[(Color.RED,) * 3] * 3))
+
+
+def test__unreachable_goal():
+    grid = create_grid(
+        (Color.GRAY, Color.YELLOW, Color.GRAY),
+        (Color.GRAY, Color.YELLOW, Color.GRAY),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+    )
+    index = explore(grid).distances(corners(Color.YELLOW))
+    assert index.lookup(grid) is None
+    with pytest.raises(Unsolvable):
+        index.solution(grid)
@@ -0,0 +1,56 @@
+import pytest
+from solver import COLOR_BEHAVIORS, Color, SolveStats, Unsolvable, corners, solve, timed_behaviors
+from test_solve import create_grid
+
+
+def fenn():
+    grid = create_grid(
+        (Color.GRAY, Color.GREEN, Color.GRAY),
+        (Color.ORANGE, Color.RED, Color.ORANGE),
+        (Color.WHITE, Color.GREEN, Color.BLACK),
+    )
+    return grid, corners(Color.RED)
+
+
+def test__depth_stats_add_up():
+    seen = []
+    stats = SolveStats(on_depth=seen.append)
+    play, _ = solve(*fenn(), max_depth=30, stats=stats)
+
+    assert seen == stats.depths
+    assert [depth.depth for depth in stats.depths] == list(range(play.depth + 1))
+    assert sum(depth.pruned for depth in stats.depths) == stats.impossibles
+
+    *expanded, last = stats.depths
+    for depth in expanded:
+        assert depth.generated == depth.duplicates + depth.pruned + depth.depth_limited + depth.frontier
+    # the solving press is generated but never queued
+    assert last.generated > last.duplicates + last.pruned + last.depth_limited
+    # every new state was visited, except the solution; plus the start state
+    assert sum(depth.generated - depth.duplicates for depth in stats.depths) == stats.states_explored
+
+    assert stats.peak_visited_bytes == stats.depths[-1].visited_bytes > 0
+    assert all(depth.noops[Color.GRAY] for depth in stats.depths)
+
+
+def test__depth_stats_on_failure():
+    stats = SolveStats()
+    with pytest.raises(Unsolvable):
+        solve(create_grid(
+            (Color.GRAY, Color.YELLOW, Color.GRAY),
+            (Color.GRAY, Color.YELLOW, Color.GRAY),
+            (Color.GRAY, Color.GRAY, Color.GRAY),
+        ), corners(Color.YELLOW), stats=stats)
+
+    assert stats.depths
+    assert stats.depths[-1].frontier == 0
+
+
+def test__timed_behaviors():
+    behaviors = dict(COLOR_BEHAVIORS)
+    with timed_behaviors() as seconds:
+        solve(*fenn(), max_depth=30)
+
+    assert COLOR_BEHAVIORS == behaviors
+    assert set(seconds) == {Color.GRAY, Color.GREEN, Color.ORANGE, Color.RED, Color.WHITE, Color.BLACK}
+    assert all(s > 0 for s in seconds.values())
@@ -0,0 +1,119 @@
+import pickle
+
+import pytest
+import store
+from solver import Color, SolveStats, Unsolvable, corners, solve
+from store import SolutionStore, decode_moves, encode_moves
+from test_solve import create_grid
+
+
+def fenn():
+    return create_grid(
+        (Color.GRAY, Color.GREEN, Color.GRAY),
+        (Color.ORANGE, Color.RED, Color.ORANGE),
+        (Color.WHITE, Color.GREEN, Color.BLACK),
+    )
+
+
+def no_solving(*args, **kwargs):
+    raise AssertionError("should have been answered from the store")
+
+
+def test__moves_roundtrip():
+    play, _ = solve(fenn(), corners(Color.RED), max_depth=30)
+    assert decode_moves(encode_moves(play)) == play
+
+
+def test__persists_solutions(tmp_path, monkeypatch):
+    path = tmp_path / "solutions.db"
+    with SolutionStore(path) as solutions:
+        expected_play, expected_grid = solutions.solve(fenn(), corners(Color.RED), max_depth=30)
+
+    monkeypatch.setattr(store, "solve", no_solving)
+    monkeypatch.setattr(store, "Solver", no_solving)
+    with SolutionStore(path) as solutions:
+        play, grid = solutions.solve(fenn(), corners(Color.RED), max_depth=30)
+        assert solutions.hits == 1
+        # shortest solution is 11 presses
+        assert solutions.solve(fenn(), corners(Color.RED), max_depth=9) is None
+
+    assert play == expected_play
+    assert grid.colors == expected_grid.colors
+
+
+def test__caches_failures(monkeypatch):
+    solutions = SolutionStore()
+    unsolvable = create_grid(
+        (Color.GRAY, Color.GRAY, Color.YELLOW),
+        (Color.GRAY, Color.GRAY, Color.GRAY),
+        (Color.YELLOW, Color.YELLOW, Color.YELLOW),
+    )
+    with pytest.raises(Unsolvable):
+        solutions.solve(unsolvable, corners(Color.YELLOW))
+    assert solutions.solve(fenn(), corners(Color.RED), max_depth=5) is None
+
+    monkeypatch.setattr(store, "solve", no_solving)
+    monkeypatch.setattr(store, "Solver", no_solving)
+    with pytest.raises(Unsolvable):
+        solutions.solve(unsolvable, corners(Color.YELLOW))
+    assert solutions.solve(fenn(), corners(Color.RED), max_depth=3) is None
+
+    # a deeper budget has to search again
+    monkeypatch.undo()
+    assert solutions.solve(fenn(), corners(Color.RED), max_depth=30) is not None
+    assert solutions.misses == 3
+
+
+def test__resumes_from_checkpoint():
+    solutions = SolutionStore()
+    assert solutions.solve(fenn(), corners(Color.RED), max_depth=5) is None
+    [(checkpoint,)] = solutions.connection.execute("select checkpoint from solutions").fetchall()
+    assert checkpoint
+
+    expected, _ = solve(fenn(), corners(Color.RED), max_depth=30)
+    play, grid = solutions.solve(fenn(), corners(Color.RED), max_depth=30)
+    assert play == expected
+    assert grid.meets_goal(corners(Color.RED))
+
+
+class _Tripwire:
+    def __reduce__(self):
+        return pytest.fail, ("checkpoint was unpickled",)
+
+
+def test__never_unpickles_checkpoints():
+    solutions = SolutionStore()
+    assert solutions.solve(fenn(), corners(Color.RED), max_depth=5) is None
+    with solutions.connection:
+        solutions.connection.execute("update solutions set checkpoint = ?", (pickle.dumps(_Tripwire()),))
+
+    # an unreadable checkpoint is searched again from the start
+    expected, _ = solve(fenn(), corners(Color.RED), max_depth=30)
+    play, _ = solutions.solve(fenn(), corners(Color.RED), max_depth=30)
+    assert play == expected
+
+
+def test__options_bypass_the_store(monkeypatch):
+    solutions = SolutionStore()
+    assert solutions.solve(fenn(), corners(Color.RED), max_depth=5) is None
+    rows = solutions.connection.execute("select * from solutions").fetchall()
+
+    expected, _ = solve(fenn(), corners(Color.RED), max_depth=30, strategy="astar")
+    play, _ = solutions.solve(fenn(), corners(Color.RED), max_depth=30, strategy="astar")
+    assert play == expected
+    assert solutions.connection.execute("select * from solutions").fetchall() == rows
+    assert solutions.hits == 0
+
+
+def test__stats():
+    solutions = SolutionStore()
+    expected = SolveStats()
+    solve(fenn(), corners(Color.RED), max_depth=30, backend="packed", stats=expected)
+
+    stats = SolveStats()
+    solutions.solve(fenn(), corners(Color.RED), max_depth=30, stats=stats)
+    assert stats == expected
+
+    # answered from the store: nothing searched
+    solutions.solve(fenn(), corners(Color.RED), max_depth=30, stats=stats)
+    assert stats == SolveStats()
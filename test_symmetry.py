@@ -0,0 +1,69 @@
+import random
+import re
+
+import pytest
+from packed import pack, press_packed
+from solver import INDEX_POSITIONS, Color, Unsolvable, cell_index, corners, solve
+from symmetry import SYMMETRIES, Symmetries
+from test_solve import create_grid
+
+
+@pytest.mark.parametrize("name", SYMMETRIES)
+def test__presses_commute_with_symmetry(name):
+    transform, breaking = SYMMETRIES[name]
+    # reds turn whites black, so leave out white where black isn't allowed
+    colors = [color for color in Color if color not in breaking and (color != Color.WHITE or Color.BLACK not in breaking)]
+    symmetries = Symmetries(set(), colors)
+    which = symmetries.names.index(name)
+
+    rng = random.Random(name)
+    for _ in range(500):
+        state = pack(rng.choices(colors, k=9))
+        image = symmetries.images(state)[which]
+        for i, pos in enumerate(INDEX_POSITIONS):
+            pressed = press_packed(i, state)
+            mirrored = press_packed(cell_index(transform(pos)), image)
+            assert (pressed is None) == (mirrored is None)
+            if pressed is not None:
+                assert symmetries.images(pressed)[which] == mirrored
+
+
+def test__direction_sensitive_colors_break_symmetry():
+    assert Symmetries(corners(Color.RED), [Color.PURPLE, Color.BLACK, Color.PINK]).names == []
+    assert Symmetries(corners(Color.RED), [Color.PURPLE, Color.GREEN]).names == ["mirror"]
+    # reds turn whites black, so black (and with it, mirror) is ruled out too
+    assert "mirror" not in Symmetries(corners(Color.RED), [Color.RED, Color.WHITE]).names
+
+
+def explored(grid, goal, **kwargs) -> int:
+    with pytest.raises(Unsolvable) as excinfo:
+        solve(grid, goal, max_depth=30, **kwargs)
+    return int(re.search(r"(\d+) unique states", str(excinfo.value)).group(1))
+
+
+@pytest.mark.parametrize("backend", ["reference", "packed"])
+def test__symmetry_shrinks_visited_states(backend):
+    def grid():
+        return create_grid(
+            (Color.GREEN, Color.PURPLE, Color.GREEN),
+            (Color.ORANGE, Color.WHITE, Color.ORANGE),
+            (Color.GREEN, Color.GRAY, Color.GREEN),
+        )
+
+    goal = corners(Color.PURPLE)
+    assert explored(grid(), goal, backend=backend, symmetry=True) < explored(grid(), goal, backend=backend)
+
+
+def test__symmetry_keeps_shortest_solution():
+    def grid():
+        return create_grid(
+            (Color.BLUE, Color.GREEN, Color.BLUE),
+            (Color.WHITE, Color.WHITE, Color.WHITE),
+            (Color.ORANGE, Color.WHITE, Color.ORANGE),
+        )
+
+    goal = corners(Color.BLUE)
+    expected, _ = solve(grid(), goal, max_depth=30)
+    play, final = solve(grid(), goal, max_depth=30, symmetry=True)
+    assert play.depth == expected.depth
+    assert final.meets_goal(goal)
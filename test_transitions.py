@@ -0,0 +1,43 @@
+from solver import Color, TransitionCache, corners, solve
+from test_solve import create_grid
+
+
+def rough_draft_white():
+    return create_grid(
+        (Color.WHITE, Color.WHITE, Color.WHITE),
+        (Color.YELLOW, Color.WHITE, Color.BLACK),
+        (Color.BLUE, Color.BLUE, Color.BLUE),
+    )
+
+
+def test__repeat_solves_hit_cache():
+    cache = TransitionCache()
+    expected = solve(rough_draft_white(), corners(Color.BLUE), max_depth=30)
+
+    first = solve(rough_draft_white(), corners(Color.BLUE), max_depth=30, transitions=cache)
+    misses = cache.misses
+    assert first[0] == expected[0]
+    assert misses and not cache.hits
+
+    second = solve(rough_draft_white(), corners(Color.BLUE), max_depth=30, transitions=cache)
+    assert second[0] == expected[0]
+    assert cache.misses == misses, "second solve should not recompute any press"
+
+
+def test__packed_shares_cache():
+    cache = TransitionCache()
+    expected, _ = solve(rough_draft_white(), corners(Color.BLUE), max_depth=30, backend="packed")
+    solve(rough_draft_white(), corners(Color.BLUE), max_depth=30, backend="packed", transitions=cache)
+    misses = cache.misses
+
+    play, _ = solve(rough_draft_white(), corners(Color.BLUE), max_depth=30, backend="packed", transitions=cache)
+    assert play == expected
+    assert cache.misses == misses
+
+
+def test__lru_eviction():
+    cache = TransitionCache(maxsize=10)
+    solve(rough_draft_white(), corners(Color.BLUE), max_depth=30, transitions=cache)
+
+    assert len(cache) == 10
+    assert cache.evictions == cache.misses - 10
@@ -0,0 +1,31 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from packed import cell_index, press_packed, unpack
+from solver import GRID_POSITIONS, Color, possible_colors
+from vectorized import keys, possible_counts, press_all
+
+
+def random_states(rng: random.Random, n: int):
+    return np.array([[color.value for color in rng.choices(list(Color), k=9)] for _ in range(n)], dtype=np.uint8)
+
+
+def test__press_all_matches_packed():
+    states = random_states(random.Random(1), 2000)
+    packed = keys(states).tolist()
+    for pos in GRID_POSITIONS:
+        index = cell_index(pos)
+        rows, children, _ = press_all(index, states)
+        actual = dict(zip(rows.tolist(), keys(children).tolist()))
+        for row, state in enumerate(packed):
+            assert actual.get(row) == press_packed(index, state), (unpack(state), pos)
+
+
+def test__possible_counts_matches_reference():
+    states = random_states(random.Random(2), 2000)
+    for row, counts in zip(states, possible_counts(states)):
+        expected = possible_colors(unpack(int(keys(row[None])[0])))
+        assert {color: int(counts[color.value]) for color in expected if counts[color.value]} == +expected
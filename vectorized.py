@@ -0,0 +1,321 @@
+"""Generation-at-a-time BFS over NumPy arrays. Requires ``numpy``.
+
+A generation is an (N, 9) uint8 array of ``Color.value`` cells. Each press position is applied to
+every state at once: states are grouped by the color whose behavior the press runs (blue runs the
+center's), and each group is transformed with a single gather/scatter. Children are keyed by their
+packed state (as ``packed.py`` packs them) and deduplicated against a sorted array of visited keys.
+
+Children are ordered by (parent ordinal, press) before deduplication, so the first copy kept is the
+one the serial search would have seen first, and the result is the same Play ``solve()`` returns.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from packed import (
+    BLACK,
+    BLUE,
+    COLORS_BY_VALUE,
+    CYCLE_INDEXES,
+    GRAY,
+    GREEN,
+    NEIGHBOR_INDEXES,
+    ORANGE,
+    PINK,
+    PRESS_ORDER,
+    PURPLE,
+    RECOUNTING,
+    RED,
+    WHITE,
+    YELLOW,
+    cell_index,
+    pack_goal,
+    play_from_parents,
+)
+from pruning import COUNTS, REACH, PruningIndex
+from solver import Goal, Grid, Play, Unsolvable
+from stats import SolveStats
+
+type States = np.ndarray
+"""(N, 9) uint8 array of cell color values."""
+
+SHIFTS = np.arange(0, 36, 4, dtype=np.uint64)
+VALUES = np.arange(16, dtype=np.uint8)
+
+# takes states whose press at index runs this behavior; returns (children, which of them changed)
+type NumpyBehavior = Callable[[int, States], tuple[States, np.ndarray] | None]
+
+NUMPY_BEHAVIORS: list[NumpyBehavior | None] = [None] * (max(COLORS_BY_VALUE) + 1)
+"""Vectorized behaviors, indexed by ``Color.value``. None for colors whose press never changes anything."""
+
+
+def keys(states: States) -> np.ndarray:
+    """Packed state of each row, as uint64."""
+    return (states.astype(np.uint64) << SHIFTS).sum(axis=1, dtype=np.uint64)
+
+
+def color_counts(states: States) -> np.ndarray:
+    """(N, 16) count of each color value per row."""
+    return (states[:, :, None] == VALUES).sum(axis=1)
+
+
+def _swap(states: States, i: int, j: int) -> tuple[States, np.ndarray]:
+    children = states.copy()
+    children[:, [i, j]] = states[:, [j, i]]
+    return children, states[:, i] != states[:, j]
+
+
+def purple(index: int, states: States) -> tuple[States, np.ndarray] | None:
+    return _swap(states, index, index + 3) if index < 6 else None
+
+
+NUMPY_BEHAVIORS[PURPLE] = purple
+
+
+def yellow(index: int, states: States) -> tuple[States, np.ndarray] | None:
+    return _swap(states, index, index - 3) if index >= 3 else None
+
+
+NUMPY_BEHAVIORS[YELLOW] = yellow
+
+
+def green(index: int, states: States) -> tuple[States, np.ndarray] | None:
+    return _swap(states, index, 8 - index) if index != 4 else None
+
+
+NUMPY_BEHAVIORS[GREEN] = green
+
+
+def red(index: int, states: States) -> tuple[States, np.ndarray]:
+    pressed = states[:, [index]]
+    whites = states == WHITE
+    blacks = states == BLACK
+    children = np.where(whites, np.uint8(BLACK), np.where(blacks, pressed, states))
+    return children, (whites | blacks).any(axis=1)
+
+
+NUMPY_BEHAVIORS[RED] = red
+
+
+def black(index: int, states: States) -> tuple[States, np.ndarray]:
+    row = [3 * (index // 3) + i for i in range(3)]
+    children = states.copy()
+    # rotate right: the last cell wraps around to the first
+    children[:, row] = states[:, [row[2], row[0], row[1]]]
+    return children, (states[:, row] != BLACK).any(axis=1)
+
+
+NUMPY_BEHAVIORS[BLACK] = black
+
+
+def white(index: int, states: States) -> tuple[States, np.ndarray]:
+    color = states[:, [index]]
+    neighbors = NEIGHBOR_INDEXES[index]
+    neighbor_colors = states[:, neighbors]
+
+    children = states.copy()
+    children[:, index] = GRAY
+    children[:, neighbors] = np.where(
+        neighbor_colors == color,
+        np.uint8(GRAY),
+        np.where(neighbor_colors == GRAY, color, neighbor_colors),
+    )
+    return children, np.ones(len(states), dtype=bool)
+
+
+NUMPY_BEHAVIORS[WHITE] = white
+
+
+def orange(index: int, states: States) -> tuple[States, np.ndarray]:
+    counts = color_counts(states[:, NEIGHBOR_INDEXES[index]])
+    most = counts.max(axis=1)
+    color = counts.argmax(axis=1).astype(np.uint8)
+    # tied for most common: no change
+    unique = (counts == most[:, None]).sum(axis=1) == 1
+
+    children = states.copy()
+    children[:, index] = color
+    return children, unique & (color != GRAY) & (color != states[:, index])
+
+
+NUMPY_BEHAVIORS[ORANGE] = orange
+
+
+def pink(index: int, states: States) -> tuple[States, np.ndarray]:
+    cells = CYCLE_INDEXES[index]
+    children = states.copy()
+    # each cell takes the color of the one before it (clockwise)
+    children[:, cells] = states[:, [cells[-1], *cells[:-1]]]
+    return children, (states[:, cells] != states[:, [cells[0]]]).any(axis=1)
+
+
+NUMPY_BEHAVIORS[PINK] = pink
+
+
+def press_all(index: int, states: States) -> tuple[np.ndarray, States, np.ndarray]:
+    """Presses the cell at index in every state.
+
+    Returns (rows of the states that changed, their children, whether each press changed colors).
+    """
+    color = states[:, index]
+    runs = np.where(color == BLUE, states[:, 4], color)
+
+    rows, children, recounted = [], [], []
+    for value in np.unique(runs).tolist():
+        behavior = NUMPY_BEHAVIORS[value]
+        if behavior is None:
+            continue
+        group = np.flatnonzero(runs == value)
+        if (result := behavior(index, states[group])) is None:
+            continue
+        new, changed = result
+        rows.append(group[changed])
+        children.append(new[changed])
+        recounted.append(np.full(len(rows[-1]), value in RECOUNTING))
+
+    if not rows:
+        return np.empty(0, dtype=np.intp), np.empty((0, 9), dtype=np.uint8), np.empty(0, dtype=bool)
+    return np.concatenate(rows), np.concatenate(children), np.concatenate(recounted)
+
+
+def possible_counts(states: States) -> np.ndarray:
+    """``possible_colors()`` for every row, as (N, 16) counts indexed by color value."""
+    counts = color_counts(states)
+    oranges, blues, blanks, reds, whites = (counts[:, value].copy() for value in (ORANGE, BLUE, GRAY, RED, WHITE))
+
+    # whites can create more whites from blanks, and blues can turn too
+    whites_blank = (whites > 0) & (blanks > 0)
+    counts[:, WHITE] += np.where(whites_blank, blanks, 0)
+    blues_blank = whites_blank & (blues > 0)
+    counts[:, BLUE] += np.where(blues_blank, blanks + whites, 0)
+    counts[:, WHITE] += np.where(blues_blank, blues, 0)
+
+    # whites can turn black, and blacks red, if there are reds
+    counts[:, BLACK] += np.where((whites > 0) & (reds > 0), counts[:, WHITE], 0)
+    blacks = counts[:, BLACK].copy()
+    counts[:, RED] += np.where((blacks > 0) & (reds > 0), blacks, 0)
+
+    # oranges and blues can turn any color there could be at least 2 of
+    doubles = counts >= 2
+    doubles[:, [ORANGE, GRAY]] = False
+    doubles &= (oranges > 0)[:, None]
+    counts += np.where(doubles, (oranges + blues)[:, None], 0)
+    return counts
+
+
+def prunes(pruning: PruningIndex, states: States, recounted: np.ndarray) -> np.ndarray:
+    """``PruningIndex.prunes_packed()`` for every row, updating its ``pruned`` counts."""
+    unreachable = np.zeros(len(states), dtype=bool)
+    if recounted.any():
+        rows = np.flatnonzero(recounted)
+        counts = possible_counts(states[rows])
+        short = np.zeros(len(rows), dtype=bool)
+        for color, count in pruning.goal_counts.items():
+            short |= counts[:, color.value] < count
+        unreachable[rows[short]] = True
+        if pruned := int(short.sum()):
+            pruning.pruned[COUNTS] += pruned
+
+    out_of_reach = np.zeros(len(states), dtype=bool)
+    for target, color, sources in pruning.sources:
+        value = color.value
+        out_of_reach |= (states[:, target] != value) & ~(states[:, list(sources)] == value).any(axis=1)
+    out_of_reach &= ~unreachable
+    if pruned := int(out_of_reach.sum()):
+        pruning.pruned[REACH] += pruned
+
+    return unreachable | out_of_reach
+
+
+def _visited(values: np.ndarray, visited: np.ndarray) -> np.ndarray:
+    """Whether each key is in the sorted ``visited`` keys."""
+    found = np.searchsorted(visited, values).clip(max=len(visited) - 1)
+    return visited[found] == values
+
+
+def solve_numpy(
+    grid: Grid,
+    goal: Goal,
+    max_depth: int = 10,
+    pruning: PruningIndex | None = None,
+    stats: SolveStats | None = None,
+) -> tuple[Play, Grid] | None:
+    """``solve()`` with each generation pressed as a whole over NumPy arrays."""
+    if grid.meets_goal(goal):
+        raise ValueError("Grid already meets goal")
+
+    goal_mask, goal_value = (np.uint64(v) for v in pack_goal(goal))
+    goal_indexes = [cell_index(pos) for pos, _ in goal]
+    goal_values = np.array([color.value for _, color in goal], dtype=np.uint8)
+
+    if pruning is None:
+        pruning = PruningIndex(goal, grid.colors)
+
+    # states of the current generation in the order the serial search pops them
+    generation = np.array([[color.value for color in grid.colors]], dtype=np.uint8)
+    visited = keys(generation)
+    # per generation: (parent ordinal, press index) of each state, aligned with ``generation``
+    parents = list[np.ndarray]()
+
+    max_depth_reached = 0
+    total_impossibles = 0
+
+    def record_stats() -> None:
+        if stats is not None:
+            stats.states_explored, stats.depth_limited, stats.impossibles = (
+                len(visited), max_depth_reached, total_impossibles,
+            )
+
+    depth = 0
+    while len(generation):
+        ordinals, presses, children, recounted = [], [], [], []
+        for press_index, (_, index) in enumerate(PRESS_ORDER):
+            rows, new, changed_colors = press_all(index, generation)
+            ordinals.append(rows)
+            presses.append(np.full(len(rows), press_index))
+            children.append(new)
+            recounted.append(changed_colors)
+
+        # the order the serial search generates them in
+        order = np.lexsort((np.concatenate(presses), np.concatenate(ordinals)))
+        ordinal = np.concatenate(ordinals)[order]
+        press_index = np.concatenate(presses)[order]
+        children = np.concatenate(children)[order]
+        recounted = np.concatenate(recounted)[order]
+        child_keys = keys(children)
+
+        # children after the first one that meets the goal are never seen
+        found = np.flatnonzero(child_keys & goal_mask == goal_value)
+        end = found[0] if found.size else len(children)
+
+        # first copy of each state not played before
+        _, fresh = np.unique(child_keys[:end], return_index=True)
+        fresh.sort()
+        fresh = fresh[~_visited(child_keys[fresh], visited)]
+        visited = np.sort(np.concatenate([visited, child_keys[fresh]]))
+
+        pruned = prunes(pruning, children[fresh], recounted[fresh])
+        total_impossibles += int(pruned.sum())
+        fresh = fresh[~pruned]
+        if depth >= max_depth:
+            max_depth_reached += len(fresh)
+
+        if found.size:
+            record_stats()
+            play = play_from_parents(parents, int(ordinal[end]), int(press_index[end]))
+            return play, Grid([COLORS_BY_VALUE[value] for value in children[end].tolist()], None)
+        if depth >= max_depth:
+            break
+
+        goals_remaining = (children[fresh][:, goal_indexes] != goal_values).sum(axis=1)
+        fresh = fresh[np.argsort(-goals_remaining, kind="stable")[::-1]]
+        generation = children[fresh]
+        parents.append(np.stack([ordinal[fresh], press_index[fresh]], axis=1))
+        depth += 1
+
+    record_stats()
+    if not max_depth_reached:
+        raise Unsolvable(f"No solution found within max depth; {len(visited)} unique states explored.")
+
+    return None